@@ -11,6 +11,9 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from core.asgi import DisconnectMiddleware
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", os.environ.get("CONFIG_SETTINGS", "config.settings.dev"))
 
-application = get_asgi_application()
+# The streaming responses need to know when their client disconnects
+application = DisconnectMiddleware(get_asgi_application())
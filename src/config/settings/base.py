@@ -25,7 +25,7 @@ BASE_APPS = [
     "django.contrib.sites",
 ]
 
-LOCAL_APPS = ["core", "user", "authentication", "nodes", "reports", "ripener"]
+LOCAL_APPS = ["core", "user", "authentication", "nodes", "reports", "ripener", "translate"]
 
 THIRD_APPS = [
     'corsheaders',
@@ -112,9 +112,110 @@ else:
             'USER': os.environ.get('DB_USER'),
             'PORT': os.environ.get('DB_PORT'),
             'PASSWORD': os.environ.get('DB_PASS'),
+            # Seconds a connection is reused between requests, 0 closes it after every request. The ASGI server
+            # cannot reuse them, use 0 and PgBouncer with it.
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            # Check a reused connection before the first query of a request, so a dropped one is replaced
+            'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '5')),
+            },
         }
     }
 
+# Direct connection to PostgreSQL for the features that cannot go through PgBouncer, e.g. LISTEN
+DB_DIRECT_HOST = os.environ.get('DB_DIRECT_HOST', os.environ.get('DB_HOST'))
+DB_DIRECT_PORT = os.environ.get('DB_DIRECT_PORT', os.environ.get('DB_PORT'))
+
+# Database alias of the streaming exports, they need a server side cursor to keep a constant memory
+NODES_EXPORT_DATABASE = 'default'
+
+# Set DB_PGBOUNCER when DB_HOST is a PgBouncer in transaction pooling mode. The server side cursors do not survive
+# between transactions there, so they are disabled and psycopg2 loads the whole result of the `.iterator()` querysets
+# into memory. The exports use the 'direct' alias instead, connected to DB_DIRECT_HOST with server side cursors.
+if ENVIRONMENT != "first" and os.environ.get('DB_PGBOUNCER', 'False') == 'True':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+    DATABASES['direct'] = {
+        **DATABASES['default'],
+        'HOST': DB_DIRECT_HOST,
+        'PORT': DB_DIRECT_PORT,
+        'CONN_MAX_AGE': 0,
+        'DISABLE_SERVER_SIDE_CURSORS': False,
+        'TEST': {'MIRROR': 'default'},
+    }
+    NODES_EXPORT_DATABASE = 'direct'
+
+# Number of readings written in each bulk insert when importing sensor files
+NODES_IMPORT_BATCH_SIZE = int(os.getenv("NODES_IMPORT_BATCH_SIZE", "1000"))
+# Seconds without progress after which a running import job is considered abandoned and claimed again
+NODES_IMPORT_STALE_AFTER = int(os.getenv("NODES_IMPORT_STALE_AFTER", "600"))
+
+# Maintain the hourly and daily rollups of the nodes readings and use them for the long-range aggregations. The
+# readings stored before are summarized by migration 0010, run `python manage.py rebuild_node_rollups` to rebuild them
+# after re-enabling it.
+NODES_ROLLUPS_ENABLED = os.getenv("NODES_ROLLUPS_ENABLED", "True") == "True"
+
+# Seconds without readings after which a node is reported as stale
+NODES_STALE_AFTER = int(os.getenv("NODES_STALE_AFTER", "3600"))
+
+# Cache of the nodes endpoints, invalidated on every write. It is file based by default so the web processes and the
+# import workers share it, set NODES_CACHE_BACKEND to use another shared backend, e.g. redis.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "nodes": {
+        "BACKEND": os.getenv("NODES_CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("NODES_CACHE_LOCATION", BASE_DIR.parent / "cache"),
+    },
+}
+NODES_CACHE_ALIAS = "nodes"
+# Seconds a cached response is kept, the writes invalidate them before
+NODES_CACHE_TIMEOUT = int(os.getenv("NODES_CACHE_TIMEOUT", "300"))
+
+# Seconds the visitors report is cached
+REPORTS_CACHE_TIMEOUT = int(os.getenv("REPORTS_CACHE_TIMEOUT", "60"))
+
+# Buffer the visits in memory and write them in bulk every REPORTS_VISITS_BUFFER_SIZE visits or
+# REPORTS_VISITS_FLUSH_INTERVAL seconds, and when the process exits
+REPORTS_VISITS_BUFFER_ENABLED = os.getenv("REPORTS_VISITS_BUFFER_ENABLED", "True") == "True"
+REPORTS_VISITS_BUFFER_SIZE = int(os.getenv("REPORTS_VISITS_BUFFER_SIZE", "500"))
+REPORTS_VISITS_FLUSH_INTERVAL = float(os.getenv("REPORTS_VISITS_FLUSH_INTERVAL", "5"))
+
+# Backend that delivers the new readings to the live stream, nodes.live.PostgresNotifyFanout delivers the readings
+# stored by every process, e.g. the import workers and the other gunicorn workers, and is the default with
+# PostgreSQL. nodes.live.InMemoryFanout only delivers the ones stored by the same process.
+NODES_LIVE_FANOUT = os.getenv(
+    "NODES_LIVE_FANOUT",
+    "nodes.live.PostgresNotifyFanout"
+    if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql"
+    else "nodes.live.InMemoryFanout",
+)
+# Seconds without readings after which the live stream sends a keep-alive comment
+NODES_LIVE_HEARTBEAT = float(os.getenv("NODES_LIVE_HEARTBEAT", "15"))
+# Seconds after which a live stream ends and its client reconnects, so the streams of the clients that disconnected
+# without being noticed are released
+NODES_LIVE_MAX_LIFETIME = float(os.getenv("NODES_LIVE_MAX_LIFETIME", "300"))
+
+# Comma separated translate models loaded when a translate process starts (clasificador, wav2vec, whisper, embedder,
+# frases), the other models are loaded on their first use
+TRANSLATE_PRELOAD_MODELS = [name for name in os.getenv("TRANSLATE_PRELOAD_MODELS", "").split(",") if name]
+# Directory of the saved embeddings of the translate phrases
+TRANSLATE_EMBEDDINGS_DIR = os.getenv("TRANSLATE_EMBEDDINGS_DIR", BASE_DIR.parent / "cache" / "translate")
+# Address of the translate service started with `run_translate_worker`, 'host:port' or the path of a Unix socket, empty
+# runs the translations in a thread of every API process
+TRANSLATE_SERVICE_ADDRESS = os.getenv("TRANSLATE_SERVICE_ADDRESS", "")
+# Key that authenticates the API processes to the translate service, required to use it, e.g. `openssl rand -hex 32`
+TRANSLATE_SERVICE_AUTHKEY = os.getenv("TRANSLATE_SERVICE_AUTHKEY", "")
+# Processes of the translate service that translate the batches in parallel, each one loads its own copy of the models
+TRANSLATE_SERVICE_WORKERS = int(os.getenv("TRANSLATE_SERVICE_WORKERS", "1"))
+# Torch threads of every process of the translate service, and the seconds a request waits for its translation
+TRANSLATE_WORKER_THREADS = int(os.getenv("TRANSLATE_WORKER_THREADS", "2"))
+TRANSLATE_TIMEOUT = float(os.getenv("TRANSLATE_TIMEOUT", "60"))
+# Concurrent translations of a language grouped in one batch, and the seconds the first one waits for the others
+TRANSLATE_BATCH_SIZE = int(os.getenv("TRANSLATE_BATCH_SIZE", "8"))
+TRANSLATE_BATCH_WAIT = float(os.getenv("TRANSLATE_BATCH_WAIT", "0.05"))
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -129,6 +230,10 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploaded files, e.g. the sensor files waiting to be imported by the import workers
+MEDIA_URL = "media/"
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", BASE_DIR.parent / "media")
+
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
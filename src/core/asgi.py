@@ -0,0 +1,60 @@
+"""
+This module contains the ASGI middleware of the project.
+"""
+
+import asyncio
+from typing import Optional
+
+from django.http import HttpRequest
+
+DISCONNECTED_SCOPE_KEY = 'core.disconnected'
+
+
+class DisconnectMiddleware:
+    """
+    An ASGI middleware that notices when the client of an HTTP request disconnects.
+
+    Django 4.2 stops reading the messages of the client once the body of the request is read, so a streaming response
+    never learns that its client went away. This middleware keeps reading them and sets an `asyncio.Event` stored in
+    the scope, that the streams can wait for with `get_disconnected_event`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        disconnected = asyncio.Event()
+        watcher: Optional[asyncio.Task] = None
+
+        async def watch() -> None:
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        async def receive_body():
+            nonlocal watcher
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected.set()
+            elif not message.get('more_body', False) and watcher is None:
+                # The application does not read more messages after the body, the watcher reads them from now on
+                watcher = asyncio.create_task(watch())
+            return message
+
+        try:
+            return await self.app({**scope, DISCONNECTED_SCOPE_KEY: disconnected}, receive_body, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+def get_disconnected_event(request: HttpRequest) -> Optional[asyncio.Event]:
+    """
+    Returns the event set when the client of a request disconnects, or None if the request is not served through
+    `DisconnectMiddleware`, e.g. under WSGI or in the tests.
+    """
+    scope = getattr(request, 'scope', None) or {}
+    return scope.get(DISCONNECTED_SCOPE_KEY)
@@ -1,9 +1,19 @@
 """
-This module defines a custom pagination class for the app Sistemas Inteligentes.
+This module defines the custom pagination classes for the app Sistemas Inteligentes.
 """
 
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from datetime import datetime
+from typing import Union
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPaginationClass(PageNumberPagination):
@@ -42,3 +52,155 @@ class CustomPaginationClass(PageNumberPagination):
                 'results': data,
             }
         )
+
+
+class KeysetPaginationClass(BasePagination):
+    """
+    This class defines a keyset (cursor) pagination class keyed on an ordering field and the id.
+
+    Each page is fetched with a `WHERE (field, id) < (last_field, last_id)` condition instead of an OFFSET, so the
+    cost of a page does not grow with its position, and the total is only counted when it is requested.
+
+    Attributes:
+        page_size (int): The number of items to include on each page. Default is 10.
+        page_size_query_param (str): The query parameter to use for specifying the page size. Default is 'limit'.
+        max_page_size (int): The maximum page size that can be requested. Default is 1000.
+        cursor_query_param (str): The query parameter with the opaque cursor. Default is 'cursor'.
+        count_query_param (str): The query parameter to skip the total when it is 'false'. Default is 'count'.
+        ordering_field (str): The field used to order the items together with the id.
+        descending (bool): Whether the items are ordered from the greatest to the lowest value.
+    """
+
+    page_size = 10
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering_field: str = 'created_at', descending: bool = True):
+        self.ordering_field = ordering_field
+        self.descending = descending
+        self.request = None
+        self.total = None
+        self.next_position = None
+        self.previous_position = None
+        self.limit = self.page_size
+
+    def get_page_size(self, request: Request) -> int:
+        """
+        Returns the page size sent in the query parameters, limited to `max_page_size`.
+        """
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def encode_cursor(self, value, pk, reverse: bool) -> str:
+        """
+        Encodes the position of an item as an opaque cursor.
+        """
+        value = value.isoformat() if isinstance(value, datetime) else value
+        payload = json.dumps([value, pk, reverse]).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    def decode_cursor(self, cursor: str) -> tuple:
+        """
+        Decodes a cursor created with `encode_cursor`.
+
+        Raises:
+            NotFound: If the cursor is not valid, e.g. it was tampered with.
+        """
+        try:
+            value, pk, reverse = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position = parse_datetime(value) if isinstance(value, str) else None
+        except (TypeError, ValueError) as error:
+            raise NotFound(self.invalid_cursor_message) from error
+        if position is None or not isinstance(pk, int) or isinstance(pk, bool):
+            raise NotFound(self.invalid_cursor_message)
+        return position, pk, bool(reverse)
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> list:
+        """
+        Returns the items of the page pointed by the cursor sent in the query parameters.
+
+        Parameters:
+            queryset (QuerySet): The filtered queryset to paginate.
+            request (Request): The request with the cursor and limit query parameters.
+            view (APIView, optional): The view that paginates the queryset.
+
+        Returns:
+            list: The items of the page.
+        """
+        self.request = request
+        self.limit = self.get_page_size(request)
+        if request.query_params.get(self.count_query_param, 'true').lower() != 'false':
+            self.total = queryset.count()
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if cursor:
+            value, pk, reverse = self.decode_cursor(cursor)
+            # Moving backwards is moving forward in the opposite order
+            lookup = 'lt' if self.descending != reverse else 'gt'
+            after = Q(**{f'{self.ordering_field}__{lookup}': value})
+            queryset = queryset.filter(after | Q(**{self.ordering_field: value, f'pk__{lookup}': pk}))
+
+        prefix = '-' if self.descending != reverse else ''
+        items = list(queryset.order_by(f'{prefix}{self.ordering_field}', f'{prefix}pk')[: self.limit + 1])
+        has_more = len(items) > self.limit
+        items = items[: self.limit]
+        if reverse:
+            items.reverse()
+
+        # Coming back from a later page there is always a next page, going forward there is a previous one
+        has_next, has_previous = (True, has_more) if reverse else (has_more, bool(cursor))
+        self.next_position = self.previous_position = None
+        if items and has_next:
+            self.next_position = (self._value(items[-1]), self._pk(items[-1]), False)
+        if items and has_previous:
+            self.previous_position = (self._value(items[0]), self._pk(items[0]), True)
+        return items
+
+    def _value(self, item):
+        """
+        Returns the value of the ordering field of an item, either a model instance or a dictionary.
+        """
+        return item[self.ordering_field] if isinstance(item, dict) else getattr(item, self.ordering_field)
+
+    @staticmethod
+    def _pk(item):
+        """
+        Returns the id of an item, either a model instance or a dictionary.
+        """
+        return item['id'] if isinstance(item, dict) else item.pk
+
+    def _link(self, position) -> Union[str, None]:
+        """
+        Returns the URL of the page that starts after a position.
+        """
+        if position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(*position))
+
+    def get_paginated_response(self, data: list[dict]) -> Response:
+        """
+        Returns a paginated response containing the provided data.
+
+        Parameters:
+            data (list[dict]): The data to include in the response.
+
+        Returns:
+            Response: The paginated response containing the data.
+        """
+        return Response(
+            {
+                'total': self.total,
+                'next': self._link(self.next_position),
+                'previous': self._link(self.previous_position),
+                'limit': self.limit,
+                'results': data,
+            }
+        )
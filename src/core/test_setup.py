@@ -3,6 +3,9 @@ This file contains the TestSetup class which is the basis for all test cases
 """
 import random
 
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
 from faker import Faker
 from rest_framework.test import APITestCase
 
@@ -11,7 +14,14 @@ from user.models import User
 faker = Faker()
 global_password = faker.password()
 
+# The tests use in-memory caches, so clearing them never touches the cache of the server, e.g. the file based one
+TEST_CACHES = {
+    alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": f"test-{alias}"}
+    for alias in settings.CACHES
+}
 
+
+@override_settings(CACHES=TEST_CACHES)
 class TestSetup(APITestCase):
     @classmethod
     def setUpClass(cls) -> None:
@@ -19,6 +29,8 @@ class TestSetup(APITestCase):
         super(TestSetup, cls).setUpClass()
 
     def setUp(self, authenticate=True):
+        for cache in caches.all():
+            cache.clear()
         self.global_password = global_password
         if authenticate:
             self.user = generate_user()
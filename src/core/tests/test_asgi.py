@@ -0,0 +1,47 @@
+"""
+Tests for the ASGI middleware of the project.
+"""
+
+import asyncio
+
+from django.test import SimpleTestCase
+
+from core.asgi import DISCONNECTED_SCOPE_KEY, DisconnectMiddleware
+
+
+class TestsDisconnectMiddleware(SimpleTestCase):
+    """
+    Test the middleware notices the disconnection of the client after the body was read.
+    """
+
+    def test_sets_event_on_disconnect(self):
+        """Test the event of the scope is set once the client disconnects."""
+        messages = asyncio.Queue()
+        events = []
+
+        async def app(scope, receive, send):
+            self.assertEqual((await receive())["type"], "http.request")
+            disconnected = scope[DISCONNECTED_SCOPE_KEY]
+            events.append(disconnected.is_set())
+            await messages.put({"type": "http.disconnect"})
+            await asyncio.wait_for(disconnected.wait(), timeout=1)
+            events.append(disconnected.is_set())
+
+        async def run():
+            await messages.put({"type": "http.request", "body": b"", "more_body": False})
+            await DisconnectMiddleware(app)({"type": "http"}, messages.get, None)
+
+        asyncio.run(run())
+
+        self.assertEqual(events, [False, True])
+
+    def test_passes_other_scopes(self):
+        """Test the scopes that are not HTTP are passed unchanged."""
+        scopes = []
+
+        async def app(scope, receive, send):
+            scopes.append(scope)
+
+        asyncio.run(DisconnectMiddleware(app)({"type": "lifespan"}, None, None))
+
+        self.assertEqual(scopes, [{"type": "lifespan"}])
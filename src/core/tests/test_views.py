@@ -0,0 +1,63 @@
+"""
+Tests for the base views of the project.
+"""
+
+import asyncio
+
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from core.test_setup import TestSetup
+from core.views import AsyncAPIView
+
+
+class ExampleAsyncView(AsyncAPIView):
+    """
+    A view with an async and a sync handler.
+    """
+
+    permission_classes = (AllowAny,)
+
+    async def get(self, request):
+        await asyncio.sleep(0)
+        if request.query_params.get('missing'):
+            raise NotFound('Missing')
+        return Response({'handler': 'async'})
+
+    def post(self, request):
+        return Response({'handler': 'sync', 'data': request.data}, status=status.HTTP_201_CREATED)
+
+
+class TestsAsyncAPIView(TestSetup):
+    """
+    Test the async API view runs async and sync handlers.
+    """
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.factory = APIRequestFactory()
+        self.view = ExampleAsyncView.as_view()
+
+        return super().setUp()
+
+    def test_view_is_coroutine(self):
+        """Test the view is served as a coroutine."""
+        self.assertTrue(asyncio.iscoroutinefunction(self.view))
+
+    def test_async_handler(self):
+        """Test the async handler is awaited and its exceptions are handled."""
+        response = asyncio.run(self.view(self.factory.get('/')))
+        missing = asyncio.run(self.view(self.factory.get('/', {'missing': 'true'})))
+
+        self.assertEqual(response.data, {'handler': 'async'})
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sync_handler(self):
+        """Test the sync handler runs in a thread."""
+        response = asyncio.run(self.view(self.factory.post('/', {'page': 'home'}, format='json')))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'handler': 'sync', 'data': {'page': 'home'}})
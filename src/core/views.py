@@ -0,0 +1,56 @@
+"""
+This module defines the base views shared by the apps of the project.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.utils.functional import classproperty
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    A Django REST Framework APIView that can define `async` handlers.
+
+    The view is served as a coroutine under ASGI, so the async handlers await the database with the async ORM without
+    blocking a thread. The authentication, permissions and throttling checks and the handlers that are not `async`
+    run in a thread with `sync_to_async`, so both kinds of handlers can be mixed in the same view.
+    """
+
+    @classproperty
+    def view_is_async(cls):  # pylint: disable=no-self-argument
+        """
+        Marks the view as asynchronous for Django.
+        """
+        return True
+
+    async def dispatch(self, request, *args, **kwargs) -> Response:
+        """
+        Same as `APIView.dispatch`, awaiting the handler.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:  # pylint: disable=broad-except
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,43 @@
+"""
+Gunicorn configuration to serve the ASGI application with uvicorn workers.
+
+Run it from the src folder with `gunicorn -c gunicorn.conf.py config.asgi:application`, every setting can be changed
+with the environment variables below.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Each uvicorn worker is a process with its own event loop that serves many requests at the same time. The async
+# views await the database on the loop, the sync views and the sync parts of the async views run in a thread of their
+# request, so the concurrency of the sync code is limited by the database connections, not by a thread pool.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+
+# Seconds a worker can be silent before it is restarted, and to finish the open requests on restarts
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Restart the workers after some requests to release the memory they accumulate
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = os.getenv("GUNICORN_ERROR_LOG", "-")
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_worker_init(worker):  # pylint: disable=unused-argument
+    """
+    Loads the translate models in TRANSLATE_PRELOAD_MODELS before the worker serves requests when the translations run
+    in the worker, with a translate service the service loads them instead.
+    """
+    from django.conf import settings  # pylint: disable=import-outside-toplevel
+
+    if settings.TRANSLATE_PRELOAD_MODELS and not settings.TRANSLATE_SERVICE_ADDRESS:
+        from translate.registry import preload_models  # pylint: disable=import-outside-toplevel
+
+        preload_models()
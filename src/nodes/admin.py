@@ -4,7 +4,7 @@ File contains admin configuration for nodes app.
 
 from django.contrib import admin
 
-from nodes.models import Nodes, NodesStorage
+from nodes.models import ImportJob, Nodes, NodesStorage
 
 
 class NodesAdmin(admin.ModelAdmin):
@@ -27,5 +27,16 @@ class NodesStorageAdmin(admin.ModelAdmin):
     search_fields = ('node', 'date_time', 'temperature', 'humidity', 'pressure', 'altitude')
 
 
+class ImportJobAdmin(admin.ModelAdmin):
+    """
+    A Django ModelAdmin class for the ImportJob model.
+    """
+
+    list_display = ('id', 'kind', 'status', 'processed_rows', 'accepted_rows', 'rejected_rows', 'created_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('started_at', 'finished_at', 'worker')
+
+
 admin.site.register(Nodes, NodesAdmin)
 admin.site.register(NodesStorage, NodesStorageAdmin)
+admin.site.register(ImportJob, ImportJobAdmin)
@@ -0,0 +1,84 @@
+"""
+This module contains the time-bucketed aggregation of the NodesStorage readings.
+
+The readings are grouped into buckets with `Trunc` and summarized with aggregate expressions in the database, so a
+chart of a long range is computed with one query that returns one row per bucket.
+"""
+
+from typing import Iterable
+
+from django.db.models import Avg, Count, Max, Min, QuerySet
+from django.db.models.functions import Trunc
+
+from nodes.models import STORAGE_FIELDS, NodesStorage
+
+BUCKETS: tuple[str, ...] = ('minute', 'hour', 'day', 'week')
+
+STATISTICS = {'min': Min, 'max': Max, 'avg': Avg}
+
+
+def parse_fields(fields: str) -> list[str]:
+    """
+    Parses a comma separated list of NodesStorage metrics.
+
+    Args:
+        fields (str): The metrics to aggregate, or an empty value to aggregate all of them.
+
+    Returns:
+        list[str]: The names of the metrics.
+
+    Raises:
+        ValueError: If any of the metrics does not exist.
+    """
+    if not fields:
+        return list(STORAGE_FIELDS)
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    invalid = [name for name in names if name not in STORAGE_FIELDS]
+    if invalid:
+        raise ValueError(f"Fields {', '.join(invalid)} are not valid, the options are: {', '.join(STORAGE_FIELDS)}")
+    return names
+
+
+def _as_float(value) -> float:
+    """
+    Converts an aggregated value to float, keeping the empty values as None.
+    """
+    return float(value) if value is not None else None
+
+
+def aggregate_readings(queryset: QuerySet[NodesStorage], bucket: str, fields: Iterable[str]) -> list[dict]:
+    """
+    Computes min, max, avg and count per metric of the readings grouped into time buckets.
+
+    Args:
+        queryset (QuerySet[NodesStorage]): The filtered readings to aggregate.
+        bucket (str): The size of the buckets, one of BUCKETS.
+        fields (Iterable[str]): The metrics to aggregate.
+
+    Returns:
+        list[dict]: One dictionary per bucket, ordered by date, with the start of the bucket in 'date_time', the
+            number of readings in 'count' and a dictionary with 'min', 'max' and 'avg' for each metric.
+
+    Raises:
+        ValueError: If the bucket is not valid.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Bucket {bucket} is not valid, the options are: {', '.join(BUCKETS)}")
+
+    fields = list(fields)
+    aggregates = {f'{field}_{name}': function(field) for field in fields for name, function in STATISTICS.items()}
+    rows = (
+        queryset.order_by()
+        .annotate(bucket=Trunc('date_time', bucket))
+        .values('bucket')
+        .annotate(count=Count('id'), **aggregates)
+        .order_by('bucket')
+    )
+    return [
+        {
+            'date_time': row['bucket'],
+            'count': row['count'],
+            **{field: {name: _as_float(row[f'{field}_{name}']) for name in STATISTICS} for field in fields},
+        }
+        for row in rows
+    ]
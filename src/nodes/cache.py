@@ -0,0 +1,201 @@
+"""
+This module contains the response cache of the nodes endpoints.
+
+Every cached response depends on one or more scopes, e.g. the readings of a node. Each scope has a version, the time
+of its last write, that is part of the cache keys, so a write invalidates every cached response of its scopes by
+moving the version forward. The versions are also sent as Last-Modified and, with the query, as the ETag, so the
+clients can revalidate with conditional requests and get a 304 while the data does not change.
+"""
+
+import hashlib
+import math
+import time
+from typing import Callable, Iterable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+NODES_SCOPE = 'nodes'
+STORAGE_SCOPE = 'storage'
+WEATHER_STATION_SCOPE = 'weather_station'
+
+
+def storage_scope(node_id) -> str:
+    """
+    Returns the scope of the readings of a node.
+    """
+    return f'{STORAGE_SCOPE}:{node_id}'
+
+
+def get_cache():
+    """
+    Returns the cache backend configured for the nodes endpoints.
+    """
+    return caches[settings.NODES_CACHE_ALIAS]
+
+
+def _version_key(scope: str) -> str:
+    return f'nodes:version:{scope}'
+
+
+def get_versions(scopes: Iterable[str]) -> dict[str, float]:
+    """
+    Returns the version of every scope, starting the versions that do not exist yet at the current time.
+
+    Args:
+        scopes (Iterable[str]): The scopes of a response.
+
+    Returns:
+        dict[str, float]: The version of each scope.
+    """
+    cache = get_cache()
+    keys = {scope: _version_key(scope) for scope in scopes}
+    stored = cache.get_many(keys.values())
+    versions = {}
+    for scope, key in keys.items():
+        if key not in stored:
+            cache.add(key, time.time(), timeout=None)
+            stored[key] = cache.get(key)
+        versions[scope] = stored[key]
+    return versions
+
+
+def invalidate(*scopes: str) -> None:
+    """
+    Moves the version of the scopes forward once the current transaction is committed, so the responses cached
+    before the write are not used anymore.
+
+    Args:
+        *scopes (str): The scopes that changed.
+    """
+
+    def bump_versions():
+        now = time.time()
+        get_cache().set_many({_version_key(scope): now for scope in scopes}, timeout=None)
+
+    transaction.on_commit(bump_versions)
+
+
+def invalidate_nodes_storage(node_ids: Iterable[int]) -> None:
+    """
+    Invalidates the cached readings of the nodes and the listings of every node.
+
+    Args:
+        node_ids (Iterable[int]): The ids of the nodes with new readings.
+    """
+    invalidate(STORAGE_SCOPE, *(storage_scope(node_id) for node_id in set(node_ids)))
+
+
+def _is_not_modified(request: Request, etag: str, last_modified: int) -> bool:
+    """
+    Returns whether the client copy is still valid, the ETag takes precedence over the date as in RFC 7232.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and if_modified_since >= last_modified
+
+
+def _signature(request: Request, versions: dict[str, float]) -> tuple[str, str, int]:
+    """
+    Returns the digest of the cache key, the ETag and the Last-Modified date of a request.
+    """
+    query = sorted((name, sorted(values)) for name, values in request.query_params.lists())
+    signature = f'{request.get_host()}{request.path}?{query}|{sorted(versions.items())}'
+    digest = hashlib.md5(signature.encode(), usedforsecurity=False).hexdigest()
+    return digest, f'"{digest}"', _last_modified(max(versions.values()))
+
+
+def _last_modified(version: float) -> int:
+    """
+    Returns the Last-Modified date of a version, in whole seconds as the HTTP dates.
+
+    The date is rounded up, so a write in a later second always moves it forward. While the version is in the
+    current second another write can still get the same date, so the date is rounded down until that second ends and
+    the clients that revalidate with If-Modified-Since get the new data.
+    """
+    last_modified = math.ceil(version)
+    return last_modified if time.time() >= last_modified else math.floor(version)
+
+
+def _with_validators(response: Response, etag: str, last_modified: int) -> Response:
+    """
+    Adds the headers to revalidate a cached response.
+    """
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def cached_response(request: Request, scopes: Iterable[str], build: Callable[[], Response]) -> Response:
+    """
+    Returns the response of a GET request from the cache, building and storing it when it is not cached.
+
+    Args:
+        request (Request): The request, its path and normalized query parameters are part of the key.
+        scopes (Iterable[str]): The scopes whose writes invalidate the response.
+        build (Callable[[], Response]): A function that builds the response, only the 200 responses are cached.
+
+    Returns:
+        Response: The response with ETag and Last-Modified headers, or a 304 response if the copy of the client is
+            still valid.
+    """
+    digest, etag, last_modified = _signature(request, get_versions(scopes))
+    if _is_not_modified(request, etag, last_modified):
+        return _with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+    cache = get_cache()
+    key = f'nodes:response:{digest}'
+    data = cache.get(key)
+    if data is not None:
+        return _with_validators(Response(data), etag, last_modified)
+    response = build()
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    cache.set(key, response.data, timeout=settings.NODES_CACHE_TIMEOUT)
+    return _with_validators(response, etag, last_modified)
+
+
+async def aget_versions(scopes: Iterable[str]) -> dict[str, float]:
+    """
+    Same as `get_versions` with the async cache API.
+    """
+    cache = get_cache()
+    keys = {scope: _version_key(scope) for scope in scopes}
+    stored = await cache.aget_many(keys.values())
+    versions = {}
+    for scope, key in keys.items():
+        if key not in stored:
+            await cache.aadd(key, time.time(), timeout=None)
+            stored[key] = await cache.aget(key)
+        versions[scope] = stored[key]
+    return versions
+
+
+async def acached_response(request: Request, scopes: Iterable[str], build: Callable[[], Response]) -> Response:
+    """
+    Same as `cached_response` for the async views, the cache is read with the async API and only the responses that
+    are not cached are built, in a thread with `sync_to_async`.
+    """
+    digest, etag, last_modified = _signature(request, await aget_versions(scopes))
+    if _is_not_modified(request, etag, last_modified):
+        return _with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+    cache = get_cache()
+    key = f'nodes:response:{digest}'
+    data = await cache.aget(key)
+    if data is not None:
+        return _with_validators(Response(data), etag, last_modified)
+    response = await sync_to_async(build)()
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    await cache.aset(key, response.data, timeout=settings.NODES_CACHE_TIMEOUT)
+    return _with_validators(response, etag, last_modified)
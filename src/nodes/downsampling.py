@@ -0,0 +1,122 @@
+"""
+This module contains the server side downsampling of the NodesStorage time series.
+
+The readings of a range are loaded into NumPy arrays and every metric is reduced to at most `max_points` points with
+a shape preserving algorithm, so the size of a chart response does not grow with the range while its peaks are kept:
+
+- lttb: Largest-Triangle-Three-Buckets, keeps from every bucket the point that forms the largest triangle with the
+  point kept before and the average of the next bucket.
+- minmax: keeps the minimum and the maximum of every bucket.
+"""
+
+from typing import Iterable
+
+import numpy as np
+from django.db.models import QuerySet
+
+from nodes.models import NodesStorage
+
+MIN_POINTS = 3
+MAX_POINTS = 10000
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Selects the points of a series with the Largest-Triangle-Three-Buckets algorithm.
+
+    Args:
+        x (np.ndarray): The ascending x values of the series.
+        y (np.ndarray): The y values of the series.
+        max_points (int): The number of points to keep, at least 3.
+
+    Returns:
+        np.ndarray: The ascending indices of the kept points, the first and the last points are always kept.
+    """
+    size = len(x)
+    if max_points >= size:
+        return np.arange(size)
+
+    # The points between the first and the last are split into max_points - 2 buckets
+    edges = np.linspace(1, size - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else size
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Selects the minimum and the maximum of every bucket of a series.
+
+    Args:
+        x (np.ndarray): The ascending x values of the series.
+        y (np.ndarray): The y values of the series.
+        max_points (int): The number of points to keep, two per bucket.
+
+    Returns:
+        np.ndarray: The ascending indices of the kept points.
+    """
+    size = len(x)
+    if max_points >= size:
+        return np.arange(size)
+
+    edges = np.linspace(0, size, max_points // 2 + 1).astype(int)
+    selected = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        values = y[start:end]
+        selected += [start + int(values.argmin()), start + int(values.argmax())]
+    return np.unique(selected)
+
+
+DOWNSAMPLERS = {
+    'lttb': lttb_indices,
+    'minmax': minmax_indices,
+}
+
+
+def downsample_readings(
+    queryset: QuerySet[NodesStorage], fields: Iterable[str], max_points: int, method: str = 'lttb'
+) -> dict[str, dict[str, list]]:
+    """
+    Downsamples every metric of the readings independently.
+
+    Args:
+        queryset (QuerySet[NodesStorage]): The filtered readings.
+        fields (Iterable[str]): The metrics to downsample.
+        max_points (int): The maximum number of points of every metric.
+        method (str): The algorithm, one of DOWNSAMPLERS.
+
+    Returns:
+        dict[str, dict[str, list]]: For each metric, the ascending dates of the kept points in 'date_time' and their
+            values in 'value'.
+
+    Raises:
+        ValueError: If the method or the number of points are not valid.
+    """
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"Method {method} is not valid, the options are: {', '.join(DOWNSAMPLERS)}")
+    if not MIN_POINTS <= max_points <= MAX_POINTS:
+        raise ValueError(f"max_points must be between {MIN_POINTS} and {MAX_POINTS}!")
+
+    fields = list(fields)
+    rows = list(queryset.order_by('date_time').values_list('date_time', *fields))
+    dates = np.array([row[0] for row in rows], dtype=object)
+    x = np.array([row[0].timestamp() for row in rows], dtype=float)
+    values = np.array([row[1:] for row in rows], dtype=float).reshape(len(rows), len(fields))
+
+    results = {}
+    for column, field in enumerate(fields):
+        y = values[:, column]
+        indices = DOWNSAMPLERS[method](x, y, max_points)
+        results[field] = {'date_time': dates[indices].tolist(), 'value': y[indices].tolist()}
+    return results
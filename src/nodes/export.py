@@ -0,0 +1,122 @@
+"""
+This module contains the streaming export of the NodesStorage readings as CSV or NDJSON.
+
+The readings are read as tuples with a server side cursor and written row by row, so the memory used by an export
+does not depend on the size of the range. Under ASGI, Django reads the sync iterators of the streaming responses
+into a list before sending them, so the streams are adapted with `astream` there.
+"""
+
+import csv
+import json
+from itertools import islice
+from typing import AsyncIterator, Iterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import QuerySet
+
+from nodes.models import STORAGE_FIELDS, NodesStorage
+
+EXPORT_COLUMNS: tuple[str, ...] = ('node_id', 'date_time') + STORAGE_FIELDS
+
+EXPORT_FORMATS: dict[str, str] = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+CHUNK_SIZE = 2000
+# Lines sent in every message of the ASGI streams
+LINES_PER_MESSAGE = 500
+
+
+class Echo:
+    """
+    A file-like object that returns the written value instead of storing it, used to stream `csv.writer` output.
+    """
+
+    def write(self, value: str) -> str:
+        """Returns the value to write."""
+        return value
+
+
+def iter_export_rows(queryset: QuerySet[NodesStorage], chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    """
+    Iterates over the readings as tuples ordered by date, without instantiating the models.
+
+    The rows are read from `NODES_EXPORT_DATABASE`, a connection with server side cursors even when the queries of
+    the requests go through PgBouncer.
+
+    Args:
+        queryset (QuerySet[NodesStorage]): The filtered readings to export.
+        chunk_size (int): The number of rows fetched from the database at once.
+
+    Yields:
+        tuple: The values of EXPORT_COLUMNS of a reading.
+    """
+    rows = queryset.using(settings.NODES_EXPORT_DATABASE).order_by('date_time', 'id').values_list(*EXPORT_COLUMNS)
+    yield from rows.iterator(chunk_size=chunk_size)
+
+
+def stream_csv(queryset: QuerySet[NodesStorage], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Streams the readings as CSV lines, starting with the header.
+
+    Args:
+        queryset (QuerySet[NodesStorage]): The filtered readings to export.
+        chunk_size (int): The number of rows fetched from the database at once.
+
+    Yields:
+        str: A CSV line.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for node_id, date_time, *values in iter_export_rows(queryset, chunk_size):
+        yield writer.writerow([node_id, date_time.isoformat(), *values])
+
+
+def stream_ndjson(queryset: QuerySet[NodesStorage], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Streams the readings as newline delimited JSON objects with numeric metrics.
+
+    Args:
+        queryset (QuerySet[NodesStorage]): The filtered readings to export.
+        chunk_size (int): The number of rows fetched from the database at once.
+
+    Yields:
+        str: A JSON object followed by a new line.
+    """
+    for node_id, date_time, *values in iter_export_rows(queryset, chunk_size):
+        reading = {'node_id': node_id, 'date_time': date_time.isoformat()}
+        reading.update(
+            (field, float(value) if value is not None else None) for field, value in zip(STORAGE_FIELDS, values)
+        )
+        yield json.dumps(reading) + '\n'
+
+
+async def astream(lines: Iterator[str], lines_per_message: int = LINES_PER_MESSAGE) -> AsyncIterator[str]:
+    """
+    Adapts a stream for the ASGI responses, the lines are read in a thread a message at a time.
+
+    The thread is the same for the whole stream, so the server side cursor stays in the connection of the request.
+
+    Args:
+        lines (Iterator[str]): The lines of the export.
+        lines_per_message (int): The number of lines sent at once.
+
+    Yields:
+        str: The next lines of the export.
+    """
+    read = sync_to_async(lambda: ''.join(islice(lines, lines_per_message)), thread_sensitive=True)
+    try:
+        while message := await read():
+            yield message
+    finally:
+        # Release the cursor when the client disconnects before the end
+        if hasattr(lines, 'close'):
+            await sync_to_async(lines.close, thread_sensitive=True)()
+
+
+EXPORT_STREAMS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
@@ -0,0 +1,270 @@
+"""
+This module contains the bulk ingestion logic for the readings sent by the nodes.
+
+The readings arrive as semicolon separated lines with the following structure:
+
+    node;date_time;temperature;humidity;pressure;altitude;humidity_hd38;humidity_soil;temperature_soil;
+    conductivity_soil;ph_soil;nitrogen_soil;phosphorus_soil;potassium_soil;battery_level
+
+Instead of probing and inserting every line on its own, the lines are parsed and validated in memory, the duplicates
+are resolved against the (node, date_time) unique constraint with one set-based lookup per batch and the new rows are
+written with a single conflict-ignoring bulk insert.
+"""
+
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from nodes.cache import invalidate_nodes_storage
+from nodes.latest import refresh_latest_readings
+from nodes.live import publish_readings
+from nodes.models import STORAGE_FIELDS, Nodes, NodesStorage
+from nodes.rollups import refresh_rollups_for_readings
+
+# Maximum number of line errors kept in the result, the counters are always complete.
+MAX_REPORTED_ERRORS = 100
+
+
+class IngestionResult:
+    """
+    Counters of an ingestion run.
+
+    Attributes:
+        accepted (int): The number of lines written to the database.
+        duplicates (int): The number of lines skipped because the reading already exists.
+        rejected (int): The number of lines that could not be parsed or validated.
+        errors (list[dict]): The first `MAX_REPORTED_ERRORS` rejected lines with the reason.
+    """
+
+    def __init__(self):
+        self.accepted: int = 0
+        self.duplicates: int = 0
+        self.rejected: int = 0
+        self.errors: list[dict] = []
+
+    def reject(self, line_number: int, error: str) -> None:
+        """
+        Registers a rejected line.
+
+        Args:
+            line_number (int): The number of the line in the source, starting at 1.
+            error (str): The reason why the line was rejected.
+        """
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': error})
+
+    @property
+    def processed(self) -> int:
+        """
+        Returns the number of lines processed so far.
+        """
+        return self.accepted + self.duplicates + self.rejected
+
+    def as_dict(self) -> dict:
+        """
+        Returns the counters as a dictionary ready to be sent in a response.
+        """
+        return {
+            'accepted': self.accepted,
+            'duplicates': self.duplicates,
+            'rejected': self.rejected,
+            'errors': self.errors,
+        }
+
+
+_METRIC_FIELDS = [NodesStorage._meta.get_field(name) for name in STORAGE_FIELDS]
+
+
+def iter_file_lines(document: File) -> Iterator[tuple[int, str]]:
+    """
+    Iterates an uploaded file chunk by chunk as decoded lines, without loading the whole file in memory.
+
+    Args:
+        document (File): The uploaded file.
+
+    Yields:
+        tuple[int, str]: The number of the line, starting at 1, and the decoded line without the line break.
+    """
+    document.seek(0)
+    for line_number, raw_line in enumerate(document, start=1):
+        line: str = raw_line.decode('utf-8', errors='replace').lstrip('\ufeff').rstrip('\r\n')
+        yield line_number, line
+
+
+def parse_storage_line(line: str) -> dict:
+    """
+    Parses and validates one semicolon separated reading.
+
+    Args:
+        line (str): The line to parse.
+
+    Returns:
+        dict: The reading with the keys 'node_id', 'date_time' and one key for each field in `STORAGE_FIELDS`.
+
+    Raises:
+        ValueError: If the line does not have the expected format or any value is not valid.
+    """
+    data: list[str] = line.strip().split(';')
+    if len(data) < len(STORAGE_FIELDS) + 2:
+        raise ValueError('Format data is not correct!')
+
+    try:
+        node_id = int(data[0])
+    except ValueError as error:
+        raise ValueError(f'Node "{data[0]}" is not a valid id!') from error
+
+    date_time: Optional[datetime] = parse_datetime(data[1].strip())
+    if date_time is None:
+        raise ValueError(f'Date "{data[1]}" is not a valid date time!')
+    if timezone.is_naive(date_time):
+        date_time = timezone.make_aware(date_time)
+
+    reading: dict = {'node_id': node_id, 'date_time': date_time}
+    for field, raw_value in zip(_METRIC_FIELDS, data[2:]):
+        try:
+            value = field.to_python(raw_value.strip())
+            if value is None:
+                raise ValidationError('This field is required.')
+            field.run_validators(value)
+        except ValidationError as error:
+            raise ValueError(f'{field.name}: {" ".join(error.messages)}') from error
+        reading[field.name] = value
+    return reading
+
+
+def import_txt_document(
+    document: File, batch_size: int, on_flush: Optional[Callable[[IngestionResult], None]] = None
+) -> IngestionResult:
+    """
+    Streams a .txt file exported from the SD card of a node and stores its readings in batches.
+
+    Args:
+        document (File): The file to import, the header line starting with ID_NODO is skipped.
+        batch_size (int): The number of readings written in each bulk insert.
+        on_flush (Callable, optional): A function called with the partial result after every batch.
+
+    Returns:
+        IngestionResult: The accepted, duplicate and rejected counts of the lines in the file.
+    """
+    ingestor = NodesStorageIngestor(batch_size=batch_size, on_flush=on_flush)
+    for line_number, line in iter_file_lines(document):
+        if not line.strip() or line.startswith('ID_NODO'):
+            continue
+        ingestor.add_line(line_number, line)
+    ingestor.flush()
+    return ingestor.result
+
+
+class NodesStorageIngestor:
+    """
+    Accumulates readings and writes them to the NodesStorage table in batches.
+
+    Each flush resolves the nodes and the already stored readings with one query each and inserts the new rows with
+    one `bulk_create(..., ignore_conflicts=True)` inside a transaction, where the hourly and daily rollups of the
+    touched buckets and the latest reading of the nodes are refreshed too. The node lookups are cached for the whole
+    lifetime of the ingestor.
+
+    Attributes:
+        batch_size (int, optional): The number of pending readings that triggers a flush. If None, the readings are
+            only written when `flush` is called.
+        on_flush (Callable, optional): A function called with the result after every flush, e.g. to report progress.
+        result (IngestionResult): The counters of the ingestion.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, on_flush: Optional[Callable[[IngestionResult], None]] = None):
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self.result = IngestionResult()
+        self._pending: dict[tuple[int, datetime], tuple[int, dict]] = {}
+        self._nodes: dict[int, bool] = {}
+
+    def add_line(self, line_number: int, line: str) -> None:
+        """
+        Parses a line and queues the reading to be written on the next flush.
+
+        Args:
+            line_number (int): The number of the line in the source, used to report errors.
+            line (str): The semicolon separated reading.
+        """
+        try:
+            reading = parse_storage_line(line)
+        except ValueError as error:
+            self.result.reject(line_number, str(error))
+            return
+
+        key = (reading['node_id'], reading['date_time'])
+        if key in self._pending:
+            self.result.duplicates += 1
+            return
+        self._pending[key] = (line_number, reading)
+
+        if self.batch_size and len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> list[NodesStorage]:
+        """
+        Writes the pending readings to the database.
+
+        Returns:
+            list[NodesStorage]: The instances sent to the database in this flush.
+        """
+        if not self._pending:
+            return []
+        pending, self._pending = self._pending, {}
+
+        self._resolve_nodes({node_id for node_id, _ in pending})
+        existing = self._existing_keys(pending.keys())
+
+        rows: list[NodesStorage] = []
+        for key, (line_number, reading) in pending.items():
+            if not self._nodes[key[0]]:
+                self.result.reject(line_number, f'Node with id {key[0]} does not exist!')
+            elif key in existing:
+                self.result.duplicates += 1
+            else:
+                rows.append(NodesStorage(**reading))
+
+        with transaction.atomic():
+            NodesStorage.objects.bulk_create(rows, ignore_conflicts=True)
+            if settings.NODES_ROLLUPS_ENABLED and rows:
+                refresh_rollups_for_readings(rows)
+            if rows:
+                refresh_latest_readings(rows)
+                invalidate_nodes_storage(row.node_id for row in rows)
+                publish_readings(rows)
+        self.result.accepted += len(rows)
+        if self.on_flush:
+            self.on_flush(self.result)
+        return rows
+
+    def _resolve_nodes(self, node_ids: set[int]) -> None:
+        """
+        Loads into the cache the nodes that were not looked up before.
+        """
+        missing = node_ids - self._nodes.keys()
+        if not missing:
+            return
+        found = set(Nodes.objects.filter(id__in=missing).values_list('id', flat=True))
+        for node_id in missing:
+            self._nodes[node_id] = node_id in found
+
+    @staticmethod
+    def _existing_keys(keys) -> set[tuple[int, datetime]]:
+        """
+        Returns the (node, date_time) pairs of the given keys that are already stored.
+        """
+        node_ids = {node_id for node_id, _ in keys}
+        dates = [date_time for _, date_time in keys]
+        stored = (
+            NodesStorage.objects.filter(node_id__in=node_ids, date_time__range=(min(dates), max(dates)))
+            .order_by()
+            .values_list('node_id', 'date_time')
+        )
+        return set(stored) & set(keys)
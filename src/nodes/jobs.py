@@ -0,0 +1,196 @@
+"""
+This module contains the database-backed queue used to import the sensor files in background.
+
+The uploads are stored as pending ImportJob rows and the workers started with the `run_import_worker` management
+command claim them with `SELECT ... FOR UPDATE SKIP LOCKED`, so several workers can run in parallel on separate
+processes without processing the same job twice.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from nodes.ingestion import IngestionResult, import_txt_document
+from nodes.models import ImportJob
+from nodes.serializers import WeatherStationSerializer
+from nodes.utils import excel_row_count
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_import(kind: str, document: UploadedFile) -> ImportJob:
+    """
+    Stores the uploaded file and creates a pending import job for it.
+
+    Args:
+        kind (str): The kind of import, one of ImportJob.KIND_CHOICES.
+        document (UploadedFile): The uploaded file.
+
+    Returns:
+        ImportJob: The created job.
+    """
+    return ImportJob.objects.create(kind=kind, document=document)
+
+
+def claim_next_job(worker: str) -> Optional[ImportJob]:
+    """
+    Claims the oldest pending job, skipping the ones locked by other workers.
+
+    The running jobs without progress for `NODES_IMPORT_STALE_AFTER` seconds, e.g. because their worker crashed, are
+    claimed again and imported from the start, the readings already stored are skipped as duplicates.
+
+    Args:
+        worker (str): The name of the worker claiming the job.
+
+    Returns:
+        ImportJob or None: The claimed job, already marked as running, or None if the queue is empty.
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.NODES_IMPORT_STALE_AFTER)
+    with transaction.atomic():
+        job: Optional[ImportJob] = (
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=ImportJob.PENDING) | Q(status=ImportJob.RUNNING, updated_at__lt=stale_before))
+            .filter(is_active=True)
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        if job.status == ImportJob.RUNNING:
+            logger.warning('Import job %s of worker %s is stale, claiming it again', job.pk, job.worker)
+        job.status = ImportJob.RUNNING
+        job.worker = worker
+        job.started_at = timezone.now()
+        job.processed_rows = job.accepted_rows = job.duplicate_rows = job.rejected_rows = 0
+        job.save(
+            update_fields=[
+                'status',
+                'worker',
+                'started_at',
+                'processed_rows',
+                'accepted_rows',
+                'duplicate_rows',
+                'rejected_rows',
+                'updated_at',
+            ]
+        )
+    return job
+
+
+def count_lines(job: ImportJob) -> int:
+    """
+    Counts the lines of the job document reading it in chunks.
+    """
+    with job.document.open('rb') as document:
+        return sum(chunk.count(b'\n') for chunk in document.chunks())
+
+
+def _progress_callback(job: ImportJob) -> Callable[[IngestionResult], None]:
+    """
+    Returns a function that stores the partial counters of the job after every batch.
+    """
+
+    def update_progress(result: IngestionResult) -> None:
+        ImportJob.objects.filter(pk=job.pk).update(
+            processed_rows=result.processed,
+            accepted_rows=result.accepted,
+            duplicate_rows=result.duplicates,
+            rejected_rows=result.rejected,
+            updated_at=timezone.now(),
+        )
+
+    return update_progress
+
+
+def _import_nodes_storage_txt(job: ImportJob) -> IngestionResult:
+    """
+    Imports a nodes storage .txt job.
+    """
+    job.total_rows = count_lines(job)
+    job.save(update_fields=['total_rows', 'updated_at'])
+    with job.document.open('rb') as document:
+        return import_txt_document(document, settings.NODES_IMPORT_BATCH_SIZE, _progress_callback(job))
+
+
+def _import_weather_station(job: ImportJob) -> IngestionResult:
+    """
+    Imports a weather station .xlsx job.
+    """
+    with job.document.open('rb') as document:
+        job.total_rows = excel_row_count(document)
+    job.save(update_fields=['total_rows', 'updated_at'])
+
+    result = IngestionResult()
+    update_progress = _progress_callback(job)
+
+    def on_batch(created: list) -> None:
+        inserted = sum(1 for instance in created if instance is not None)
+        result.accepted += inserted
+        result.duplicates += len(created) - inserted
+        update_progress(result)
+
+    with job.document.open('rb') as document:
+        WeatherStationSerializer(context={'on_batch': on_batch}).create({'document': document})
+    return result
+
+
+IMPORTERS: dict[str, Callable[[ImportJob], IngestionResult]] = {
+    ImportJob.NODES_STORAGE_TXT: _import_nodes_storage_txt,
+    ImportJob.WEATHER_STATION: _import_weather_station,
+}
+
+
+def run_job(job: ImportJob) -> ImportJob:
+    """
+    Runs a claimed job and stores its final status, counters and errors. The document is deleted once the job
+    finishes.
+
+    Args:
+        job (ImportJob): The job to run, previously claimed with `claim_next_job`.
+
+    Returns:
+        ImportJob: The finished job.
+    """
+    try:
+        result = IMPORTERS[job.kind](job)
+    except Exception as error:  # pylint: disable=broad-except
+        logger.exception('Import job %s failed', job.pk)
+        job.refresh_from_db(fields=['total_rows', 'processed_rows', 'accepted_rows', 'duplicate_rows', 'rejected_rows'])
+        job.status = ImportJob.FAILED
+        job.errors = [{'error': str(error)}]
+    else:
+        job.status = ImportJob.SUCCEEDED
+        job.processed_rows = result.processed
+        job.accepted_rows = result.accepted
+        job.duplicate_rows = result.duplicates
+        job.rejected_rows = result.rejected
+        job.errors = result.errors
+    job.finished_at = timezone.now()
+    try:
+        job.document.delete(save=False)
+    except OSError:
+        logger.warning('Could not delete the document of import job %s', job.pk, exc_info=True)
+    job.save()
+    return job
+
+
+def run_next_job(worker: str) -> Optional[ImportJob]:
+    """
+    Claims and runs the oldest pending job.
+
+    Args:
+        worker (str): The name of the worker.
+
+    Returns:
+        ImportJob or None: The finished job, or None if the queue is empty.
+    """
+    job = claim_next_job(worker)
+    if job is None:
+        return None
+    return run_job(job)
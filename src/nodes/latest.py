@@ -0,0 +1,65 @@
+"""
+This module maintains the snapshot of the last reading of every node.
+"""
+
+from datetime import datetime
+from functools import reduce
+from operator import or_
+from typing import Iterable
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from nodes.models import NodesLatestReading, NodesStorage
+
+
+def refresh_latest_readings(readings: Iterable[NodesStorage]) -> int:
+    """
+    Points the snapshot of the nodes to the newest of the stored readings when it is newer than the current one.
+
+    The date of the current snapshot is compared by the upsert itself, so a batch of older readings that commits
+    concurrently with a newer one never moves the snapshot back.
+
+    Args:
+        readings (Iterable[NodesStorage]): The readings that were stored.
+
+    Returns:
+        int: The number of snapshots written.
+    """
+    newest: dict[int, datetime] = {}
+    for reading in readings:
+        if reading.node_id not in newest or reading.date_time > newest[reading.node_id]:
+            newest[reading.node_id] = reading.date_time
+
+    current = dict(NodesLatestReading.objects.filter(node_id__in=newest).values_list('node_id', 'date_time'))
+    changed = {
+        node_id: date_time
+        for node_id, date_time in newest.items()
+        if node_id not in current or date_time > current[node_id]
+    }
+    if not changed:
+        return 0
+
+    # The readings inserted in bulk do not have their id, it is looked up with their (node, date_time) key
+    keys = reduce(or_, (Q(node_id=node_id, date_time=date_time) for node_id, date_time in changed.items()))
+    snapshots = sorted(NodesStorage.objects.filter(keys).values_list('node_id', 'id', 'date_time'))
+    if not snapshots:
+        return 0
+
+    # The snapshot read above may be outdated by a concurrent transaction, so the database only replaces the snapshots
+    # that are older than the new reading
+    table = connection.ops.quote_name(NodesLatestReading._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    params = []
+    for node_id, reading_id, date_time in snapshots:
+        params += [node_id, reading_id, connection.ops.adapt_datetimefield_value(date_time), now, now, True]
+    values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(snapshots))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (node_id, reading_id, date_time, created_at, updated_at, is_active) VALUES {values} '
+            'ON CONFLICT (node_id) DO UPDATE SET reading_id = EXCLUDED.reading_id, date_time = EXCLUDED.date_time, '
+            f'updated_at = EXCLUDED.updated_at WHERE EXCLUDED.date_time > {table}.date_time',
+            params,
+        )
+        return cursor.rowcount
@@ -0,0 +1,282 @@
+"""
+This module contains the fanout of the new NodesStorage readings to the live stream subscribers.
+
+The readings are published once their transaction is committed and delivered to the subscribers of the process
+through asyncio queues. The backend is configured in `NODES_LIVE_FANOUT`:
+
+- nodes.live.InMemoryFanout: delivers the readings published by the same process, e.g. with one ASGI server.
+- nodes.live.PostgresNotifyFanout: publishes the readings with NOTIFY and every process LISTENs for them, so the
+  readings stored by other processes, e.g. the import workers, are delivered too.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Iterable, Optional
+
+import psycopg2
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from nodes.models import STORAGE_FIELDS, NodesStorage
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    A subscriber of the readings of some nodes, bound to the event loop that consumes its queue.
+
+    Attributes:
+        node_ids (set[int], optional): The nodes to receive, or None to receive every node.
+        queue (asyncio.Queue): The queue of pending readings.
+        loop (asyncio.AbstractEventLoop): The event loop of the consumer.
+    """
+
+    def __init__(self, node_ids: Optional[set[int]], max_size: int):
+        self.node_ids = node_ids
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.loop = asyncio.get_running_loop()
+
+    def wants(self, reading: dict) -> bool:
+        """
+        Returns whether the subscriber receives the reading.
+        """
+        return self.node_ids is None or reading['node'] in self.node_ids
+
+    def deliver(self, reading: dict) -> None:
+        """
+        Queues the reading, the readings of a subscriber that does not keep up are dropped.
+        """
+        try:
+            self.queue.put_nowait(reading)
+        except asyncio.QueueFull:
+            logger.warning('Live stream subscriber is full, dropping a reading of node %s', reading['node'])
+
+
+class InMemoryFanout:
+    """
+    Delivers the published readings to the subscribers of the same process.
+    """
+
+    max_queue_size = 1000
+
+    def __init__(self):
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, node_ids: Optional[Iterable[int]] = None) -> Subscription:
+        """
+        Registers a subscriber, it must be called from the event loop that reads the queue.
+
+        Args:
+            node_ids (Iterable[int], optional): The nodes to receive, or None to receive every node.
+
+        Returns:
+            Subscription: The subscription with the queue of readings.
+        """
+        subscription = Subscription(set(node_ids) if node_ids else None, self.max_queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Removes a subscriber.
+        """
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def dispatch(self, readings: list[dict]) -> None:
+        """
+        Delivers the readings to the subscribers of this process, it can be called from any thread.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            for reading in readings:
+                if not subscription.wants(reading):
+                    continue
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, reading)
+                except RuntimeError:
+                    # The event loop of the subscriber was closed without unsubscribing
+                    self.unsubscribe(subscription)
+                    break
+
+    def publish(self, readings: list[dict]) -> None:
+        """
+        Publishes committed readings.
+        """
+        self.dispatch(readings)
+
+
+class PostgresNotifyFanout(InMemoryFanout):
+    """
+    Publishes the readings with PostgreSQL NOTIFY and delivers the notifications received by a LISTEN connection to
+    the subscribers of this process.
+    """
+
+    channel = 'nodes_readings'
+    # NOTIFY payloads must be shorter than 8000 bytes
+    max_payload_size = 7900
+    reconnect_delay = 5
+
+    def __init__(self):
+        super().__init__()
+        self._listener: Optional[threading.Thread] = None
+
+    def subscribe(self, node_ids: Optional[Iterable[int]] = None) -> Subscription:
+        """
+        Registers a subscriber and starts the listener thread of the process on the first subscription.
+        """
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='nodes-live-listener', daemon=True)
+                self._listener.start()
+        return super().subscribe(node_ids)
+
+    def publish(self, readings: list[dict]) -> None:
+        """
+        Sends the readings in as few notifications as their size allows, with one query.
+        """
+        payloads: list[str] = []
+        chunk: list[str] = []
+        size = 2
+        for encoded in (json.dumps(reading) for reading in readings):
+            if chunk and size + len(encoded) + 1 > self.max_payload_size:
+                payloads.append(f"[{','.join(chunk)}]")
+                chunk, size = [], 2
+            chunk.append(encoded)
+            size += len(encoded) + 1
+        if chunk:
+            payloads.append(f"[{','.join(chunk)}]")
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload', [self.channel, payloads])
+
+    def _listen(self) -> None:
+        """
+        Receives the notifications of the channel with a dedicated connection and dispatches them, reconnecting when
+        the connection is lost.
+        """
+        while True:
+            try:
+                self._listen_connection()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Live stream listener disconnected, reconnecting')
+                time.sleep(self.reconnect_delay)
+
+    def _listen_connection(self) -> None:
+        """
+        Opens a connection that LISTENs to the channel and dispatches its notifications until it fails.
+
+        LISTEN needs a session of its own, so it connects directly to PostgreSQL even when the queries go through
+        PgBouncer.
+        """
+        database = settings.DATABASES['default']
+        listener = psycopg2.connect(
+            host=settings.DB_DIRECT_HOST,
+            port=settings.DB_DIRECT_PORT,
+            dbname=database['NAME'],
+            user=database['USER'],
+            password=database['PASSWORD'],
+        )
+        try:
+            listener.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with listener.cursor() as cursor:
+                cursor.execute(f'LISTEN {self.channel}')
+            while True:
+                if select.select([listener], [], [], 60) == ([], [], []):
+                    continue
+                listener.poll()
+                while listener.notifies:
+                    self.dispatch(json.loads(listener.notifies.pop(0).payload))
+        finally:
+            listener.close()
+
+
+@lru_cache(maxsize=None)
+def get_fanout() -> InMemoryFanout:
+    """
+    Returns the fanout backend of the process configured in `NODES_LIVE_FANOUT`.
+    """
+    return import_string(settings.NODES_LIVE_FANOUT)()
+
+
+def reading_event(reading: NodesStorage) -> dict:
+    """
+    Returns the JSON serializable event of a reading.
+    """
+    event = {'node': reading.node_id, 'date_time': reading.date_time.isoformat()}
+    event.update((field, float(getattr(reading, field))) for field in STORAGE_FIELDS)
+    return event
+
+
+def publish_readings(readings: Iterable[NodesStorage]) -> None:
+    """
+    Publishes the readings to the live stream once the current transaction is committed.
+
+    Args:
+        readings (Iterable[NodesStorage]): The readings that were stored.
+    """
+    events = [reading_event(reading) for reading in readings]
+    if events:
+        transaction.on_commit(lambda: get_fanout().publish(events))
+
+
+async def stream_events(
+    node_ids: Optional[set[int]],
+    heartbeat: float,
+    max_lifetime: float,
+    disconnected: Optional[asyncio.Event] = None,
+) -> AsyncIterator[str]:
+    """
+    Streams the readings of the nodes as server-sent events until the client disconnects or the stream expires.
+
+    Django 4.2 does not stop a streaming response when its client disconnects, so the stream also ends after
+    `max_lifetime` seconds and the EventSource of the client reconnects, the subscriptions of the closed clients are
+    released at the latest then.
+
+    Args:
+        node_ids (set[int], optional): The nodes to receive, or None to receive every node.
+        heartbeat (float): The seconds without readings after which a comment is sent to keep the connection open.
+        max_lifetime (float): The seconds after which the stream ends.
+        disconnected (asyncio.Event, optional): An event set when the client disconnects.
+
+    Yields:
+        str: A server-sent event with one reading, or a keep-alive comment.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_lifetime
+    fanout = get_fanout()
+    subscription = fanout.subscribe(node_ids)
+    disconnect = asyncio.ensure_future(disconnected.wait()) if disconnected else None
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            reading = asyncio.ensure_future(subscription.queue.get())
+            await asyncio.wait(
+                {reading, disconnect} if disconnect else {reading},
+                timeout=min(heartbeat, remaining),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not reading.done():
+                reading.cancel()
+            if disconnect and disconnect.done():
+                break
+            if reading.done() and not reading.cancelled():
+                yield f'event: reading\ndata: {json.dumps(reading.result())}\n\n'
+            elif deadline > loop.time():
+                yield ': keep-alive\n\n'
+    finally:
+        fanout.unsubscribe(subscription)
+        if disconnect:
+            disconnect.cancel()
@@ -0,0 +1,63 @@
+"""
+Django command to backfill and rebuild the hourly and daily rollups of the nodes readings.
+"""
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils.timezone import make_aware
+
+from nodes.models import Nodes, NodesStorage, NodesStorageRollup
+from nodes.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    """
+    Django command to rebuild the rollups of the nodes from their raw readings.
+
+    The readings are processed per node in windows of days, so the command can backfill large tables.
+    """
+
+    help = 'Backfills and rebuilds the hourly and daily rollups of the nodes readings.'
+
+    def add_arguments(self, parser):
+        """Arguments of the command."""
+        parser.add_argument('--node', type=int, action='append', dest='nodes', help='Id of the node to rebuild.')
+        parser.add_argument('--start', help='First day to rebuild in the format YYYY-MM-DD.')
+        parser.add_argument('--end', help='Last day to rebuild in the format YYYY-MM-DD.')
+        parser.add_argument('--window-days', type=int, default=30, help='Days of readings processed at once.')
+        parser.add_argument('--clear', action='store_true', help='Delete the rollups of the range before rebuilding.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            start = make_aware(datetime.strptime(options['start'], '%Y-%m-%d')) if options['start'] else None
+            end = make_aware(datetime.strptime(options['end'], '%Y-%m-%d')) if options['end'] else None
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+
+        nodes = Nodes.objects.all()
+        if options['nodes']:
+            nodes = nodes.filter(id__in=options['nodes'])
+
+        window = timedelta(days=options['window_days'])
+        for node in nodes:
+            readings = NodesStorage.objects.filter(node=node, is_active=True)
+            bounds = readings.aggregate(first=Min('date_time'), last=Max('date_time'))
+            if bounds['first'] is None:
+                continue
+            first = max(bounds['first'], start) if start else bounds['first']
+            last = min(bounds['last'], end + timedelta(days=1, microseconds=-1)) if end else bounds['last']
+
+            if options['clear']:
+                NodesStorageRollup.objects.filter(node=node, bucket__gte=start or first, bucket__lte=last).delete()
+
+            written = 0
+            window_start = first
+            while window_start <= last:
+                window_end = min(window_start + window, last)
+                with transaction.atomic():
+                    written += refresh_rollups(node.id, window_start, window_end)
+                window_start = window_end + timedelta(microseconds=1)
+            self.stdout.write(self.style.SUCCESS(f'Node {node.pk}: {written} rollups written.'))
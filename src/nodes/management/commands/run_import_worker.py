@@ -0,0 +1,53 @@
+"""
+Django command to run a worker that processes the queued sensor file imports.
+"""
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from nodes.jobs import run_next_job
+
+
+class Command(BaseCommand):
+    """
+    Django command to process the pending import jobs.
+
+    Several workers can run at the same time on separate processes, each job is claimed by only one of them.
+    """
+
+    help = 'Processes the pending sensor file imports. Start several instances to import files in parallel.'
+
+    def add_arguments(self, parser):
+        """Arguments of the command."""
+        parser.add_argument('--once', action='store_true', help='Process the pending jobs and exit.')
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0, help='Seconds to wait when there are no pending jobs.'
+        )
+        parser.add_argument('--name', default=None, help='Name of the worker, defaults to <hostname>:<pid>.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        worker = options['name'] or f'{socket.gethostname()}:{os.getpid()}'
+        self.stdout.write(f'Import worker {worker} waiting for jobs...')
+        try:
+            while True:
+                # The worker never finishes a request, so the connections are recycled here as at the end of one
+                close_old_connections()
+                job = run_next_job(worker)
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                style = self.style.SUCCESS if job.status == job.SUCCEEDED else self.style.ERROR
+                self.stdout.write(
+                    style(
+                        f'Job {job.pk} {job.status}: {job.accepted_rows} accepted, {job.duplicate_rows} duplicates, '
+                        f'{job.rejected_rows} rejected in {job.duration:.2f}s'
+                    )
+                )
+        except KeyboardInterrupt:
+            self.stdout.write('Import worker stopped.')
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0006_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodesStorageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, default=None, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('resolution', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=10)),
+                ('bucket', models.DateTimeField()),
+                ('metric', models.CharField(max_length=50)),
+                ('min', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('max', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('sum', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('count', models.PositiveIntegerField()),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='nodes.nodes')),
+            ],
+            options={
+                'db_table': 'nodes_storage_rollup',
+                'ordering': ['-bucket'],
+                'unique_together': {('node', 'resolution', 'bucket', 'metric')},
+            },
+        ),
+    ]
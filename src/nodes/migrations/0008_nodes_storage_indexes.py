@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:55
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    # Build the index without locking the writes of the table in PostgreSQL, the other databases use a plain index
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+def create_brin_index(apps, schema_editor):
+    # BRIN indexes only exist in PostgreSQL, the readings are inserted in date order so they stay small and precise
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS nodes_storage_date_time_brin ON nodes_storage USING brin (date_time)'
+        )
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS nodes_storage_date_time_brin')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('nodes', '0007_nodesstoragerollup'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='nodesstorage',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['node', '-date_time'], name='nodes_storage_active_node'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='nodesstorage',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-date_time'], name='nodes_storage_active_date'),
+        ),
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
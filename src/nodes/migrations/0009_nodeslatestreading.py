@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_latest_readings(apps, schema_editor):
+    Nodes = apps.get_model('nodes', 'Nodes')
+    NodesStorage = apps.get_model('nodes', 'NodesStorage')
+    NodesLatestReading = apps.get_model('nodes', 'NodesLatestReading')
+
+    latest = NodesStorage.objects.filter(node=models.OuterRef('pk'), is_active=True).order_by('-date_time')
+    nodes = Nodes.objects.annotate(reading_id=models.Subquery(latest.values('id')[:1])).filter(reading_id__isnull=False)
+    readings = NodesStorage.objects.in_bulk([node.reading_id for node in nodes])
+    NodesLatestReading.objects.bulk_create(
+        [
+            NodesLatestReading(node_id=reading.node_id, reading=reading, date_time=reading.date_time)
+            for reading in readings.values()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0008_nodes_storage_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodesLatestReading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, default=None, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('date_time', models.DateTimeField()),
+                ('node', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='latest_reading', to='nodes.nodes')),
+                ('reading', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nodes.nodesstorage')),
+            ],
+            options={
+                'db_table': 'nodes_latest_reading',
+            },
+        ),
+        migrations.RunPython(create_latest_readings, migrations.RunPython.noop),
+    ]
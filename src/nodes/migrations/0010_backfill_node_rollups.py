@@ -0,0 +1,86 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:40
+
+from django.db import migrations
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import Trunc
+
+# The metrics of the readings when the rollups were added
+STORAGE_FIELDS = (
+    'temperature',
+    'humidity',
+    'pressure',
+    'altitude',
+    'humidity_hd38',
+    'humidity_soil',
+    'temperature_soil',
+    'conductivity_soil',
+    'ph_soil',
+    'nitrogen_soil',
+    'phosphorus_soil',
+    'potassium_soil',
+    'battery_level',
+)
+BATCH_SIZE = 5000
+
+
+def backfill_rollups(apps, schema_editor):
+    # The rollups are only maintained for the readings stored after 0007, so the existing readings are summarized here
+    NodesStorage = apps.get_model('nodes', 'NodesStorage')
+    NodesStorageRollup = apps.get_model('nodes', 'NodesStorageRollup')
+
+    aggregates = {}
+    for field in STORAGE_FIELDS:
+        aggregates[f'{field}_min'] = Min(field)
+        aggregates[f'{field}_max'] = Max(field)
+        aggregates[f'{field}_sum'] = Sum(field)
+
+    def write(rollups):
+        NodesStorageRollup.objects.bulk_create(
+            rollups,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['node', 'resolution', 'bucket', 'metric'],
+            update_fields=['min', 'max', 'sum', 'count', 'updated_at'],
+        )
+
+    node_ids = NodesStorage.objects.filter(is_active=True).order_by().values_list('node_id', flat=True).distinct()
+    for node_id in list(node_ids):
+        for resolution in ('hour', 'day'):
+            rows = (
+                NodesStorage.objects.filter(node_id=node_id, is_active=True)
+                .order_by()
+                .annotate(bucket=Trunc('date_time', resolution))
+                .values('bucket')
+                .annotate(count=Count('id'), **aggregates)
+            )
+            rollups = []
+            for row in rows.iterator(chunk_size=2000):
+                rollups += [
+                    NodesStorageRollup(
+                        node_id=node_id,
+                        resolution=resolution,
+                        bucket=row['bucket'],
+                        metric=field,
+                        min=row[f'{field}_min'],
+                        max=row[f'{field}_max'],
+                        sum=row[f'{field}_sum'],
+                        count=row['count'],
+                    )
+                    for field in STORAGE_FIELDS
+                ]
+                if len(rollups) >= BATCH_SIZE:
+                    write(rollups)
+                    rollups = []
+            if rollups:
+                write(rollups)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0009_nodeslatestreading'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
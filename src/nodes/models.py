@@ -2,7 +2,10 @@
 File that contains the Django models for the nodes app.
 """
 
+from typing import Union
+
 from django.db import models
+from django.utils import timezone
 
 from core.models import BaseModel
 
@@ -44,6 +47,24 @@ class Nodes(BaseModel):
         return self.name
 
 
+# Metrics measured by the nodes, stored in the NodesStorage fields with the same name
+STORAGE_FIELDS: tuple[str, ...] = (
+    'temperature',
+    'humidity',
+    'pressure',
+    'altitude',
+    'humidity_hd38',
+    'humidity_soil',
+    'temperature_soil',
+    'conductivity_soil',
+    'ph_soil',
+    'nitrogen_soil',
+    'phosphorus_soil',
+    'potassium_soil',
+    'battery_level',
+)
+
+
 class NodesStorage(BaseModel):
     """
     A Django model that represents a storage table for node data.
@@ -90,6 +111,13 @@ class NodesStorage(BaseModel):
         db_table = 'nodes_storage'
         ordering = ['-date_time']
         unique_together = ['node', 'date_time']
+        indexes = [
+            # Partial indexes on the active readings, matching the filters and ordering of NodesStorageView
+            models.Index(
+                fields=['node', '-date_time'], name='nodes_storage_active_node', condition=models.Q(is_active=True)
+            ),
+            models.Index(fields=['-date_time'], name='nodes_storage_active_date', condition=models.Q(is_active=True)),
+        ]
 
 
 class WeatherStation(BaseModel):
@@ -147,3 +175,150 @@ class WeatherStation(BaseModel):
 
         db_table = 'weather_station'
         ordering = ['-date']
+
+
+class ImportJob(BaseModel):
+    """
+    A Django model that represents a sensor file import processed in background by the import workers.
+
+    The table works as a database-backed queue: the uploads create pending jobs and the workers started with the
+    `run_import_worker` command claim them one at a time, so no external broker is required.
+
+    Fields:
+    - kind: The type of file to import (nodes storage .txt or weather station .xlsx).
+    - status: The status of the job (pending, running, succeeded or failed).
+    - document: The uploaded file to import.
+    - total_rows: The number of rows in the file, known once the worker starts the job.
+    - processed_rows: The number of rows processed so far.
+    - accepted_rows: The number of rows stored in the database.
+    - duplicate_rows: The number of rows skipped because they were already stored.
+    - rejected_rows: The number of rows that could not be parsed or validated.
+    - errors: A JSONField with the errors found during the import.
+    - worker: The name of the worker that processed the job.
+    - started_at: The date and time when a worker claimed the job.
+    - finished_at: The date and time when the job finished.
+    """
+
+    NODES_STORAGE_TXT = 'nodes_storage_txt'
+    WEATHER_STATION = 'weather_station'
+    KIND_CHOICES = (
+        (NODES_STORAGE_TXT, 'Nodes storage txt'),
+        (WEATHER_STATION, 'Weather station'),
+    )
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    )
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    document = models.FileField(upload_to='imports/%Y/%m/%d/')
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    processed_rows = models.PositiveIntegerField(default=0)
+    accepted_rows = models.PositiveIntegerField(default=0)
+    duplicate_rows = models.PositiveIntegerField(default=0)
+    rejected_rows = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    worker = models.CharField(max_length=255, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        """
+        Meta class for the ImportJob model.
+        """
+
+        db_table = 'import_jobs'
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'created_at'], name='import_jobs_status_created')]
+
+    def __str__(self):
+        """
+        Returns a string representation of the import job.
+        """
+        return f'{self.get_kind_display()} import {self.pk} ({self.status})'
+
+    @property
+    def duration(self) -> Union[float, None]:
+        """
+        Returns the seconds the job has been running, or took to finish, or None if it has not started.
+        """
+        if not self.started_at:
+            return None
+        return ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+
+
+class NodesStorageRollup(BaseModel):
+    """
+    A Django model that stores the readings of a node summarized per hour or per day and per metric.
+
+    The rollups are refreshed every time new readings are stored and can be rebuilt with the `rebuild_node_rollups`
+    command, so the long-range aggregations read a few rows per bucket instead of scanning the raw readings.
+
+    Fields:
+    - node: A foreign key to the Nodes model, representing the associated node.
+    - resolution: The size of the bucket (hour or day).
+    - bucket: The start of the bucket.
+    - metric: The name of the NodesStorage field summarized.
+    - min: The minimum value of the metric in the bucket.
+    - max: The maximum value of the metric in the bucket.
+    - sum: The sum of the values of the metric in the bucket.
+    - count: The number of readings in the bucket.
+    """
+
+    HOUR = 'hour'
+    DAY = 'day'
+    RESOLUTION_CHOICES = (
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+    )
+
+    node = models.ForeignKey(Nodes, on_delete=models.CASCADE)
+    resolution = models.CharField(max_length=10, choices=RESOLUTION_CHOICES)
+    bucket = models.DateTimeField()
+    metric = models.CharField(max_length=50)
+    min = models.DecimalField(max_digits=10, decimal_places=2)
+    max = models.DecimalField(max_digits=10, decimal_places=2)
+    sum = models.DecimalField(max_digits=20, decimal_places=2)
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        """
+        Meta class for the NodesStorageRollup model.
+        """
+
+        db_table = 'nodes_storage_rollup'
+        ordering = ['-bucket']
+        unique_together = ['node', 'resolution', 'bucket', 'metric']
+
+
+class NodesLatestReading(BaseModel):
+    """
+    A Django model that stores the last reading of every node.
+
+    The snapshot is updated in the same transaction that stores new readings, so the current value of every node is
+    read with one query instead of one paginated query per node.
+
+    Fields:
+    - node: The node, each node has at most one snapshot.
+    - reading: The last reading of the node.
+    - date_time: The date of the last reading, copied from the reading to compare it with the new ones.
+    """
+
+    node = models.OneToOneField(Nodes, on_delete=models.CASCADE, related_name='latest_reading')
+    reading = models.ForeignKey(NodesStorage, on_delete=models.CASCADE, related_name='+')
+    date_time = models.DateTimeField()
+
+    class Meta:
+        """
+        Meta class for the NodesLatestReading model.
+        """
+
+        db_table = 'nodes_latest_reading'
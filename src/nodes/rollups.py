@@ -0,0 +1,187 @@
+"""
+This module maintains the hourly and daily rollups of the NodesStorage readings.
+
+The rollups of the buckets touched by new readings are recomputed from the raw readings and upserted, so refreshing
+them is idempotent and gives the same result as a full rebuild. The refreshes of a node are serialized with a
+transaction-level lock, so a refresh recomputes the buckets after the concurrent ones committed their readings instead
+of overwriting their rollups with buckets that miss them.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from nodes.models import STORAGE_FIELDS, NodesStorage, NodesStorageRollup
+
+RESOLUTIONS: dict[str, timedelta] = {
+    NodesStorageRollup.HOUR: timedelta(hours=1),
+    NodesStorageRollup.DAY: timedelta(days=1),
+}
+
+# Buckets of the aggregations that can be answered from the rollups, with the resolution they read
+ROLLUP_BUCKETS: dict[str, str] = {
+    'hour': NodesStorageRollup.HOUR,
+    'day': NodesStorageRollup.DAY,
+    'week': NodesStorageRollup.DAY,
+}
+
+# First key of the advisory locks of the rollups of every node, the second one is the id of the node
+ROLLUPS_LOCK_CLASS = 7001
+
+
+def bucket_start(date_time: datetime, resolution: str) -> datetime:
+    """
+    Returns the start of the bucket that contains a date, in the current time zone as `Trunc` does.
+
+    Args:
+        date_time (datetime): An aware date time.
+        resolution (str): The resolution of the bucket, hour or day.
+
+    Returns:
+        datetime: The start of the bucket.
+    """
+    start = timezone.localtime(date_time).replace(minute=0, second=0, microsecond=0)
+    if resolution == NodesStorageRollup.DAY:
+        start = start.replace(hour=0)
+    return start
+
+
+def lock_node_rollups(node_ids: Iterable[int]) -> None:
+    """
+    Waits until the concurrent transactions that refresh the rollups of some nodes finish, and keeps the refreshes of
+    the nodes locked until the end of the current transaction.
+
+    The nodes are locked in order, so two refreshes of the same nodes never wait for each other. Only PostgreSQL runs
+    concurrent writing transactions, SQLite already serializes them.
+
+    Args:
+        node_ids (Iterable[int]): The ids of the nodes.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for node_id in sorted(set(node_ids)):
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [ROLLUPS_LOCK_CLASS, node_id])
+
+
+def refresh_rollups(node_id: int, start: datetime, end: datetime) -> int:
+    """
+    Recomputes the rollups of a node for every bucket between two dates.
+
+    The refresh waits for the other refreshes of the node, so it reads the readings they committed.
+
+    Args:
+        node_id (int): The id of the node.
+        start (datetime): The first date of the readings that changed.
+        end (datetime): The last date of the readings that changed.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    written = 0
+    aggregates: dict = {}
+    for field in STORAGE_FIELDS:
+        aggregates[f'{field}_min'] = Min(field)
+        aggregates[f'{field}_max'] = Max(field)
+        aggregates[f'{field}_sum'] = Sum(field)
+
+    with transaction.atomic():
+        lock_node_rollups([node_id])
+        for resolution, step in RESOLUTIONS.items():
+            rows = (
+                NodesStorage.objects.filter(
+                    node_id=node_id,
+                    is_active=True,
+                    date_time__gte=bucket_start(start, resolution),
+                    date_time__lt=bucket_start(end, resolution) + step,
+                )
+                .order_by()
+                .annotate(bucket=Trunc('date_time', resolution))
+                .values('bucket')
+                .annotate(count=Count('id'), **aggregates)
+            )
+            rollups = [
+                NodesStorageRollup(
+                    node_id=node_id,
+                    resolution=resolution,
+                    bucket=row['bucket'],
+                    metric=field,
+                    min=row[f'{field}_min'],
+                    max=row[f'{field}_max'],
+                    sum=row[f'{field}_sum'],
+                    count=row['count'],
+                )
+                for row in rows
+                for field in STORAGE_FIELDS
+            ]
+            NodesStorageRollup.objects.bulk_create(
+                rollups,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['node', 'resolution', 'bucket', 'metric'],
+                update_fields=['min', 'max', 'sum', 'count', 'updated_at'],
+            )
+            written += len(rollups)
+    return written
+
+
+def refresh_rollups_for_readings(readings: Iterable[NodesStorage]) -> int:
+    """
+    Recomputes the rollups of the buckets touched by new readings.
+
+    Args:
+        readings (Iterable[NodesStorage]): The readings that were stored.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    ranges: dict[int, tuple[datetime, datetime]] = {}
+    for reading in readings:
+        first, last = ranges.get(reading.node_id, (reading.date_time, reading.date_time))
+        ranges[reading.node_id] = (min(first, reading.date_time), max(last, reading.date_time))
+    with transaction.atomic():
+        # The nodes of a batch are locked at once and in order, so two batches that share nodes do not deadlock
+        lock_node_rollups(ranges)
+        return sum(refresh_rollups(node_id, first, last) for node_id, (first, last) in ranges.items())
+
+
+def aggregate_rollups(
+    node_id: int, bucket: str, fields: list[str], date_range: Optional[tuple[datetime, datetime]] = None
+) -> list[dict]:
+    """
+    Computes min, max, avg and count per metric of a node grouped into time buckets reading the rollups.
+
+    Args:
+        node_id (int): The id of the node.
+        bucket (str): The size of the buckets, one of ROLLUP_BUCKETS.
+        fields (list[str]): The metrics to aggregate.
+        date_range (tuple[datetime, datetime], optional): The first and last date of the readings.
+
+    Returns:
+        list[dict]: The same structure returned by `nodes.aggregation.aggregate_readings`.
+    """
+    filters = Q(node_id=node_id, resolution=ROLLUP_BUCKETS[bucket], metric__in=fields)
+    if date_range:
+        filters &= Q(bucket__range=date_range)
+    rows = (
+        NodesStorageRollup.objects.filter(filters)
+        .order_by()
+        .annotate(period=Trunc('bucket', bucket))
+        .values('period', 'metric')
+        .annotate(min_value=Min('min'), max_value=Max('max'), sum_value=Sum('sum'), count_value=Sum('count'))
+        .order_by('period')
+    )
+
+    results: dict[datetime, dict] = {}
+    for row in rows:
+        result = results.setdefault(row['period'], {'date_time': row['period'], 'count': row['count_value']})
+        result[row['metric']] = {
+            'min': float(row['min_value']),
+            'max': float(row['max_value']),
+            'avg': float(row['sum_value']) / row['count_value'],
+        }
+    return list(results.values())
@@ -2,15 +2,18 @@
 File with serializers for the nodes app.
 """
 
-from datetime import datetime
 from typing import Union
 
+from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 
-from nodes.models import Nodes, NodesStorage, WeatherStation
-from nodes.utils import excel_to_json
+from nodes.cache import WEATHER_STATION_SCOPE, invalidate
+from nodes.ingestion import IngestionResult, import_txt_document
+from nodes.models import STORAGE_FIELDS, ImportJob, Nodes, NodesStorage, WeatherStation
+from nodes.utils import iter_excel_batches
 
 
 class NodesSerializer(serializers.ModelSerializer):
@@ -41,6 +44,212 @@ class NodesStorageSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class NodesStorageFastSerializer:
+    """
+    A read-only serializer that builds the NodesStorage responses from `.values()` rows with numeric metrics.
+
+    The rows are not converted to model instances and the metrics are sent as floats instead of decimal strings, so
+    large pages are serialized without one field instance per value.
+
+    Attributes:
+        fields (tuple): The fields to read with `.values()`.
+        layouts (tuple): The supported layouts, 'fast' for one object per reading and 'columnar' for one list per
+            field.
+    """
+
+    fields: tuple[str, ...] = ('id', 'node', 'date_time') + STORAGE_FIELDS
+    layouts: tuple[str, ...] = ('fast', 'columnar')
+
+    def __init__(self, rows: list[dict], layout: str = 'fast'):
+        self.rows = rows
+        self.layout = layout
+        self.date_time_field = serializers.DateTimeField()
+
+    def to_representation(self, row: dict) -> dict:
+        """
+        Returns the values of a row with the date in the format of the API and the metrics as floats.
+        """
+        data = {
+            'id': row['id'],
+            'node': row['node'],
+            'date_time': self.date_time_field.to_representation(row['date_time']),
+        }
+        for field in STORAGE_FIELDS:
+            data[field] = float(row[field]) if row[field] is not None else None
+        return data
+
+    @property
+    def data(self) -> Union[list[dict], dict[str, list]]:
+        """
+        Returns the serialized rows, a list of objects or a dictionary with one list per field.
+        """
+        if self.layout != 'columnar':
+            return [self.to_representation(row) for row in self.rows]
+
+        columns: dict[str, list] = {field: [] for field in self.fields}
+        for row in self.rows:
+            for field, value in self.to_representation(row).items():
+                columns[field].append(value)
+        return columns
+
+
+class NodesLatestReadingSerializer(serializers.ModelSerializer):
+    """
+    A Django REST Framework serializer for a node with its last reading.
+
+    The node must be loaded with `select_related('latest_reading__reading')` and the context may have the current
+    time in 'now', so every node is compared with the same date.
+    """
+
+    date_time = serializers.SerializerMethodField()
+    seconds_since = serializers.SerializerMethodField()
+    is_stale = serializers.SerializerMethodField()
+    battery_level = serializers.SerializerMethodField()
+    reading = serializers.SerializerMethodField()
+
+    class Meta:
+        """
+        Meta class for the NodesLatestReadingSerializer.
+        """
+
+        model = Nodes
+        fields = (
+            'id',
+            'name',
+            'type',
+            'latitude',
+            'longitude',
+            'date_time',
+            'seconds_since',
+            'is_stale',
+            'battery_level',
+            'reading',
+        )
+
+    @staticmethod
+    def _reading(node: Nodes) -> Union[NodesStorage, None]:
+        """
+        Returns the last reading of the node, or None if it does not have readings.
+        """
+        snapshot = getattr(node, 'latest_reading', None)
+        return snapshot.reading if snapshot else None
+
+    def get_date_time(self, node: Nodes) -> Union[str, None]:
+        """
+        Returns the date of the last reading.
+        """
+        reading = self._reading(node)
+        return serializers.DateTimeField().to_representation(reading.date_time) if reading else None
+
+    def get_seconds_since(self, node: Nodes) -> Union[float, None]:
+        """
+        Returns the seconds since the last reading.
+        """
+        reading = self._reading(node)
+        if not reading:
+            return None
+        return ((self.context.get('now') or timezone.now()) - reading.date_time).total_seconds()
+
+    def get_is_stale(self, node: Nodes) -> bool:
+        """
+        Returns whether the node did not send readings in the last `NODES_STALE_AFTER` seconds.
+        """
+        seconds_since = self.get_seconds_since(node)
+        return seconds_since is None or seconds_since > settings.NODES_STALE_AFTER
+
+    def get_battery_level(self, node: Nodes) -> Union[float, None]:
+        """
+        Returns the battery level of the last reading.
+        """
+        reading = self._reading(node)
+        return float(reading.battery_level) if reading else None
+
+    def get_reading(self, node: Nodes) -> Union[dict, None]:
+        """
+        Returns the metrics of the last reading as numbers.
+        """
+        reading = self._reading(node)
+        if not reading:
+            return None
+        return {field: float(getattr(reading, field)) for field in STORAGE_FIELDS}
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """
+    A Django REST Framework serializer to report the progress of an ImportJob.
+    """
+
+    duration = serializers.FloatField(read_only=True)
+
+    class Meta:
+        """
+        Meta class for the ImportJobSerializer.
+        """
+
+        model = ImportJob
+        fields = (
+            'id',
+            'kind',
+            'status',
+            'total_rows',
+            'processed_rows',
+            'accepted_rows',
+            'duplicate_rows',
+            'rejected_rows',
+            'errors',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'duration',
+        )
+
+
+class DataWeatherStationListSerializer(serializers.ListSerializer):
+    """
+    A list serializer that stores many WeatherStation objects with set-based duplicate detection.
+
+    Methods:
+        create(validated_data: list[dict]) -> list[Union[WeatherStation, None]]: Creates the new objects.
+    """
+
+    def create(self, validated_data: list[dict]) -> list[Union[WeatherStation, None]]:
+        """
+        Create the WeatherStation objects that are not stored yet with one bulk insert.
+
+        Args:
+            validated_data (list[dict]): The validated data of every row.
+
+        Returns:
+            list[WeatherStation or None]: For each row, the created WeatherStation object or None if a row with the
+                same 'date' already exists in the database or earlier in the same data.
+
+        Note:
+            - The dates already stored are fetched with one query limited to the time window of the data.
+            - The new objects are written with `bulk_create(..., ignore_conflicts=True)`, so a row inserted meanwhile
+              by another import is skipped by the unique index instead of failing.
+        """
+        if not validated_data:
+            return []
+        dates = [item['date'] for item in validated_data]
+        stored = WeatherStation.objects.filter(date__range=(min(dates), max(dates))).order_by()
+        seen: set = set(stored.values_list('date', flat=True))
+
+        instances: list[Union[WeatherStation, None]] = []
+        for item in validated_data:
+            if item['date'] in seen:
+                instances.append(None)
+                continue
+            seen.add(item['date'])
+            instances.append(WeatherStation(**item))
+
+        created = [instance for instance in instances if instance is not None]
+        with transaction.atomic():
+            WeatherStation.objects.bulk_create(created, ignore_conflicts=True)
+            if created:
+                invalidate(WEATHER_STATION_SCOPE)
+        return instances
+
+
 class DataWeatherStationSerializer(serializers.ModelSerializer):
     """
     A serializer class for the DataWeatherStation model.
@@ -55,10 +264,15 @@ class DataWeatherStationSerializer(serializers.ModelSerializer):
     class Meta:
         """
         Meta class for the WeatherStationSerializer.
+
+        The unique validator of 'date' is disabled to avoid one query per row, the duplicates are skipped when the
+        objects are created.
         """
 
         model = WeatherStation
         fields = '__all__'
+        extra_kwargs = {'date': {'validators': []}}
+        list_serializer_class = DataWeatherStationListSerializer
 
     def create(self, validated_data: dict) -> Union[WeatherStation, None]:
         """
@@ -132,17 +346,24 @@ class WeatherStationSerializer(serializers.Serializer):
         Note:
             - The 'validated_data' should contain the 'document' field, which is a FileField.
             - The 'document' field should be an Excel file in .xlsx format.
-            - The Excel file will be converted to JSON format using the 'excel_to_json' function.
-            - The JSON data will be used to create multiple DataWeatherStationSerializer objects.
-            - If any of the DataWeatherStationSerializer objects is not valid, a ValidationError will be raised.
+            - The Excel file is streamed in batches of `NODES_IMPORT_BATCH_SIZE` rows with 'iter_excel_batches'.
+            - Each batch is validated and saved with a DataWeatherStationSerializer, if a batch is not valid a
+              ValidationError will be raised.
+            - The rows whose date is already stored are skipped and returned as None.
+            - If the serializer context has an 'on_batch' function, it is called with the objects of every batch.
             - The valid DataWeatherStationSerializer objects will be saved and returned as a list.
         """
-        excel_data = validated_data['document'].read()
-        json_data = excel_to_json(excel_data)
-        data_weather_station_serializer = DataWeatherStationSerializer(data=json_data, many=True)
-        if not data_weather_station_serializer.is_valid():
-            raise serializers.ValidationError(data_weather_station_serializer.errors)
-        return data_weather_station_serializer.save()
+        on_batch = self.context.get('on_batch')
+        instances: list = []
+        for batch in iter_excel_batches(validated_data['document'], settings.NODES_IMPORT_BATCH_SIZE):
+            data_weather_station_serializer = DataWeatherStationSerializer(data=batch, many=True)
+            if not data_weather_station_serializer.is_valid():
+                raise serializers.ValidationError(data_weather_station_serializer.errors)
+            created = data_weather_station_serializer.save()
+            if on_batch:
+                on_batch(created)
+            instances.extend(created)
+        return instances
 
 
 class NodesStorageTxtSerializer(serializers.Serializer):
@@ -172,52 +393,17 @@ class NodesStorageTxtSerializer(serializers.Serializer):
             return value
         raise serializers.ValidationError("The file must be in .txt format")
 
-    def create(self, validated_data: dict[str, UploadedFile]) -> list[str]:
+    def create(self, validated_data: dict[str, UploadedFile]) -> IngestionResult:
         """
-        Create method to process and save data from validated_data.
+        Create method to stream the uploaded file and save the readings in batches.
+
+        The file is read chunk by chunk, the node lookups are cached for the whole file and the readings are written
+        with conflict-ignoring bulk inserts every `NODES_IMPORT_BATCH_SIZE` lines.
 
         Args:
             validated_data (dict[str, UploadedFile]): The validated data containing the uploaded file.
 
         Returns:
-            list[str]: A list of responses indicating the success or failure of data creation.
-
-        Raises:
-            serializers.ValidationError: If an error occurs during data creation.
+            IngestionResult: The accepted, duplicate and rejected counts of the lines in the file.
         """
-        txt_data: bytes = validated_data['document'].read()
-        responses: list = []
-        for item in str(txt_data).split("\\n"):
-            if not item or item.startswith("b'ID_NODO") or item == "'":
-                continue
-            data: list[str] = item.split(';')
-            try:
-                defaults: dict[str, str] = {
-                    "temperature": data[2],
-                    "humidity": data[3],
-                    "pressure": data[4],
-                    "altitude": data[5],
-                    "humidity_hd38": data[6],
-                    "humidity_soil": data[7],
-                    "temperature_soil": data[8],
-                    "conductivity_soil": data[9],
-                    "ph_soil": data[10],
-                    "nitrogen_soil": data[11],
-                    "phosphorus_soil": data[12],
-                    "potassium_soil": data[13],
-                    "battery_level": data[14],
-                }
-                date_time_naive: datetime = datetime.strptime(data[1], "%Y-%m-%dT%H:%M:%S")
-                date_time_aware: datetime = timezone.make_aware(date_time_naive)
-
-                defaults["date_time"] = date_time_aware
-
-                node: Nodes = Nodes.objects.get(id=int(data[0]))  # Get the node instance
-                defaults['node'] = node  # Add the node instance to the defaults dictionary
-
-                NodesStorage.objects.get_or_create(node=node, date_time=date_time_aware, defaults=defaults)
-
-                responses.append(f'Node {node.pk} in date {date_time_aware} data created successfully!')
-            except Exception as e:
-                raise serializers.ValidationError({"error": str(e)})
-        return responses
+        return import_txt_document(validated_data['document'], settings.NODES_IMPORT_BATCH_SIZE)
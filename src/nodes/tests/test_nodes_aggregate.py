@@ -0,0 +1,197 @@
+"""
+Tests for the nodes storage aggregation API.
+"""
+
+import io
+import threading
+from datetime import datetime, timedelta
+from importlib import import_module
+from unittest import mock, skipUnless
+
+import django
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import make_aware
+from rest_framework import status
+
+from core.test_setup import TestSetup
+from nodes.models import STORAGE_FIELDS, Nodes, NodesStorage, NodesStorageRollup
+from nodes.rollups import ROLLUPS_LOCK_CLASS, lock_node_rollups, refresh_rollups_for_readings
+
+
+def create_readings(node, start, count, step=timedelta(minutes=15)):
+    """Create readings whose temperature is the index of the reading and refresh their rollups."""
+    readings = NodesStorage.objects.bulk_create(
+        [
+            NodesStorage(
+                node=node,
+                date_time=make_aware(start + step * index),
+                **{field: index if field == "temperature" else 1 for field in STORAGE_FIELDS},
+            )
+            for index in range(count)
+        ]
+    )
+    refresh_rollups_for_readings(readings)
+
+
+def rounded(results):
+    """Round the aggregated values to compare averages computed in different ways."""
+    return [
+        {
+            key: {name: round(number, 6) for name, number in value.items()} if isinstance(value, dict) else value
+            for key, value in item.items()
+        }
+        for item in results
+    ]
+
+
+class TestsNodesStorageAggregateApi(TestSetup):
+    """
+    Test NodesStorage aggregation API view.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesStorageAggregateApi, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:nodes_storage_aggregate")
+        self.node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+        create_readings(self.node, datetime(2024, 6, 1), 12)
+
+        return super().setUp()
+
+    def test_aggregate_by_hour(self):
+        """Test the readings are summarized per hour."""
+        res = self.client.get(self.url, {"node_id": self.node.id, "bucket": "hour", "fields": "temperature"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["fields"], ["temperature"])
+        results = res.data["results"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["count"], 4)
+        self.assertEqual(results[1]["temperature"], {"min": 4.0, "max": 7.0, "avg": 5.5})
+        self.assertNotIn("humidity", results[0])
+
+    def test_aggregate_by_day_with_range(self):
+        """Test the date range filters the aggregated readings."""
+        create_readings(self.node, datetime(2024, 6, 3), 5)
+
+        res = self.client.get(
+            self.url, {"node_id": self.node.id, "bucket": "day", "start_date": "02-06-2024", "end_date": "03-06-2024"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["count"], 5)
+        self.assertEqual(res.data["results"][0]["battery_level"]["avg"], 1.0)
+
+    def test_aggregate_invalid_parameters(self):
+        """Test invalid buckets and fields return a bad request."""
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(self.url, {"node_id": self.node.id, "bucket": "year"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(self.url, {"node_id": self.node.id, "fields": "temperature,node"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_aggregate_rollups_match_readings(self):
+        """Test the rollups return the same aggregation as the raw readings."""
+        create_readings(self.node, datetime(2024, 6, 2, 23), 30, step=timedelta(minutes=7))
+        params = {"node_id": self.node.id, "fields": "temperature,humidity"}
+
+        for bucket in ("hour", "day", "week"):
+            with self.subTest(bucket=bucket):
+                from_rollups = self.client.get(self.url, {**params, "bucket": bucket}).data["results"]
+                with override_settings(NODES_ROLLUPS_ENABLED=False):
+                    from_readings = self.client.get(self.url, {**params, "bucket": bucket}).data["results"]
+                self.assertEqual(rounded(from_rollups), rounded(from_readings))
+
+
+class TestsRebuildNodeRollups(TestSetup):
+    """
+    Test the command that rebuilds the rollups.
+    """
+
+    def test_rebuild_node_rollups(self):
+        """Test the rollups are rebuilt from the raw readings."""
+        node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+        create_readings(node, datetime(2024, 6, 1), 12)
+        NodesStorageRollup.objects.all().delete()
+
+        call_command("rebuild_node_rollups", stdout=io.StringIO())
+
+        hours = NodesStorageRollup.objects.filter(node=node, resolution=NodesStorageRollup.HOUR, metric="temperature")
+        self.assertEqual(hours.count(), 3)
+        self.assertEqual(hours.get(bucket=make_aware(datetime(2024, 6, 1, 1))).sum, 4 + 5 + 6 + 7)
+        days = NodesStorageRollup.objects.filter(node=node, resolution=NodesStorageRollup.DAY)
+        self.assertEqual(days.count(), len(STORAGE_FIELDS))
+
+    def test_migration_backfills_rollups(self):
+        """Test the migration summarizes the readings stored before the rollups existed as the ingestion does."""
+        node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+        create_readings(node, datetime(2024, 6, 1), 30)
+        fields = ("node_id", "resolution", "bucket", "metric", "min", "max", "sum", "count")
+        expected = sorted(NodesStorageRollup.objects.values_list(*fields))
+        NodesStorageRollup.objects.all().delete()
+
+        import_module("nodes.migrations.0010_backfill_node_rollups").backfill_rollups(apps, None)
+
+        self.assertEqual(sorted(NodesStorageRollup.objects.values_list(*fields)), expected)
+
+
+class TestsConcurrentNodeRollups(TransactionTestCase):
+    """
+    Test the concurrent refreshes of the rollups of a node.
+    """
+
+    def test_lock_nodes_in_order(self):
+        """Test every node is locked once and in order, so two refreshes of the same nodes do not deadlock."""
+        with mock.patch.object(connection, "vendor", "postgresql"), mock.patch.object(connection, "cursor") as cursor:
+            lock_node_rollups([3, 1, 3, 2])
+
+        executed = cursor.return_value.__enter__.return_value.execute.call_args_list
+        self.assertEqual([call.args[1] for call in executed], [[ROLLUPS_LOCK_CLASS, node_id] for node_id in (1, 2, 3)])
+
+    @skipUnless(connection.vendor == "postgresql", "Only PostgreSQL runs concurrent writing transactions")
+    def test_overlapping_flushes(self):
+        """Test two flushes of the same buckets that commit concurrently keep every reading in the rollups."""
+        node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+        inserted = threading.Barrier(2)
+        errors = []
+
+        def flush(start):
+            try:
+                with transaction.atomic():
+                    readings = NodesStorage.objects.bulk_create(
+                        [
+                            NodesStorage(
+                                node=node,
+                                date_time=make_aware(start + timedelta(minutes=index)),
+                                **{field: 1 for field in STORAGE_FIELDS},
+                            )
+                            for index in range(5)
+                        ]
+                    )
+                    # Both flushes refresh the rollups while the readings of the other one are not committed
+                    inserted.wait(timeout=5)
+                    refresh_rollups_for_readings(readings)
+            except Exception as error:  # pylint: disable=broad-except
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=flush, args=(datetime(2024, 6, 1, 10, minute),)) for minute in (0, 30)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        rollups = NodesStorageRollup.objects.filter(node=node, metric="temperature")
+        self.assertEqual(rollups.get(resolution=NodesStorageRollup.HOUR).count, 10)
+        self.assertEqual(rollups.get(resolution=NodesStorageRollup.DAY).count, 10)
@@ -0,0 +1,97 @@
+"""
+Tests for the response cache of the nodes endpoints.
+"""
+
+import time
+from unittest import mock
+
+import django
+from django.urls import reverse
+from rest_framework import status
+
+from core.test_setup import TestSetup
+from nodes.models import Nodes
+from nodes.tests.test_nodes_storage import storage_line
+
+
+class TestsNodesCache(TestSetup):
+    """
+    Test the cached responses are revalidated and invalidated by the writes.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesCache, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:nodes_storage")
+        self.node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+        self.other_node = Nodes.objects.create(name="Node 2", type="worker", latitude=11.3, longitude=-74.2)
+        self.post_reading(self.node, "2024-06-01T12:00:00")
+
+        return super().setUp()
+
+    def post_reading(self, node, date_time):
+        """Store a reading running the invalidation of the commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.generic("POST", self.url, storage_line(node.id, date_time), content_type="text/plain")
+
+    def later(self, seconds: float):
+        """Moves the clock of the cache forward."""
+        return mock.patch("nodes.cache.time.time", return_value=time.time() + seconds)
+
+    def test_cached_response_and_not_modified(self):
+        """Test the second request is served from the cache and a valid ETag or date returns 304."""
+        with self.later(1):
+            first = self.client.get(self.url, {"node_id": self.node.id})
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, {"node_id": self.node.id})
+        not_modified = self.client.get(self.url, {"node_id": self.node.id}, HTTP_IF_NONE_MATCH=first["ETag"])
+        with self.later(1):
+            since = self.client.get(self.url, {"node_id": self.node.id}, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(since.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_write_invalidates_node(self):
+        """Test new readings of a node invalidate its responses and keep the ones of other nodes."""
+        first = self.client.get(self.url, {"node_id": self.node.id})
+
+        self.post_reading(self.other_node, "2024-06-01T12:05:00")
+        unchanged = self.client.get(self.url, {"node_id": self.node.id}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.post_reading(self.node, "2024-06-01T12:05:00")
+        changed = self.client.get(self.url, {"node_id": self.node.id}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(unchanged.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data["total"], 2)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+
+    def test_write_in_same_second_modifies(self):
+        """Test a write in the second of a response is not answered with 304 to a client that only sends the date."""
+        first = self.client.get(self.url, {"node_id": self.node.id})
+        with self.later(0.001):
+            self.post_reading(self.node, "2024-06-01T12:05:00")
+        with self.later(2):
+            since = self.client.get(self.url, {"node_id": self.node.id}, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+            self.post_reading(self.node, "2024-06-01T12:10:00")
+            second_since = self.client.get(
+                self.url, {"node_id": self.node.id}, HTTP_IF_MODIFIED_SINCE=since["Last-Modified"]
+            )
+
+        self.assertEqual(since.status_code, status.HTTP_200_OK)
+        self.assertEqual(since.data["total"], 2)
+        self.assertEqual(second_since.status_code, status.HTTP_200_OK)
+        self.assertEqual(second_since.data["total"], 3)
+
+    def test_errors_are_not_cached(self):
+        """Test the error responses are not cached."""
+        res = self.client.get(self.url, {"node_id": self.node.id, "layout": "rows"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn("ETag", res)
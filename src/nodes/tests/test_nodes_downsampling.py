@@ -0,0 +1,97 @@
+"""
+Tests for the downsampling of the NodesStorage time series.
+"""
+
+import django
+import numpy as np
+from django.urls import reverse
+from rest_framework import status
+
+from core.test_setup import TestSetup
+from nodes.downsampling import lttb_indices, minmax_indices
+from nodes.models import Nodes
+from nodes.tests.test_nodes_storage import storage_line
+
+
+class TestsDownsampling(TestSetup):
+    """
+    Test the downsampling algorithms.
+    """
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.x = np.arange(1000, dtype=float)
+        self.y = np.sin(self.x / 50)
+        self.y[437] = 25
+
+        return super().setUp()
+
+    def test_lttb_keeps_peaks(self):
+        """Test LTTB keeps the first, last and peak points within the limit."""
+        indices = lttb_indices(self.x, self.y, 50)
+
+        self.assertEqual(len(indices), 50)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertIn(437, indices)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_minmax_keeps_extremes(self):
+        """Test min-max keeps the minimum and maximum of every bucket."""
+        indices = minmax_indices(self.x, self.y, 50)
+
+        self.assertLessEqual(len(indices), 50)
+        self.assertIn(437, indices)
+        self.assertIn(int(self.y.argmin()), indices)
+
+    def test_short_series_is_not_reduced(self):
+        """Test a series shorter than the limit is returned complete."""
+        self.assertEqual(lttb_indices(self.x[:10], self.y[:10], 20).tolist(), list(range(10)))
+
+
+class TestsNodesStorageDownsamplingApi(TestSetup):
+    """
+    Test the max_points parameter of the NodesStorage API view.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesStorageDownsamplingApi, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:nodes_storage")
+        self.node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+        lines = []
+        for minute in range(200):
+            date_time = f"2024-06-01T{minute // 60:02d}:{minute % 60:02d}:00"
+            lines.append(storage_line(self.node.id, date_time, "99.00" if minute == 70 else "10.00"))
+        self.client.generic("POST", self.url, "\n".join(lines), content_type="text/plain")
+
+        return super().setUp()
+
+    def test_max_points(self):
+        """Test every metric is reduced to max_points keeping the peak."""
+        res = self.client.get(self.url, {"node_id": self.node.id, "max_points": 20, "fields": "temperature,ph_soil"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data["results"]), ["temperature", "ph_soil"])
+        series = res.data["results"]["temperature"]
+        self.assertEqual(len(series["value"]), 20)
+        self.assertIn(99.0, series["value"])
+        self.assertEqual(series["date_time"][0].isoformat(), "2024-06-01T00:00:00+00:00")
+
+    def test_invalid_max_points(self):
+        """Test a max_points out of range returns bad request."""
+        for max_points in ("1", "abc"):
+            res = self.client.get(self.url, {"node_id": self.node.id, "max_points": max_points})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_max_points_without_node(self):
+        """Test downsampling the readings of every node at once returns bad request."""
+        res = self.client.get(self.url, {"max_points": 20})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["message"], "Please provide a node_id!")
@@ -0,0 +1,60 @@
+"""
+Tests for the indexes used by the NodesStorage queries.
+"""
+
+from datetime import datetime
+
+import django
+from django.db import connection
+from django.utils.timezone import make_aware
+
+from core.test_setup import TestSetup
+from nodes.models import NodesStorage
+
+
+class TestsNodesStorageIndexes(TestSetup):
+    """
+    Test the query plans of the NodesStorage listing use the partial indexes.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesStorageIndexes, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.date_range = (make_aware(datetime(2024, 1, 1)), make_aware(datetime(2024, 2, 1)))
+
+        return super().setUp()
+
+    def assertUsesIndex(self, queryset, index_name):
+        """Assert the plan of the query reads the index instead of scanning the table."""
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+            try:
+                plan = queryset.explain()
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute("RESET enable_seqscan")
+            self.assertNotIn("Seq Scan", plan)
+        else:
+            plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_node_readings_use_index(self):
+        """Test the readings of a node in a date range are read from the node index."""
+        queryset = NodesStorage.objects.filter(
+            is_active=True, node_id=1, date_time__range=self.date_range
+        ).order_by("-date_time")
+
+        self.assertUsesIndex(queryset, "nodes_storage_active_node")
+
+    def test_latest_readings_use_index(self):
+        """Test the latest readings of all the nodes are read from the date index."""
+        queryset = NodesStorage.objects.filter(is_active=True, date_time__range=self.date_range).order_by(
+            "-date_time"
+        )[:10]
+
+        self.assertUsesIndex(queryset, "nodes_storage_active_date")
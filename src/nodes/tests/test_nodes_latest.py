@@ -0,0 +1,84 @@
+"""
+Tests for the latest reading snapshot of the nodes.
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+import django
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core.test_setup import TestSetup
+from nodes.models import Nodes, NodesLatestReading
+from nodes.tests.test_nodes_storage import storage_line
+
+
+class TestsNodesLatestReading(TestSetup):
+    """
+    Test the latest reading snapshot and its API view.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesLatestReading, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:nodes_latest")
+        self.node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+        self.other_node = Nodes.objects.create(name="Node 2", type="worker", latitude=11.3, longitude=-74.2)
+
+        return super().setUp()
+
+    def post_lines(self, lines):
+        """Send the lines to the nodes storage endpoint."""
+        return self.client.generic(
+            "POST", reverse("nodes:nodes_storage"), "\n".join(lines), content_type="text/plain"
+        )
+
+    def test_snapshot_keeps_newest_reading(self):
+        """Test the snapshot moves to newer readings and ignores older ones sent later."""
+        self.post_lines([storage_line(self.node.id, "2024-06-01T12:00:00", "10.00")])
+        self.post_lines([storage_line(self.node.id, "2024-06-01T12:10:00", "12.00")])
+        self.post_lines([storage_line(self.node.id, "2024-06-01T11:00:00", "8.00")])
+
+        snapshot = NodesLatestReading.objects.get(node=self.node)
+
+        self.assertEqual(snapshot.date_time.isoformat(), "2024-06-01T12:10:00+00:00")
+        self.assertEqual(float(snapshot.reading.temperature), 12.0)
+
+    def test_snapshot_written_concurrently_is_kept(self):
+        """Test older readings do not replace a newer snapshot committed after the current snapshots were read."""
+        self.post_lines([storage_line(self.node.id, "2024-06-01T12:10:00", "12.00")])
+        snapshots = NodesLatestReading.objects.all()
+
+        # The newer snapshot is not seen, as when it is committed by another transaction after the read
+        with mock.patch.object(NodesLatestReading.objects, "filter", return_value=snapshots.none()):
+            self.post_lines([storage_line(self.node.id, "2024-06-01T11:00:00", "8.00")])
+
+        snapshot = NodesLatestReading.objects.get(node=self.node)
+        self.assertEqual(snapshot.date_time.isoformat(), "2024-06-01T12:10:00+00:00")
+        self.assertEqual(float(snapshot.reading.temperature), 12.0)
+
+    @override_settings(NODES_STALE_AFTER=600)
+    def test_latest_readings_view(self):
+        """Test every node is returned with its last reading in one query."""
+        now = timezone.now().replace(microsecond=0)
+        self.post_lines([storage_line(self.node.id, (now - timedelta(minutes=1)).isoformat(), "55.50")])
+
+        with self.assertNumQueries(1):
+            res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        node, other_node = res.data
+        self.assertEqual(node["id"], self.node.id)
+        self.assertEqual(node["battery_level"], 55.5)
+        self.assertEqual(node["reading"]["temperature"], 55.5)
+        self.assertFalse(node["is_stale"])
+        self.assertGreaterEqual(node["seconds_since"], 60)
+        self.assertIsNone(other_node["date_time"])
+        self.assertTrue(other_node["is_stale"])
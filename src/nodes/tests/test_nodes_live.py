@@ -0,0 +1,110 @@
+"""
+Tests for the live stream of the new NodesStorage readings.
+"""
+
+import asyncio
+import json
+from unittest import mock
+
+import django
+from django.urls import reverse
+
+from core.test_setup import TestSetup
+from nodes.live import InMemoryFanout, get_fanout
+from nodes.models import Nodes
+from nodes.tests.test_nodes_storage import storage_line
+
+
+class TestsNodesLive(TestSetup):
+    """
+    Test the fanout of the readings and the live stream view.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesLive, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:nodes_live")
+        self.node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+
+        return super().setUp()
+
+    async def test_fanout_filters_nodes(self):
+        """Test every subscriber receives only the readings of its nodes."""
+        fanout = InMemoryFanout()
+        node_subscription = fanout.subscribe([1])
+        all_subscription = fanout.subscribe()
+
+        fanout.publish([{"node": 1, "temperature": 10.0}, {"node": 2, "temperature": 20.0}])
+        await asyncio.sleep(0)
+
+        self.assertEqual(node_subscription.queue.qsize(), 1)
+        self.assertEqual(all_subscription.queue.qsize(), 2)
+        fanout.unsubscribe(node_subscription)
+        fanout.publish([{"node": 1, "temperature": 30.0}])
+        await asyncio.sleep(0)
+        self.assertEqual(node_subscription.queue.qsize(), 1)
+
+    async def test_live_stream(self):
+        """Test the published readings are streamed as server-sent events."""
+        response = await self.async_client.get(self.url, {"node_id": "1,2"})
+        events = aiter(response.streaming_content)
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(await anext(events), b"retry: 3000\n\n")
+        get_fanout().publish([{"node": 3, "temperature": 5.0}, {"node": 2, "temperature": 21.5}])
+        event = await asyncio.wait_for(anext(events), timeout=1)
+        await events.aclose()
+
+        name, data = event.decode().strip().split("\n")
+        self.assertEqual(name, "event: reading")
+        self.assertEqual(json.loads(data.removeprefix("data: ")), {"node": 2, "temperature": 21.5})
+
+    async def test_live_stream_ends_after_max_lifetime(self):
+        """Test the stream ends once its maximum lifetime passes, so the client reconnects."""
+        with self.settings(NODES_LIVE_HEARTBEAT=0.05, NODES_LIVE_MAX_LIFETIME=0.2):
+            response = await self.async_client.get(self.url)
+            events = [event async for event in response.streaming_content]
+
+        self.assertEqual(events[0], b"retry: 3000\n\n")
+        self.assertTrue(all(event == b": keep-alive\n\n" for event in events[1:]))
+        self.assertEqual(get_fanout()._subscriptions, set())
+
+    async def test_live_stream_ends_on_disconnect(self):
+        """Test the stream ends as soon as its client disconnects."""
+        disconnected = asyncio.Event()
+        with mock.patch("nodes.views.get_disconnected_event", return_value=disconnected):
+            response = await self.async_client.get(self.url)
+        events = aiter(response.streaming_content)
+        await anext(events)
+
+        disconnected.set()
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(anext(events), timeout=1)
+        self.assertEqual(get_fanout()._subscriptions, set())
+
+    def test_invalid_node_id(self):
+        """Test a node_id that is not a list of numbers returns bad request."""
+        res = self.client.get(self.url, {"node_id": "one"})
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_ingestion_publishes_on_commit(self):
+        """Test the stored readings are published once they are committed."""
+        with mock.patch.object(get_fanout(), "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.generic(
+                    "POST",
+                    reverse("nodes:nodes_storage"),
+                    storage_line(self.node.id, "2024-06-01T12:00:00", "21.50"),
+                    content_type="text/plain",
+                )
+                publish.assert_not_called()
+
+        (readings,), _ = publish.call_args
+        self.assertEqual(readings[0]["node"], self.node.id)
+        self.assertEqual(readings[0]["date_time"], "2024-06-01T12:00:00+00:00")
+        self.assertEqual(readings[0]["battery_level"], 21.5)
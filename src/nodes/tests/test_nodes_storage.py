@@ -0,0 +1,389 @@
+"""
+Tests for the nodes storage API.
+"""
+
+import base64
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core.test_setup import TestSetup
+from nodes.jobs import claim_next_job, run_job, run_next_job
+from nodes.models import ImportJob, Nodes, NodesStorage
+
+
+def storage_line(node_id, date_time, value='10.50'):
+    """Build a semicolon separated reading with the same value in every field."""
+    return ';'.join([str(node_id), date_time] + [value] * 13)
+
+
+class TestsNodesStorageApi(TestSetup):
+    """
+    Test NodesStorage API views.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesStorageApi, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:nodes_storage")
+        self.node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+
+        return super().setUp()
+
+    def post_lines(self, lines):
+        """Send the lines as the raw body of the request."""
+        return self.client.generic("POST", self.url, "\n".join(lines), content_type="text/plain")
+
+    def test_post_bulk_readings(self):
+        """Test every new line is stored in one request."""
+        lines = [storage_line(self.node.id, f"2024-06-01T10:{minute:02d}:00") for minute in range(30)]
+
+        res = self.post_lines(lines)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["accepted"], 30)
+        self.assertEqual(res.data["duplicates"], 0)
+        self.assertEqual(res.data["rejected"], 0)
+        self.assertEqual(NodesStorage.objects.filter(node=self.node).count(), 30)
+
+    def test_post_counts_duplicates(self):
+        """Test readings already stored or repeated in the body are counted as duplicates."""
+        self.post_lines([storage_line(self.node.id, "2024-06-01T10:00:00")])
+        lines = [
+            storage_line(self.node.id, "2024-06-01T10:00:00"),
+            storage_line(self.node.id, "2024-06-01T10:05:00"),
+            storage_line(self.node.id, "2024-06-01T10:05:00"),
+        ]
+
+        res = self.post_lines(lines)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["accepted"], 1)
+        self.assertEqual(res.data["duplicates"], 2)
+        self.assertEqual(NodesStorage.objects.filter(node=self.node).count(), 2)
+
+    def test_post_rejects_invalid_lines(self):
+        """Test invalid lines are rejected without discarding the valid ones."""
+        lines = [
+            storage_line(self.node.id, "2024-06-01T10:00:00"),
+            storage_line(self.node.id, "not-a-date"),
+            storage_line(self.node.id + 100, "2024-06-01T10:00:00"),
+            storage_line(self.node.id, "2024-06-01T10:10:00", value="1.234"),
+            "1;2024-06-01T10:15:00",
+        ]
+
+        res = self.post_lines(lines)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["accepted"], 1)
+        self.assertEqual(res.data["rejected"], 4)
+        self.assertEqual(sorted(error["line"] for error in res.data["errors"]), [2, 3, 4, 5])
+
+    def test_post_only_invalid_lines(self):
+        """Test a body without any valid line returns a bad request."""
+        res = self.post_lines(["invalid"])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["rejected"], 1)
+        self.assertFalse(NodesStorage.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestsNodesStorageTxtApi(TestSetup):
+    """
+    Test NodesStorage txt upload API view and the import job that processes it.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesStorageTxtApi, cls).setUpClass()
+        django.setup()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super(TestsNodesStorageTxtApi, cls).tearDownClass()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:nodes_storage_txt")
+        self.node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+
+        return super().setUp()
+
+    def upload(self, lines):
+        """Upload the lines as a .txt document."""
+        content = "\r\n".join(["ID_NODO;FECHA;..."] + lines).encode("utf-8")
+        return self.client.post(self.url, {"document": SimpleUploadedFile("data.txt", content)}, format="multipart")
+
+    def test_upload_txt_is_queued(self):
+        """Test the upload returns the job id without importing the file."""
+        res = self.upload([storage_line(self.node.id, "2024-06-01T11:00:00")])
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        job = ImportJob.objects.get(id=res.data["job_id"])
+        self.assertEqual(job.status, ImportJob.PENDING)
+        self.assertFalse(NodesStorage.objects.exists())
+
+        res = self.client.get(res.data["status_url"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["status"], ImportJob.PENDING)
+
+    def test_upload_txt_invalid_extension(self):
+        """Test only .txt documents are queued."""
+        res = self.client.post(self.url, {"document": SimpleUploadedFile("data.csv", b"1;2")}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ImportJob.objects.exists())
+
+    @override_settings(NODES_IMPORT_BATCH_SIZE=7)
+    def test_import_job_in_batches(self):
+        """Test every line of the file is stored when it is flushed in several batches."""
+        lines = [storage_line(self.node.id, f"2024-06-01T11:{minute:02d}:00") for minute in range(20)]
+        lines.append(storage_line(self.node.id, "2024-06-01T11:00:00"))
+        res = self.upload(lines)
+
+        job = run_next_job("test")
+
+        self.assertEqual(job.id, res.data["job_id"])
+        self.assertEqual(job.status, ImportJob.SUCCEEDED)
+        self.assertEqual(job.total_rows, 21)
+        self.assertEqual(job.processed_rows, 21)
+        self.assertEqual(job.accepted_rows, 20)
+        self.assertEqual(job.duplicate_rows, 1)
+        self.assertEqual(NodesStorage.objects.filter(node=self.node).count(), 20)
+        self.assertIsNone(run_next_job("test"))
+
+    def test_import_job_with_invalid_lines(self):
+        """Test invalid lines in the file are reported with their line number."""
+        lines = [storage_line(self.node.id, "2024-06-01T11:00:00"), storage_line("x", "2024-06-01T11:05:00")]
+        res = self.upload(lines)
+
+        run_next_job("test")
+        res = self.client.get(res.data["status_url"])
+
+        self.assertEqual(res.data["status"], ImportJob.SUCCEEDED)
+        self.assertEqual(res.data["accepted_rows"], 1)
+        self.assertEqual(res.data["rejected_rows"], 1)
+        self.assertEqual(res.data["errors"][0]["line"], 3)
+
+    def test_import_job_deletes_document(self):
+        """Test the uploaded document is deleted once the job finishes."""
+        res = self.upload([storage_line(self.node.id, "2024-06-01T11:00:00")])
+        path = ImportJob.objects.get(id=res.data["job_id"]).document.path
+
+        job = run_next_job("test")
+
+        self.assertFalse(job.document)
+        self.assertFalse(os.path.exists(path))
+
+    @override_settings(NODES_IMPORT_STALE_AFTER=60)
+    def test_stale_running_job_is_claimed_again(self):
+        """Test a running job without progress is claimed again and a recent one is not."""
+        res = self.upload([storage_line(self.node.id, "2024-06-01T11:00:00")])
+        ImportJob.objects.filter(id=res.data["job_id"]).update(status=ImportJob.RUNNING, worker="crashed")
+
+        self.assertIsNone(claim_next_job("test"))
+
+        ImportJob.objects.filter(id=res.data["job_id"]).update(updated_at=timezone.now() - timedelta(minutes=5))
+        job = claim_next_job("test")
+
+        self.assertEqual(job.id, res.data["job_id"])
+        self.assertEqual(job.worker, "test")
+        self.assertEqual(run_job(job).status, ImportJob.SUCCEEDED)
+
+
+class TestsNodesStorageCursorPagination(TestSetup):
+    """
+    Test the cursor pagination of the NodesStorage API view.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesStorageCursorPagination, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:nodes_storage")
+        self.node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+        lines = [storage_line(self.node.id, f"2024-06-01T12:{minute:02d}:00") for minute in range(25)]
+        self.client.generic("POST", self.url, "\n".join(lines), content_type="text/plain")
+
+        return super().setUp()
+
+    def test_cursor_pagination_walks_every_reading(self):
+        """Test the next links return every reading once from the newest to the oldest."""
+        res = self.client.get(self.url, {"node_id": self.node.id, "pagination": "cursor", "limit": 10})
+        self.assertEqual(res.data["total"], 25)
+        self.assertIsNone(res.data["previous"])
+
+        dates = []
+        while True:
+            dates += [item["date_time"] for item in res.data["results"]]
+            if not res.data["next"]:
+                break
+            res = self.client.get(res.data["next"])
+
+        self.assertEqual(len(dates), 25)
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    def test_cursor_pagination_previous_and_count(self):
+        """Test the previous link returns the first page and the total can be skipped."""
+        params = {"pagination": "cursor", "limit": 10, "count": "false", "order_by": "date_time"}
+        first = self.client.get(self.url, params)
+        second = self.client.get(first.data["next"])
+        previous = self.client.get(second.data["previous"])
+
+        self.assertIsNone(first.data["total"])
+        self.assertEqual(first.data["results"][0]["date_time"], "2024-06-01T12:00:00Z")
+        self.assertEqual(second.data["results"][0]["date_time"], "2024-06-01T12:10:00Z")
+        self.assertEqual(previous.data["results"], first.data["results"])
+        self.assertIsNone(previous.data["previous"])
+
+    def test_invalid_cursor(self):
+        """Test an invalid cursor returns not found."""
+        res = self.client.get(self.url, {"pagination": "cursor", "cursor": "invalid"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        """Test a well encoded cursor with an invalid date or id returns not found."""
+        payloads = [
+            ["2024-06-01T11:00:00+00:00", "1 OR 1=1", False],
+            ["not a date", 1, False],
+            ["2024-13-45T11:00:00+00:00", 1, False],
+            [None, 1, False],
+            ["2024-06-01T11:00:00+00:00", 1],
+        ]
+        for payload in payloads:
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            res = self.client.get(self.url, {"node_id": self.node.id, "pagination": "cursor", "cursor": cursor})
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND, payload)
+
+
+class TestsNodesStorageLayouts(TestSetup):
+    """
+    Test the fast and columnar layouts of the NodesStorage API view.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesStorageLayouts, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:nodes_storage")
+        self.node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+        lines = [storage_line(self.node.id, f"2024-06-01T12:{minute:02d}:00", "21.25") for minute in range(5)]
+        self.client.generic("POST", self.url, "\n".join(lines), content_type="text/plain")
+
+        return super().setUp()
+
+    def test_fast_layout(self):
+        """Test the fast layout returns the readings with numeric metrics and the same dates."""
+        records = self.client.get(self.url, {"node_id": self.node.id})
+        res = self.client.get(self.url, {"node_id": self.node.id, "layout": "fast"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["total"], 5)
+        reading = res.data["results"][0]
+        self.assertEqual(reading["temperature"], 21.25)
+        self.assertEqual(reading["node"], self.node.id)
+        self.assertEqual(reading["date_time"], records.data["results"][0]["date_time"])
+        self.assertEqual(reading["id"], records.data["results"][0]["id"])
+
+    def test_columnar_layout(self):
+        """Test the columnar layout returns one list per field with cursor pagination."""
+        params = {"layout": "columnar", "pagination": "cursor", "order_by": "date_time", "limit": 3}
+        res = self.client.get(self.url, params)
+
+        columns = res.data["results"]
+        self.assertEqual(columns["date_time"], [f"2024-06-01T12:0{minute}:00Z" for minute in range(3)])
+        self.assertEqual(columns["humidity"], [21.25] * 3)
+        following = self.client.get(res.data["next"])
+        self.assertEqual(following.data["results"]["date_time"], ["2024-06-01T12:03:00Z", "2024-06-01T12:04:00Z"])
+
+    def test_invalid_layout(self):
+        """Test an unknown layout returns bad request."""
+        res = self.client.get(self.url, {"layout": "rows"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestsNodesStorageExport(TestSetup):
+    """
+    Test the streaming export of the NodesStorage readings.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsNodesStorageExport, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:nodes_storage_export")
+        self.node = Nodes.objects.create(name="Node 1", type="worker", latitude=11.2, longitude=-74.1)
+        lines = [storage_line(self.node.id, f"2024-06-0{day}T12:00:00", "21.25") for day in range(1, 6)]
+        self.client.generic("POST", reverse("nodes:nodes_storage"), "\n".join(lines), content_type="text/plain")
+
+        return super().setUp()
+
+    def test_export_csv(self):
+        """Test the readings of the range are streamed as CSV ordered by date."""
+        res = self.client.get(
+            self.url, {"node_id": self.node.id, "start_date": "02-06-2024", "end_date": "04-06-2024"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(b"".join(res.streaming_content).decode())))
+        self.assertEqual(rows[0][:3], ["node_id", "date_time", "temperature"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][:3], [str(self.node.id), "2024-06-02T12:00:00+00:00", "21.25"])
+
+    def test_export_ndjson(self):
+        """Test the readings are streamed as one JSON object per line with numeric metrics."""
+        res = self.client.get(self.url, {"node_id": self.node.id, "file_type": "ndjson"})
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        readings = [json.loads(line) for line in b"".join(res.streaming_content).decode().splitlines()]
+        self.assertEqual(len(readings), 5)
+        self.assertEqual(readings[0]["temperature"], 21.25)
+        self.assertEqual(readings[-1]["date_time"], "2024-06-05T12:00:00+00:00")
+
+    def test_export_invalid_file_type(self):
+        """Test an unknown file type returns bad request."""
+        res = self.client.get(self.url, {"file_type": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_export_asgi_streams_async_iterator(self):
+        """Test the ASGI export streams an async iterator instead of a list read before sending it."""
+        res = await self.async_client.get(self.url, {"node_id": self.node.id, "file_type": "ndjson"})
+
+        self.assertTrue(res.is_async)
+        lines = [line async for line in res.streaming_content]
+        readings = [json.loads(line) for line in b"".join(lines).decode().splitlines()]
+        self.assertEqual(len(readings), 5)
@@ -0,0 +1,139 @@
+"""
+Tests for the weather station API and the import of its Excel exports.
+"""
+
+import io
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+import django
+import openpyxl
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from core.test_setup import TestSetup
+from nodes.jobs import run_next_job
+from nodes.models import ImportJob, WeatherStation
+from nodes.utils import excel_to_json, iter_excel_batches
+
+UNITS_ROW = [
+    None,
+    "Temperature [°C]",
+    "Dew Point [°C]",
+    "Solar radiation [W/m2]",
+    "VPD [kPa]",
+    "Relative humidity [%]",
+    "Precipitation [mm]",
+    "Wind speed [m/s]",
+    "Wind gust [m/s]",
+    "Wind direction [deg]",
+    "Solar Panel [mV]",
+    "Battery [mV]",
+    "Delta T [°C]",
+    "Sunshine duration [min]",
+    None,
+]
+VALUES_ROW = ["Date/Time"] + ["avg"] * 13 + ["ET0 [mm]"]
+
+
+def weather_station_excel(start, rows):
+    """Build a weather station export with a reading every 5 minutes."""
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.append(UNITS_ROW)
+    worksheet.append(VALUES_ROW)
+    for index in range(rows):
+        date = start + timedelta(minutes=5 * index)
+        worksheet.append(
+            [date.strftime("%Y-%m-%d %H:%M:%S"), 25.5, 20.1, 300, 1.2, 80.5, 0.0, 1.5, 3.2, 90, 5000, 6000, 3, 5, ""]
+        )
+    content = io.BytesIO()
+    workbook.save(content)
+    return content.getvalue()
+
+
+class TestsExcelToJson(TestSetup):
+    """
+    Test the conversion of the weather station exports.
+    """
+
+    def test_iter_excel_batches(self):
+        """Test the rows are streamed in batches sharing the same units."""
+        content = weather_station_excel(datetime(2024, 6, 1), 25)
+
+        batches = list(iter_excel_batches(io.BytesIO(content), batch_size=10))
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        first = batches[0][0]
+        self.assertEqual(first["date"], "2024-06-01 00:00:00")
+        self.assertEqual(first["temperature"], 25.5)
+        self.assertIsNone(first["evapotranspiration"])
+        self.assertEqual(first["units"]["temperature"], "°C")
+        self.assertEqual(first["units"]["evapotranspiration"], "mm")
+        self.assertIs(batches[0][0]["units"], batches[2][4]["units"])
+
+    def test_excel_to_json(self):
+        """Test the whole sheet is returned as a list."""
+        content = weather_station_excel(datetime(2024, 6, 1), 3)
+
+        data = excel_to_json(content)
+
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data[2]["date"], "2024-06-01 00:10:00")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestsWeatherStationApi(TestSetup):
+    """
+    Test WeatherStation API views.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsWeatherStationApi, cls).setUpClass()
+        django.setup()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super(TestsWeatherStationApi, cls).tearDownClass()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("nodes:weather_station")
+
+        return super().setUp()
+
+    def upload(self, content):
+        """Upload the content as a .xlsx document."""
+        return self.client.post(self.url, {"document": SimpleUploadedFile("data.xlsx", content)}, format="multipart")
+
+    @override_settings(NODES_IMPORT_BATCH_SIZE=4)
+    def test_import_weather_station(self):
+        """Test the export is imported in batches by the import worker."""
+        res = self.upload(weather_station_excel(datetime(2024, 6, 1), 10))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        job = run_next_job("test")
+
+        self.assertEqual(job.status, ImportJob.SUCCEEDED)
+        self.assertEqual(job.total_rows, 10)
+        self.assertEqual(job.accepted_rows, 10)
+        self.assertEqual(WeatherStation.objects.count(), 10)
+
+    def test_import_weather_station_overlapping(self):
+        """Test the rows already stored are skipped when an overlapping export is uploaded."""
+        self.upload(weather_station_excel(datetime(2024, 6, 1), 6))
+        run_next_job("test")
+
+        self.upload(weather_station_excel(datetime(2024, 6, 1, 0, 15), 6))
+        job = run_next_job("test")
+
+        self.assertEqual(job.status, ImportJob.SUCCEEDED)
+        self.assertEqual(job.accepted_rows, 3)
+        self.assertEqual(job.duplicate_rows, 3)
+        self.assertEqual(WeatherStation.objects.count(), 9)
@@ -4,13 +4,28 @@ File that contains the urls of the nodes app.
 
 from django.urls import path
 
-from nodes.views import NodesStorageTxtView, NodesStorageView, NodesView, WeatherStationView
+from nodes.views import (
+    ImportJobView,
+    NodesLatestReadingView,
+    NodesLiveView,
+    NodesStorageAggregateView,
+    NodesStorageExportView,
+    NodesStorageTxtView,
+    NodesStorageView,
+    NodesView,
+    WeatherStationView,
+)
 
 app_name = 'nodes'  # pylint: disable=C0103
 
 urlpatterns: list = [
     path('', NodesView.as_view(), name='nodes_list'),
+    path('latest/', NodesLatestReadingView.as_view(), name='nodes_latest'),
+    path('live/', NodesLiveView.as_view(), name='nodes_live'),
     path('storage/', NodesStorageView.as_view(), name='nodes_storage'),
+    path('storage/aggregate/', NodesStorageAggregateView.as_view(), name='nodes_storage_aggregate'),
+    path('storage/export/', NodesStorageExportView.as_view(), name='nodes_storage_export'),
     path('storage/txt/', NodesStorageTxtView.as_view(), name='nodes_storage_txt'),
     path('weather-station/', WeatherStationView.as_view(), name='weather_station'),
+    path('import-jobs/<int:job_id>/', ImportJobView.as_view(), name='import_job'),
 ]
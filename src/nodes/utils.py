@@ -2,22 +2,46 @@
 This module contains utility functions that are used by the nodes.
 """
 import io
+from typing import BinaryIO, Iterator, Optional
 
 import openpyxl
 
-
-def excel_to_json(excel_bytes: bytes) -> list[dict]:
+WEATHER_STATION_KEYS: list[str] = [
+    "date",
+    "temperature",
+    "dew_point",
+    "solar_radiation",
+    "vapor_pressure_deficit",
+    "relative_humidity",
+    "precipitation",
+    "wind_speed",
+    "wind_gust",
+    "wind_direction",
+    "solar_panel",
+    "battery",
+    "delta_t",
+    "sun_duration",
+    "evapotranspiration",
+]
+
+# Number of header rows in the weather station exports, the data starts after them
+HEADER_ROWS = 2
+
+
+def iter_excel_batches(excel_file: BinaryIO, batch_size: int = 1000) -> Iterator[list[dict]]:
     """
-    Converts an Excel file to a JSON object.
+    Streams an Excel file exported from the weather station as batches of JSON objects.
 
-    Args:
-        excel_bytes (bytes): The Excel file in bytes format.
+    The workbook is opened in read-only mode and the rows are read as plain values, so the memory used depends on the
+    batch size and not on the size of the file. The units are computed once and the same dictionary is shared by all
+    the rows.
 
-    Returns:
-        list[dict]: A list of dictionaries representing the data in the Excel file converted to JSON format.
+    Args:
+        excel_file (BinaryIO): A binary file-like object with the Excel file.
+        batch_size (int): The maximum number of rows in each batch.
 
-    Raises:
-        None.
+    Yields:
+        list[dict]: The next batch of rows converted to JSON objects.
 
     Note:
         - The Excel file should have the following structure:
@@ -29,57 +53,78 @@ def excel_to_json(excel_bytes: bytes) -> list[dict]:
         - The units for each environmental variable will be extracted from the keys in the first row.
         - The resulting JSON object will include a 'units' field for each environmental variable.
     """
+    workbook: openpyxl.Workbook = openpyxl.load_workbook(filename=excel_file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.active
+        rows: Iterator[tuple] = worksheet.iter_rows(values_only=True)
+
+        keys_units: list = list(next(rows, ()))
+        keys_values: list = list(next(rows, ()))
+        if not keys_units or not keys_values:
+            return
+
+        keys_units[0] = keys_values[0] + " [%Y-%m-%d %H:%M:%S]"
+        keys_units[len(keys_units) - 1] = keys_values[len(keys_values) - 1]
+
+        # Create a dictionary of units for each environmental variable
+        units_dict: dict = {}
+        for key_unit in keys_units:
+            if key_unit:
+                key, unit = key_unit.split('[')
+                units_dict[key.strip()] = unit.rstrip(']')
+        data_units: dict = {WEATHER_STATION_KEYS[i]: unit for i, unit in enumerate(units_dict.values())}
+
+        # Positions of the columns with a key, paired with the name of the field
+        columns: list[tuple[int, str]] = list(
+            zip([index for index, key in enumerate(keys_units) if key is not None], WEATHER_STATION_KEYS)
+        )
+
+        batch: list[dict] = []
+        for row in rows:
+            data: dict = {}
+            for index, name in columns:
+                if index < len(row):
+                    data[name] = row[index] if row[index] != '' else None
+            data["units"] = data_units
+            batch.append(data)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        workbook.close()
+
+
+def excel_row_count(excel_file: BinaryIO) -> Optional[int]:
+    """
+    Returns the number of data rows declared in the dimensions of an Excel file exported from the weather station.
+
+    Args:
+        excel_file (BinaryIO): A binary file-like object with the Excel file.
+
+    Returns:
+        int or None: The number of rows after the headers, or None if the file does not declare its dimensions.
+    """
+    workbook: openpyxl.Workbook = openpyxl.load_workbook(filename=excel_file, read_only=True)
+    try:
+        max_row: Optional[int] = workbook.active.max_row
+    finally:
+        workbook.close()
+    return max(max_row - HEADER_ROWS, 0) if max_row else None
 
-    # Load the workbook from the BytesIO object
-    workbook: openpyxl.Workbook = openpyxl.load_workbook(filename=io.BytesIO(excel_bytes))
-
-    # Get the active worksheet
-    worksheet: openpyxl.worksheet.worksheet.Worksheet = workbook.active
-
-    keys_units: list = [cell.value for cell in worksheet[1]]
-
-    # Get the keys from the second row of the worksheet
-    keys_values: list = [cell.value for cell in worksheet[2]]
-
-    keys_units[0] = keys_values[0] + " [%Y-%m-%d %H:%M:%S]"
-    keys_units[len(keys_units) - 1] = keys_values[len(keys_values) - 1]
-
-    keys_name = [
-        "date",
-        "temperature",
-        "dew_point",
-        "solar_radiation",
-        "vapor_pressure_deficit",
-        "relative_humidity",
-        "precipitation",
-        "wind_speed",
-        "wind_gust",
-        "wind_direction",
-        "solar_panel",
-        "battery",
-        "delta_t",
-        "sun_duration",
-        "evapotranspiration",
-    ]
-
-    # Create a dictionary of units for each environmental variable
-    units_dict = {}
-    for key_unit in keys_units:
-        if key_unit:
-            key, unit = key_unit.split('[')
-            unit = unit.rstrip(']')
-            units_dict[key.strip()] = unit
-
-    # Initialize the JSON data
-    json_data: list = []
-
-    # Convert each row in the worksheet to a JSON object
-    for row in worksheet.iter_rows(min_row=3, values_only=True):
-        obj: dict = {key: value if value != '' else None for key, value in zip(keys_units, row) if key is not None}
-        data: dict = {keys_name[i]: value for i, value in enumerate(obj.values())}
-        data_units: dict = {keys_name[i]: units_dict[key] for i, key in enumerate(units_dict.keys())}
-        data["units"] = data_units
-        json_data.append(data)
-
-    # Return the JSON data
-    return json_data
+
+def excel_to_json(excel_bytes: bytes) -> list[dict]:
+    """
+    Converts an Excel file to a JSON object.
+
+    Args:
+        excel_bytes (bytes): The Excel file in bytes format.
+
+    Returns:
+        list[dict]: A list of dictionaries representing the data in the Excel file converted to JSON format.
+
+    Note:
+        - The whole sheet is loaded in memory, use `iter_excel_batches` to process large files in chunks.
+    """
+    return [data for batch in iter_excel_batches(io.BytesIO(excel_bytes)) for data in batch]
@@ -3,32 +3,63 @@ File for the Nodes views.
 """
 
 from datetime import datetime
+from functools import partial
 from typing import Union
 
+from django.conf import settings
 from django.core.exceptions import FieldError
 from django.core.files.uploadedfile import UploadedFile
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.db.models import QuerySet
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.timezone import make_aware
+from django.views import View
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from core.pagination import CustomPaginationClass
-from nodes.models import Nodes, NodesStorage, WeatherStation
+from core.asgi import get_disconnected_event
+from core.pagination import CustomPaginationClass, KeysetPaginationClass
+from core.views import AsyncAPIView
+from nodes.aggregation import aggregate_readings, parse_fields
+from nodes.cache import (
+    NODES_SCOPE,
+    STORAGE_SCOPE,
+    WEATHER_STATION_SCOPE,
+    acached_response,
+    cached_response,
+    invalidate,
+    storage_scope,
+)
+from nodes.downsampling import downsample_readings
+from nodes.export import EXPORT_FORMATS, EXPORT_STREAMS, astream
+from nodes.ingestion import NodesStorageIngestor
+from nodes.jobs import enqueue_import
+from nodes.live import stream_events
+from nodes.models import ImportJob, Nodes, NodesStorage, WeatherStation
+from nodes.rollups import ROLLUP_BUCKETS, aggregate_rollups
 from nodes.serializers import (
     DataWeatherStationSerializer,
+    ImportJobSerializer,
+    NodesLatestReadingSerializer,
     NodesSerializer,
+    NodesStorageFastSerializer,
     NodesStorageSerializer,
     NodesStorageTxtSerializer,
     WeatherStationSerializer,
 )
 
 
-class NodesView(APIView):
+class NodesView(AsyncAPIView):
     """
     A Django REST Framework view for the Nodes model.
 
+    The GET requests are served asynchronously, the writes run in a thread.
+
     Attributes:
         permission_classes (tuple): A tuple of permission classes that the view requires.
         serializer_class (NodesSerializer): The serializer class to use for serializing and deserializing data.
@@ -43,7 +74,7 @@ class NodesView(APIView):
         """
         return Nodes.objects.filter(is_active=True)
 
-    def get(self, request) -> Response:
+    async def get(self, request) -> Response:
         """
         Handles GET requests and returns a serialized response of all nodes.
 
@@ -51,11 +82,11 @@ class NodesView(APIView):
             request (HttpRequest): The HTTP request object.
 
         Returns:
-            Response: A serialized response of all nodes.
+            Response: A serialized response of all nodes, cached until a node is created or updated.
         """
-        queryset = self.get_queryset()
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        return await acached_response(
+            request, [NODES_SCOPE], lambda: Response(self.serializer_class(self.get_queryset(), many=True).data)
+        )
 
     def post(self, request) -> Response:
         """
@@ -70,6 +101,7 @@ class NodesView(APIView):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            invalidate(NODES_SCOPE)
             return Response({'message': 'Node created successfully!'}, status=status.HTTP_201_CREATED)
         return Response(
             {'message': 'Node not created!', "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
@@ -93,6 +125,7 @@ class NodesView(APIView):
         serializer = self.serializer_class(node, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            invalidate(NODES_SCOPE)
             return Response(
                 {'message': f'Node {node.name} with id {node.id} updated successfully!'}, status=status.HTTP_200_OK
             )
@@ -101,19 +134,174 @@ class NodesView(APIView):
         )
 
 
-class NodesStorageView(APIView):
+class NodesLatestReadingView(AsyncAPIView):
+    """
+    A Django REST Framework view that returns every node with its last reading.
+
+    The nodes and their readings are read from the latest reading snapshot with one query.
+
+    Attributes:
+        permission_classes (tuple): A tuple of permission classes that the view requires.
+        serializer_class (NodesLatestReadingSerializer): The serializer class to use for serializing the nodes.
+    """
+
+    permission_classes = (AllowAny,)
+    serializer_class = NodesLatestReadingSerializer
+
+    def get_queryset(self) -> QuerySet[Nodes]:
+        """
+        Returns the active nodes joined with their last reading.
+        """
+        return Nodes.objects.filter(is_active=True).select_related('latest_reading__reading').order_by('id')
+
+    async def get(self, request) -> Response:
+        """
+        Handles GET requests and returns the nodes with the date, age, battery level and metrics of their last
+        reading, and whether they are stale.
+
+        Parameters:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            Response: A serialized response of all nodes.
+        """
+        nodes = [node async for node in self.get_queryset()]
+        serializer = self.serializer_class(nodes, many=True, context={'now': timezone.now()})
+        return Response(serializer.data)
+
+
+class NodesLiveView(View):
+    """
+    An asynchronous view that streams the new NodesStorage readings as server-sent events.
+
+    The readings are pushed once they are committed, so the dashboards do not need to poll the nodes storage
+    endpoint. It must be served by the ASGI application, each open stream is a coroutine of the server that ends when
+    the client disconnects or after `NODES_LIVE_MAX_LIFETIME` seconds, the clients reconnect automatically.
+    """
+
+    async def get(self, request) -> Union[StreamingHttpResponse, JsonResponse]:
+        """
+        Handles GET requests and streams the readings.
+
+        Query parameters:
+        - node_id: A comma separated list of the nodes to receive. Default is every node.
+
+        Parameters:
+        - request: The GET request object.
+
+        Returns:
+        - StreamingHttpResponse: The event stream, or a 400 response if the nodes are not valid.
+        """
+        node_id: str = request.GET.get('node_id', '')
+        try:
+            node_ids = {int(value) for value in node_id.split(',') if value.strip()} or None
+        except ValueError:
+            return JsonResponse({'message': 'node_id must be a list of numbers!'}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = stream_events(
+            node_ids,
+            settings.NODES_LIVE_HEARTBEAT,
+            settings.NODES_LIVE_MAX_LIFETIME,
+            get_disconnected_event(request),
+        )
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class NodesStorageFilterMixin:
+    """
+    A mixin that filters the NodesStorage readings by the node and date range sent in the query parameters.
+
+    Query parameters:
+        node_id (str, optional): The id of the node.
+        start_date (str, optional): The first day of the range in the format '%d-%m-%Y'.
+        end_date (str, optional): The last day of the range in the format '%d-%m-%Y'.
+    """
+
+    def get_date_range(self) -> Union[tuple[datetime, datetime], None]:
+        """
+        Returns the date range sent in the query parameters.
+
+        Returns:
+            tuple[datetime, datetime] or None: The start of the first day and the end of the last day, or None if the
+                range was not sent.
+
+        Raises:
+            ValueError: If the dates do not have the expected format or the start is greater than the end.
+        """
+        start_date: str = self.request.query_params.get('start_date')
+        end_date: str = self.request.query_params.get('end_date')
+        if not start_date or not end_date:
+            return None
+
+        start: datetime = datetime.strptime(start_date, '%d-%m-%Y').replace(hour=0, minute=0, second=0)
+        end: datetime = datetime.strptime(end_date, '%d-%m-%Y').replace(hour=23, minute=59, second=59)
+        if start > end:
+            raise ValueError("Start date cannot be greater than end date!")
+        return make_aware(start), make_aware(end)
+
+    def filter_readings(self, queryset: QuerySet[NodesStorage]) -> QuerySet[NodesStorage]:
+        """
+        Filters the readings by node and date range.
+
+        Args:
+            queryset (QuerySet[NodesStorage]): The readings to filter.
+
+        Returns:
+            QuerySet[NodesStorage]: The filtered readings.
+
+        Raises:
+            ValueError: If the node does not have readings or the date range is not valid.
+        """
+        node_id: str = self.request.query_params.get('node_id')
+
+        if node_id:
+            queryset = queryset.filter(node_id=node_id)
+            if not queryset.exists():
+                raise ValueError(f"Node with id {node_id} does not exist!")
+        date_range = self.get_date_range()
+        if date_range:
+            queryset = queryset.filter(date_time__range=date_range)
+        return queryset
+
+
+class NodesStorageView(NodesStorageFilterMixin, AsyncAPIView):
     """
     A Django REST Framework view for handling GET and POST requests for the NodesStorage model.
 
+    The GET requests are served asynchronously and only the responses that are not cached are built in a thread, the
+    ingestion of the POST requests runs in a thread.
+
     Attributes:
         permission_classes (tuple): A tuple of permission classes that the view requires.
         serializer_class (NodesStorageSerializer): The serializer class to use for serializing and deserializing data.
         pagination_class (CustomPaginationClass): The pagination class to use for paginating the data.
+        cursor_pagination_class (KeysetPaginationClass): The pagination class to use for paginating by cursor.
+        fast_serializer_class (NodesStorageFastSerializer): The serializer class to use for the fast layouts.
     """
 
     permission_classes = (AllowAny,)
     serializer_class = NodesStorageSerializer
+    fast_serializer_class = NodesStorageFastSerializer
     pagination_class = CustomPaginationClass
+    cursor_pagination_class = KeysetPaginationClass
+
+    def get_paginator(self) -> Union[CustomPaginationClass, KeysetPaginationClass]:
+        """
+        Returns the paginator requested in the query parameters.
+
+        With 'pagination=cursor' the readings are paginated by (date_time, id) keyset, ordered by 'date_time' when it
+        is sent in 'order_by' or by '-date_time' otherwise, and 'count=false' skips the total.
+
+        Returns:
+            CustomPaginationClass or KeysetPaginationClass: The paginator to use.
+        """
+        if self.request.query_params.get('pagination') == 'cursor':
+            descending = self.request.query_params.get('order_by') != 'date_time'
+            return self.cursor_pagination_class(ordering_field='date_time', descending=descending)
+        return self.pagination_class()
 
     def get_queryset(self) -> QuerySet[NodesStorage]:
         """
@@ -123,24 +311,9 @@ class NodesStorageView(APIView):
             QuerySet[NodesStorage]: The filtered queryset of NodesStorage objects.
         """
 
-        queryset: QuerySet[NodesStorage] = NodesStorage.objects.filter(is_active=True)
-        node_id: str = self.request.query_params.get('node_id')
-        start_date: str = self.request.query_params.get('start_date')
-        end_date: str = self.request.query_params.get('end_date')
+        queryset: QuerySet[NodesStorage] = self.filter_readings(NodesStorage.objects.filter(is_active=True))
         order_by: str = self.request.query_params.get('order_by', '-date_time')  # Default ordering
 
-        if node_id:
-            queryset = queryset.filter(node_id=node_id)
-            if not queryset.exists():
-                raise ValueError(f"Node with id {node_id} does not exist!")
-        if start_date and end_date:
-            if start_date > end_date:
-                raise ValueError("Start date cannot be greater than end date!")
-
-            start: datetime = datetime.strptime(start_date, '%d-%m-%Y').replace(hour=0, minute=0, second=0)
-            end: datetime = datetime.strptime(end_date, '%d-%m-%Y').replace(hour=23, minute=59, second=59)
-            queryset = queryset.filter(date_time__range=(make_aware(start), make_aware(end)))
-
         try:
             queryset = queryset.order_by(order_by)
         except FieldError:
@@ -148,97 +321,244 @@ class NodesStorageView(APIView):
 
         return queryset
 
-    def get(self, request) -> Response:
+    async def get(self, request) -> Response:
         """
         Handles GET requests. Retrieves the queryset, serializes the data, and returns the response.
 
+        The readings are paginated by page number, or by cursor when the query parameter 'pagination' is 'cursor'.
+
+        With the query parameter 'max_points' every metric of the range is downsampled instead, see `downsample`.
+
+        The query parameter 'layout' selects the format of the results: 'records' (default) serializes every field of
+        the model, 'fast' reads only the readings values and sends the metrics as numbers, and 'columnar' sends the
+        same values as one list per field.
+
+        The responses are cached per node until new readings of the node are stored.
+
         Parameters:
         - request: The GET request object.
 
         Returns:
         - Response: The serialized data response.
         """
+        node_id: str = request.query_params.get('node_id')
+        scope = storage_scope(node_id) if node_id else STORAGE_SCOPE
+        return await acached_response(request, [scope], lambda: self.list(request))
+
+    def list(self, request) -> Response:
+        """
+        Builds the response of a GET request without the cache.
+
+        Parameters:
+        - request: The GET request object.
+
+        Returns:
+        - Response: The serialized data response.
+        """
+        layout: str = request.query_params.get('layout', 'records')
+        if layout != 'records' and layout not in self.fast_serializer_class.layouts:
+            layouts = ', '.join(('records',) + self.fast_serializer_class.layouts)
+            return Response(
+                {'message': f"Layout {layout} is not valid, the options are: {layouts}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         try:
             queryset = self.get_queryset()
+            if request.query_params.get('max_points'):
+                return self.downsample(request, queryset)
         except ValueError as error:
             return Response({'message': str(error)}, status=status.HTTP_400_BAD_REQUEST)
 
-        paginator = self.pagination_class()
+        if layout == 'records':
+            serializer_class = partial(self.serializer_class, many=True)
+        else:
+            queryset = queryset.values(*self.fast_serializer_class.fields)
+            serializer_class = partial(self.fast_serializer_class, layout=layout)
+
+        paginator = self.get_paginator()
 
         page = paginator.paginate_queryset(queryset, request)
 
         if page is not None:
-            serializer = self.serializer_class(page, many=True)
-            return paginator.get_paginated_response(serializer.data)
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+            return paginator.get_paginated_response(serializer_class(page).data)
+        return Response(serializer_class(queryset).data)
+
+    def downsample(self, request, queryset: QuerySet[NodesStorage]) -> Response:
+        """
+        Returns every metric of the readings of a node reduced to at most 'max_points' points, without pagination.
+
+        The readings of a node are one series, so downsampling requires a node_id, the readings of every node would
+        be loaded at once and merged into a meaningless series.
+
+        Query parameters:
+        - node_id: The id of the node, required.
+        - max_points: The maximum number of points of every metric.
+        - method: The downsampling algorithm, lttb (default) or minmax.
+        - fields: A comma separated list of the metrics. Default is all of them.
+
+        Parameters:
+        - request: The GET request object.
+        - queryset: The filtered readings.
+
+        Returns:
+        - Response: The dates and values kept of each metric.
+
+        Raises:
+            ValueError: If the parameters are not valid.
+        """
+        if not request.query_params.get('node_id'):
+            raise ValueError('Please provide a node_id!')
+        try:
+            max_points = int(request.query_params['max_points'])
+        except ValueError as error:
+            raise ValueError("max_points must be a number!") from error
+        method: str = request.query_params.get('method', 'lttb')
+        fields = parse_fields(request.query_params.get('fields'))
+        results = downsample_readings(queryset, fields, max_points, method)
+        return Response({'max_points': max_points, 'method': method, 'fields': fields, 'results': results})
 
     def post(self, request):
         """
-        Handles POST requests. Extracts the data from the request, validates it, saves it, and returns the response.
+        Handles POST requests. Parses every line of the body and stores the new readings in one bulk insert.
+
+        The duplicates are resolved against the (node, date_time) unique constraint with a single lookup and the
+        invalid lines are rejected without stopping the ingestion of the valid ones.
 
         Parameters:
         - request: The POST request object.
 
         Returns:
-        - Response: The success or error message response.
+        - Response: The accepted, duplicate and rejected counts of the lines sent.
         """
-        request_data = request.body.decode('utf-8').split('\n') if request.body else None
+        request_data = request.body.decode('utf-8').splitlines() if request.body else None
         if not request_data:
             return Response(
                 {'message': 'Please provide data!', "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        responses = []
-        for item in request_data:
-            data = item.split(';')
-            try:
-                data_storage = {
-                    'node': data[0],
-                    "date_time": data[1],
-                    "temperature": data[2],
-                    "humidity": data[3],
-                    "pressure": data[4],
-                    "altitude": data[5],
-                    "humidity_hd38": data[6],
-                    "humidity_soil": data[7],
-                    "temperature_soil": data[8],
-                    "conductivity_soil": data[9],
-                    "ph_soil": data[10],
-                    "nitrogen_soil": data[11],
-                    "phosphorus_soil": data[12],
-                    "potassium_soil": data[13],
-                    "battery_level": data[14],
-                }
-            except IndexError:
-                return Response(
-                    {
-                        'message': 'Format data is not correct!',
-                        "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    },
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            data_node: Union[NodesStorage, None] = NodesStorage.objects.filter(
-                node=data_storage['node'], date_time=data_storage['date_time']
-            ).first()
-            if data_node:
-                continue
-
-            serializer = self.serializer_class(data=data_storage)
-            if serializer.is_valid():
-                serializer.save()
-                responses.append(f'Node {data_storage["node"]} data created successfully!')
-            else:
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        ingestor = NodesStorageIngestor()
+        with transaction.atomic():
+            for line_number, line in enumerate(request_data, start=1):
+                if line.strip():
+                    ingestor.add_line(line_number, line)
+            ingestor.flush()
 
+        result = ingestor.result
+        if result.rejected and not result.accepted and not result.duplicates:
+            return Response(
+                {
+                    'message': 'Format data is not correct!',
+                    **result.as_dict(),
+                    "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         return Response(
-            {'messages': responses, "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
+            {
+                'message': 'Data processed successfully!',
+                **result.as_dict(),
+                "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            },
             status=status.HTTP_201_CREATED,
         )
 
 
+class NodesStorageAggregateView(NodesStorageFilterMixin, APIView):
+    """
+    A Django REST Framework view that returns the NodesStorage readings aggregated into time buckets.
+
+    The min, max, avg and count of every metric are computed in the database, so a chart of a long range is built
+    with one small query instead of paging through the raw readings. The hourly, daily and weekly buckets are read
+    from the rollups when they are enabled, so their cost does not grow with the raw table.
+
+    Attributes:
+        permission_classes (tuple): A tuple of permission classes that the view requires.
+    """
+
+    permission_classes = (AllowAny,)
+
+    def get(self, request) -> Response:
+        """
+        Handles GET requests and returns the aggregated readings.
+
+        Query parameters:
+        - node_id, start_date, end_date: The filters of the readings, as in the nodes storage endpoint.
+        - bucket: The size of the time buckets, one of minute, hour, day or week. Default is hour.
+        - fields: A comma separated list of the metrics to aggregate. Default is all of them.
+
+        Parameters:
+        - request: The GET request object.
+
+        Returns:
+        - Response: The aggregated readings, one item per bucket.
+        """
+        if not request.query_params.get('node_id'):
+            return Response({'message': 'Please provide a node_id!'}, status=status.HTTP_400_BAD_REQUEST)
+
+        bucket: str = request.query_params.get('bucket', 'hour')
+        try:
+            fields = parse_fields(request.query_params.get('fields'))
+            queryset = self.filter_readings(NodesStorage.objects.filter(is_active=True))
+            if settings.NODES_ROLLUPS_ENABLED and bucket in ROLLUP_BUCKETS:
+                results = aggregate_rollups(request.query_params['node_id'], bucket, fields, self.get_date_range())
+            else:
+                results = aggregate_readings(queryset, bucket, fields)
+        except ValueError as error:
+            return Response({'message': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'bucket': bucket, 'fields': fields, 'results': results})
+
+
+class NodesStorageExportView(NodesStorageFilterMixin, APIView):
+    """
+    A Django REST Framework view that streams the NodesStorage readings as a CSV or NDJSON file.
+
+    The readings are read with a server side cursor and written while the response is sent, so ranges of several
+    years are exported in one request with constant memory. Under ASGI the response streams an async iterator, a sync
+    one would be read to the end before sending it.
+
+    Attributes:
+        permission_classes (tuple): A tuple of permission classes that the view requires.
+    """
+
+    permission_classes = (AllowAny,)
+
+    def get(self, request) -> Union[StreamingHttpResponse, Response]:
+        """
+        Handles GET requests and streams the readings ordered by date.
+
+        Query parameters:
+        - node_id, start_date, end_date: The filters of the readings, as in the nodes storage endpoint.
+        - file_type: The format of the file, csv or ndjson. Default is csv.
+
+        Parameters:
+        - request: The GET request object.
+
+        Returns:
+        - StreamingHttpResponse: The readings as an attachment, or a 400 response if the filters are not valid.
+        """
+        file_type: str = request.query_params.get('file_type', 'csv')
+        if file_type not in EXPORT_FORMATS:
+            return Response(
+                {'message': f"File type {file_type} is not valid, the options are: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            queryset = self.filter_readings(NodesStorage.objects.filter(is_active=True))
+        except ValueError as error:
+            return Response({'message': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        node_id: str = request.query_params.get('node_id', 'all')
+        content = EXPORT_STREAMS[file_type](queryset)
+        if isinstance(request._request, ASGIRequest):  # pylint: disable=protected-access
+            content = astream(content)
+        response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[file_type])
+        response['Content-Disposition'] = f'attachment; filename="nodes_storage_{node_id}.{file_type}"'
+        return response
+
+
 class NodesStorageTxtView(APIView):
     """
     A view for storing text documents in the system.
@@ -257,11 +577,14 @@ class NodesStorageTxtView(APIView):
         """
         Handles the HTTP POST request for uploading a text document.
 
+        The document is stored and queued to be imported by the import workers, the progress of the import can be
+        polled with the returned job id.
+
         Args:
             request (Request): The HTTP request object.
 
         Returns:
-            Response: The HTTP response object.
+            Response: A 202 response with the id of the import job, or the validation errors of the document.
         """
         document: UploadedFile = request.data.get('document')
         if not document:
@@ -269,8 +592,15 @@ class NodesStorageTxtView(APIView):
 
         serializer = NodesStorageTxtSerializer(data={'document': document})
         if serializer.is_valid():
-            serializer.save()
-            return Response({'message': 'Document uploaded successfully!'}, status=status.HTTP_201_CREATED)
+            job = enqueue_import(ImportJob.NODES_STORAGE_TXT, serializer.validated_data['document'])
+            return Response(
+                {
+                    'message': 'Document queued for import!',
+                    'job_id': job.id,
+                    'status_url': reverse('nodes:import_job', kwargs={'job_id': job.id}),
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -285,24 +615,32 @@ class WeatherStationView(APIView):
 
     permission_classes = (AllowAny,)
     pagination_class = CustomPaginationClass
+    cursor_pagination_class = KeysetPaginationClass
     get_queryset = WeatherStation.objects.all()
 
     def post(self, request) -> Response:
         """
-        Handles POST requests and uploads a document.
+        Handles POST requests and queues the uploaded document to be imported by the import workers.
 
         Parameters:
             request (HttpRequest): The HTTP request object.
 
         Returns:
-            Response: A response indicating whether the document was uploaded successfully or not.
+            Response: A 202 response with the id of the import job, or the validation errors of the document.
         """
         document = request.data.get('document')
         serializer = WeatherStationSerializer(data={'document': document})
 
         if serializer.is_valid():
-            serializer.save()
-            return Response({"message": "Document uploaded successfully"}, status=status.HTTP_201_CREATED)
+            job = enqueue_import(ImportJob.WEATHER_STATION, serializer.validated_data['document'])
+            return Response(
+                {
+                    "message": "Document queued for import",
+                    "job_id": job.id,
+                    "status_url": reverse('nodes:import_job', kwargs={'job_id': job.id}),
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
 
         return Response(
             {"error": "Error uploading document", "details": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
@@ -317,8 +655,28 @@ class WeatherStationView(APIView):
 
         Returns:
             Response: A serialized response of all documents.
+
+        Note:
+            - With 'pagination=cursor' the rows are paginated by (date, id) keyset from the newest to the oldest and
+              'count=false' skips the total.
+            - The responses are cached until a new document is imported.
         """
-        paginator = self.pagination_class()
+        return cached_response(request, [WEATHER_STATION_SCOPE], lambda: self.list(request))
+
+    def list(self, request) -> Response:
+        """
+        Builds the response of a GET request without the cache.
+
+        Parameters:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            Response: A serialized response of all documents.
+        """
+        if request.query_params.get('pagination') == 'cursor':
+            paginator = self.cursor_pagination_class(ordering_field='date')
+        else:
+            paginator = self.pagination_class()
 
         page = paginator.paginate_queryset(self.get_queryset, request)
 
@@ -327,3 +685,32 @@ class WeatherStationView(APIView):
             return paginator.get_paginated_response(serializer.data)
         serializer = self.serializer_class(self.get_queryset, many=True)
         return Response(serializer.data)
+
+
+class ImportJobView(AsyncAPIView):
+    """
+    A Django REST Framework view to poll the progress of a sensor file import.
+
+    Attributes:
+        permission_classes (tuple): A tuple of permission classes that the view requires.
+        serializer_class (ImportJobSerializer): The serializer class to use for serializing the job.
+    """
+
+    permission_classes = (AllowAny,)
+    serializer_class = ImportJobSerializer
+
+    async def get(self, request, job_id: int) -> Response:
+        """
+        Handles GET requests and returns the status, row counts, errors and timings of an import job.
+
+        Parameters:
+            request (HttpRequest): The HTTP request object.
+            job_id (int): The id of the import job.
+
+        Returns:
+            Response: The serialized import job, or a 404 response if it does not exist.
+        """
+        job = await ImportJob.objects.filter(id=job_id, is_active=True).afirst()
+        if not job:
+            return Response({'message': f'Import job with id {job_id} not found!'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self.serializer_class(job).data)
@@ -0,0 +1,94 @@
+"""
+This module contains the write-behind buffer of the visits.
+
+The visits are queued in memory and written with one bulk insert when the buffer is full, every few seconds, and when
+the process exits, so tracking the page views does not take one database connection and one INSERT per request.
+"""
+
+import atexit
+import logging
+import threading
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from reports.models import Visitors
+
+logger = logging.getLogger(__name__)
+
+
+class VisitsBuffer:
+    """
+    A thread-safe buffer of the visits of the process, flushed by a background thread.
+
+    Attributes:
+        max_size (int): The number of pending visits that triggers a flush.
+        flush_interval (float): The maximum seconds a visit waits to be written.
+    """
+
+    def __init__(self, max_size: int, flush_interval: float):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._visits: list[Visitors] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, visit: Visitors) -> None:
+        """
+        Queues a visit, the flush thread is started with the first visit of the process.
+
+        Args:
+            visit (Visitors): The visit to write.
+        """
+        with self._lock:
+            self._visits.append(visit)
+            pending = len(self._visits)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='visits-buffer', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        if pending >= self.max_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Writes the pending visits with one bulk insert, they are queued again if the insert fails.
+
+        Returns:
+            int: The number of visits written.
+        """
+        with self._lock:
+            visits, self._visits = self._visits, []
+        if not visits:
+            return 0
+        try:
+            Visitors.objects.bulk_create(visits, batch_size=self.max_size)
+        except Exception:
+            with self._lock:
+                self._visits[:0] = visits
+                # Keep a bounded backlog while the database is not available
+                overflow = len(self._visits) - self.max_size * 10
+                if overflow > 0:
+                    del self._visits[:overflow]
+                    logger.warning('Visits buffer is full, dropped %s visits', overflow)
+            raise
+        return len(visits)
+
+    def _run(self) -> None:
+        """
+        Flushes the buffer every `flush_interval` seconds or as soon as it is full.
+        """
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Could not write the buffered visits, retrying on the next flush')
+            finally:
+                close_old_connections()
+
+
+visits_buffer = VisitsBuffer(settings.REPORTS_VISITS_BUFFER_SIZE, settings.REPORTS_VISITS_FLUSH_INTERVAL)
@@ -0,0 +1,71 @@
+"""
+Django command to refresh the daily rollups of the visits and prune the summarized visits.
+"""
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils.timezone import localdate
+
+from reports.models import Visitors, VisitorsDailyRollup
+from reports.rollups import day_start, pending_range, refresh_visitors_rollups
+
+
+class Command(BaseCommand):
+    """
+    Django command to refresh the daily rollups of the visits from the raw visits.
+
+    Without a range, the rollups are refreshed incrementally from the last day with rollups to today, so the command
+    can be scheduled, e.g. every hour.
+    """
+
+    help = 'Refreshes the daily rollups of the visits and optionally prunes the visits that were summarized.'
+
+    def add_arguments(self, parser):
+        """Arguments of the command."""
+        parser.add_argument('--start', help='First day to refresh in the format YYYY-MM-DD.')
+        parser.add_argument('--end', help='Last day to refresh in the format YYYY-MM-DD.')
+        parser.add_argument(
+            '--prune-days', type=int, help='Delete the visits older than this number of days that were summarized.'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            start = datetime.strptime(options['start'], '%Y-%m-%d').date() if options['start'] else None
+            end = datetime.strptime(options['end'], '%Y-%m-%d').date() if options['end'] else None
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+        if options['prune_days'] is not None and options['prune_days'] < 1:
+            raise CommandError('--prune-days must be greater than 0.')
+
+        today = localdate()
+        if start is None:
+            pending = pending_range(today)
+            start = pending[0] if pending else None
+        end = end or today
+
+        if start is None:
+            self.stdout.write(self.style.SUCCESS('There are no visits to summarize.'))
+        elif start > end:
+            raise CommandError('The start date cannot be greater than the end date.')
+        else:
+            with transaction.atomic():
+                written = refresh_visitors_rollups(start, end)
+            self.stdout.write(self.style.SUCCESS(f'{written} rollups written from {start} to {end}.'))
+
+        if options['prune_days'] is not None:
+            self.prune(today - timedelta(days=options['prune_days']))
+
+    def prune(self, before):
+        """
+        Deletes the visits of the days before a date, only up to the last complete day with rollups.
+        """
+        last = VisitorsDailyRollup.objects.aggregate(last=Max('date'))['last']
+        if last is None:
+            return
+        # The last day with rollups may have received visits after it was summarized
+        cutoff = min(before, last)
+        deleted, _ = Visitors.objects.filter(created_at__lt=day_start(cutoff)).delete()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} visits before {cutoff} deleted.'))
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitorsDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deleted_at', models.DateTimeField(blank=True, default=None, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('date', models.DateField()),
+                ('page', models.CharField(blank=True, default='', max_length=255)),
+                ('visits', models.PositiveIntegerField()),
+                ('unique_ips', models.PositiveIntegerField()),
+                ('authenticated_users', models.PositiveIntegerField()),
+            ],
+            options={
+                'db_table': 'visitors_daily_rollup',
+                'ordering': ['date', 'page'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='visitors',
+            index=models.Index(fields=['created_at'], name='visitors_created_at'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='visitorsdailyrollup',
+            unique_together={('date', 'page')},
+        ),
+    ]
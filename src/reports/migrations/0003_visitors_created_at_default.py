@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0002_visitorsdailyrollup"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="visitors",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -3,6 +3,7 @@ File that contains the Django models for the reports app.
 """
 
 from django.db import models
+from django.utils import timezone
 
 from core.models import BaseModel
 from user.models import User
@@ -15,11 +16,13 @@ class Visitors(BaseModel):
     Fields:
     - ip_address: A field to store the visitor's IP address.
     - user: A foreign key to the User model, allowing a visitor to be associated with a user.
+    - created_at: The time of the visit, set when it is queued, as the buffered visits are written later.
     """
 
     ip_address = models.GenericIPAddressField()
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     page = models.CharField(max_length=255, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         """
@@ -30,3 +33,38 @@ class Visitors(BaseModel):
         """
 
         db_table = 'visitors'
+        indexes = [models.Index(fields=['created_at'], name='visitors_created_at')]
+
+
+class VisitorsDailyRollup(BaseModel):
+    """
+    A Django model that stores the visits of every page summarized per day.
+
+    The rollups are maintained by the `rollup_visitors` command, so the reports of a date range read one row per day
+    and page instead of the raw visits, which can be pruned after they are summarized.
+
+    Fields:
+    - date: The day of the visits.
+    - page: The page visited, empty for the visits without page.
+    - visits: The number of visits.
+    - unique_ips: The number of distinct ip addresses.
+    - authenticated_users: The number of distinct authenticated users.
+    """
+
+    date = models.DateField()
+    page = models.CharField(max_length=255, blank=True, default='')
+    visits = models.PositiveIntegerField()
+    unique_ips = models.PositiveIntegerField()
+    authenticated_users = models.PositiveIntegerField()
+
+    class Meta:
+        """
+        Meta class for the VisitorsDailyRollup model.
+
+        Fields:
+        - db_table: The name of the database table.
+        """
+
+        db_table = 'visitors_daily_rollup'
+        ordering = ['date', 'page']
+        unique_together = ['date', 'page']
@@ -0,0 +1,129 @@
+"""
+This module maintains the daily rollups of the visits.
+
+The rollups of a range of days are recomputed from the raw visits and upserted, so refreshing them is idempotent and
+the last day can be refreshed while it is still receiving visits.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from django.db.models import Count, Max, Min, QuerySet, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils.timezone import localdate, make_aware
+
+from reports.models import Visitors, VisitorsDailyRollup
+
+
+def day_start(day: date) -> datetime:
+    """
+    Returns the start of a day in the current time zone.
+    """
+    return make_aware(datetime.combine(day, time.min))
+
+
+def refresh_visitors_rollups(start: date, end: date) -> int:
+    """
+    Recomputes the rollups of every day between two dates, both included.
+
+    Args:
+        start (date): The first day.
+        end (date): The last day.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    rows = (
+        Visitors.objects.filter(created_at__gte=day_start(start), created_at__lt=day_start(end + timedelta(days=1)))
+        .order_by()
+        .annotate(day=TruncDate('created_at'), page_name=Coalesce('page', Value('')))
+        .values('day', 'page_name')
+        .annotate(
+            visits=Count('id'),
+            unique_ips=Count('ip_address', distinct=True),
+            authenticated_users=Count('user', distinct=True),
+        )
+    )
+    rollups = [
+        VisitorsDailyRollup(
+            date=row['day'],
+            page=row['page_name'],
+            visits=row['visits'],
+            unique_ips=row['unique_ips'],
+            authenticated_users=row['authenticated_users'],
+        )
+        for row in rows
+    ]
+    VisitorsDailyRollup.objects.bulk_create(
+        rollups,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['date', 'page'],
+        update_fields=['visits', 'unique_ips', 'authenticated_users', 'updated_at'],
+    )
+    return len(rollups)
+
+
+def pending_range(today: date) -> Optional[tuple[date, date]]:
+    """
+    Returns the days to refresh incrementally, from the last day with rollups, which may be partial, to today.
+
+    Args:
+        today (date): The last day to refresh.
+
+    Returns:
+        tuple[date, date] or None: The first and last days, or None if there are no visits.
+    """
+    last = VisitorsDailyRollup.objects.aggregate(last=Max('date'))['last']
+    if last is None:
+        first_visit = Visitors.objects.aggregate(first=Min('created_at'))['first']
+        if first_visit is None:
+            return None
+        last = localdate(first_visit)
+    return last, today
+
+
+async def apruned_rollups() -> QuerySet:
+    """
+    Returns the rollups of the days whose visits were pruned, the days before the first remaining visit, or every
+    rollup if no visit remains.
+
+    The `rollup_visitors` command prunes whole days that were summarized, so these rollups and the remaining visits
+    count every visit once.
+    """
+    first_visit = (await Visitors.objects.aaggregate(first=Min('created_at')))['first']
+    rollups = VisitorsDailyRollup.objects.order_by()
+    if first_visit is not None:
+        rollups = rollups.filter(date__lt=localdate(first_visit))
+    return rollups
+
+
+def summarize_rollups(start: Optional[date] = None, end: Optional[date] = None) -> dict:
+    """
+    Summarizes the rollups of a range of days per page and per day.
+
+    Args:
+        start (date, optional): The first day, or None to start with the first rollup.
+        end (date, optional): The last day, or None to end with the last rollup.
+
+    Returns:
+        dict: The total visits, and the visits, daily unique ips and daily authenticated users per page, from the
+            most visited, and per day.
+    """
+    rollups = VisitorsDailyRollup.objects.order_by()
+    if start:
+        rollups = rollups.filter(date__gte=start)
+    if end:
+        rollups = rollups.filter(date__lte=end)
+    totals = {
+        'visits': Sum('visits'),
+        'unique_ips': Sum('unique_ips'),
+        'authenticated_users': Sum('authenticated_users'),
+    }
+    pages = list(rollups.values('page').annotate(**totals).order_by('-visits', 'page'))
+    days = list(rollups.values('date').annotate(**totals).order_by('date'))
+    return {
+        'visits': sum(day['visits'] for day in days),
+        'pages': pages,
+        'days': days,
+    }
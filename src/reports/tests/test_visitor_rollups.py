@@ -0,0 +1,146 @@
+"""
+Tests for the daily rollups of the visits.
+"""
+
+from datetime import date, datetime
+from io import StringIO
+
+import django
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.timezone import make_aware
+from rest_framework import status
+
+from core.test_setup import TestSetup
+from reports.models import Visitors, VisitorsDailyRollup
+from reports.rollups import pending_range
+
+
+class TestsVisitorRollups(TestSetup):
+    """
+    Test the rollup_visitors command and the daily visitors view.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsVisitorRollups, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("visitor_daily")
+        super().setUp()
+        visits = [
+            ("2024-06-01 08:00", "home", "10.0.0.1", self.user),
+            ("2024-06-01 09:00", "home", "10.0.0.1", None),
+            ("2024-06-01 10:00", "home", "10.0.0.2", None),
+            ("2024-06-01 11:00", "nodes", "10.0.0.1", self.user),
+            ("2024-06-02 08:00", "home", "10.0.0.3", None),
+        ]
+        for created_at, page, ip_address, user in visits:
+            visit = Visitors.objects.create(page=page, ip_address=ip_address, user=user)
+            Visitors.objects.filter(pk=visit.pk).update(
+                created_at=make_aware(datetime.strptime(created_at, "%Y-%m-%d %H:%M"))
+            )
+
+    def rollup(self, *args) -> str:
+        """Runs the rollup_visitors command and returns its output."""
+        out = StringIO()
+        call_command("rollup_visitors", *args, stdout=out)
+        return out.getvalue()
+
+    def test_rollup_range(self):
+        """Test the visits, distinct ips and users are summarized per day and page."""
+        self.rollup("--start", "2024-06-01", "--end", "2024-06-02")
+
+        rollups = VisitorsDailyRollup.objects.values_list("date", "page", "visits", "unique_ips", "authenticated_users")
+        self.assertEqual(
+            list(rollups),
+            [
+                (date(2024, 6, 1), "home", 3, 2, 1),
+                (date(2024, 6, 1), "nodes", 1, 1, 1),
+                (date(2024, 6, 2), "home", 1, 1, 0),
+            ],
+        )
+
+    def test_rollup_is_incremental(self):
+        """Test the last day with rollups is refreshed with the new visits without duplicating rows."""
+        self.rollup()
+        Visitors.objects.create(page="home", ip_address="10.0.0.4")
+        Visitors.objects.filter(page="home", ip_address="10.0.0.4").update(
+            created_at=make_aware(datetime(2024, 6, 2, 12))
+        )
+        self.rollup()
+
+        self.assertEqual(VisitorsDailyRollup.objects.count(), 3)
+        self.assertEqual(VisitorsDailyRollup.objects.get(date=date(2024, 6, 2)).visits, 2)
+
+    @override_settings(TIME_ZONE="Asia/Tokyo")
+    def test_pending_range_starts_on_local_day(self):
+        """Test the first incremental refresh starts on the local day of the first visit, not its UTC day."""
+        Visitors.objects.all().delete()
+        visit = Visitors.objects.create(page="home", ip_address="10.0.0.1")
+        # 00:30 in Tokyo is 15:30 of the previous day in UTC
+        Visitors.objects.filter(pk=visit.pk).update(created_at=make_aware(datetime(2024, 6, 3, 0, 30)))
+
+        self.assertEqual(pending_range(date(2024, 6, 5)), (date(2024, 6, 3), date(2024, 6, 5)))
+
+    def test_prune_visits(self):
+        """Test only the visits of the days before the last day with rollups are pruned."""
+        self.rollup("--start", "2024-06-01", "--end", "2024-06-01", "--prune-days", "1")
+
+        self.assertEqual(Visitors.objects.count(), 5)
+        self.rollup("--start", "2024-06-02", "--end", "2024-06-02", "--prune-days", "1")
+        self.assertEqual(Visitors.objects.count(), 1)
+        self.assertEqual(VisitorsDailyRollup.objects.count(), 3)
+
+    def test_visitors_report_counts_pruned_visits(self):
+        """Test the visitors report counts the pruned visits from their rollups."""
+        visit = Visitors.objects.create(page=None, ip_address="10.0.0.4")
+        Visitors.objects.filter(pk=visit.pk).update(created_at=make_aware(datetime(2024, 6, 1, 12)))
+        self.rollup("--start", "2024-06-01", "--end", "2024-06-02", "--prune-days", "1")
+
+        visits, visitors, _ = self.client.get(reverse("visitor")).data
+
+        self.assertEqual(Visitors.objects.count(), 1)
+        self.assertEqual(visits["count"], 6)
+        self.assertCountEqual(
+            visits["data"], [{"name": "home", "value": 4}, {"name": "nodes", "value": 1}, {"name": None, "value": 1}]
+        )
+        self.assertEqual(visitors["count"], 5)
+        self.assertCountEqual(
+            visitors["data"], [{"name": "home", "value": 3}, {"name": "nodes", "value": 1}, {"name": None, "value": 1}]
+        )
+
+    def test_invalid_date(self):
+        """Test a date with another format raises a command error."""
+        with self.assertRaises(CommandError):
+            self.rollup("--start", "01-06-2024")
+
+    def test_daily_visitors(self):
+        """Test the daily report is read from the rollups of the range."""
+        self.rollup("--start", "2024-06-01", "--end", "2024-06-02")
+        Visitors.objects.all().delete()
+
+        res = self.client.get(self.url, {"start_date": "01-06-2024", "end_date": "01-06-2024"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["visits"], 4)
+        self.assertEqual(
+            res.data["pages"],
+            [
+                {"page": "home", "visits": 3, "unique_ips": 2, "authenticated_users": 1},
+                {"page": "nodes", "visits": 1, "unique_ips": 1, "authenticated_users": 1},
+            ],
+        )
+        self.assertEqual(len(res.data["days"]), 1)
+        self.assertEqual(self.client.get(self.url).data["visits"], 5)
+
+    def test_daily_visitors_invalid_range(self):
+        """Test an invalid date or a start after the end returns bad request."""
+        res = self.client.get(self.url, {"start_date": "2024-06-01"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(self.url, {"start_date": "02-06-2024", "end_date": "01-06-2024"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,117 @@
+"""
+Tests for the visitors API.
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+import django
+from django.db import DatabaseError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core.test_setup import TestSetup
+from reports.buffer import VisitsBuffer
+from reports.models import Visitors
+
+
+class TestsVisitorsApi(TestSetup):
+    """
+    Test Visitors API views.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestsVisitorsApi, cls).setUpClass()
+        django.setup()
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.url = reverse("visitor")
+        super().setUp()
+        self.user.city = "Santa Marta"
+        self.user.save()
+        visits = [("home", "10.0.0.1"), ("home", "10.0.0.1"), ("home", "10.0.0.2"), ("nodes", "10.0.0.1")]
+        for page, ip_address in visits:
+            Visitors.objects.create(page=page, ip_address=ip_address)
+
+    def test_create_visitor(self):
+        """Test a visit is buffered and written with the page, the ip address and the user on the next flush."""
+        buffer = VisitsBuffer(max_size=10, flush_interval=3600)
+        with mock.patch("reports.views.visits_buffer", buffer):
+            res = self.client.post(self.url, {"page": "reports"})
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Visitors.objects.filter(page="reports").exists())
+        self.assertEqual(buffer.flush(), 1)
+        visit = Visitors.objects.get(page="reports")
+        self.assertEqual(visit.user, self.user)
+        self.assertEqual(visit.ip_address, "127.0.0.1")
+
+    @override_settings(REPORTS_VISITS_BUFFER_ENABLED=False)
+    def test_create_visitor_without_buffer(self):
+        """Test a visit is written right away when the buffer is disabled."""
+        res = self.client.post(self.url, {"page": "reports"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Visitors.objects.filter(page="reports").exists())
+
+    def test_create_visitor_invalid(self):
+        """Test a visit without page or ip address is rejected."""
+        self.assertEqual(self.client.post(self.url, {}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.post(self.url, {"page": "home"}, REMOTE_ADDR="").status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_buffer_keeps_visits_on_failure(self):
+        """Test the visits are queued again when the bulk insert fails."""
+        buffer = VisitsBuffer(max_size=10, flush_interval=3600)
+        buffer._visits = [Visitors(page="home", ip_address="10.0.0.9")]
+
+        with mock.patch.object(Visitors.objects, "bulk_create", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                buffer.flush()
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertTrue(Visitors.objects.filter(ip_address="10.0.0.9").exists())
+
+    def test_buffered_visit_keeps_its_time(self):
+        """Test a buffered visit is written with the time it was queued, also when its first flush fails."""
+        buffer = VisitsBuffer(max_size=10, flush_interval=3600)
+        queued_at = timezone.now() - timedelta(minutes=5)
+        with mock.patch("reports.views.timezone.now", return_value=queued_at):
+            with mock.patch("reports.views.visits_buffer", buffer):
+                self.client.post(self.url, {"page": "reports"})
+
+        with mock.patch.object(Visitors.objects, "bulk_create", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                buffer.flush()
+        self.assertEqual(buffer.flush(), 1)
+
+        self.assertEqual(Visitors.objects.get(page="reports").created_at, queued_at)
+
+    def test_visitors_report(self):
+        """Test the report counts the visits, the visitors, the users and the pruned visits with six queries."""
+        with self.assertNumQueries(6):
+            res = self.client.get(self.url)
+
+        visits, visitors, users = res.data
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(visits["count"], 4)
+        self.assertEqual(visits["data"], [{"name": "home", "value": 3}, {"name": "nodes", "value": 1}])
+        self.assertEqual(visitors["count"], 2)
+        self.assertEqual(visitors["data"], [{"name": "home", "value": 2}, {"name": "nodes", "value": 1}])
+        self.assertEqual(users["count"], 1)
+        self.assertEqual(users["data"], [{"name": "Santa Marta", "value": 1}])
+
+    def test_visitors_report_is_cached(self):
+        """Test the report is served from the cache."""
+        self.client.get(self.url)
+        Visitors.objects.create(page="home", ip_address="10.0.0.3")
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url)
+
+        self.assertEqual(res.data[0]["count"], 4)
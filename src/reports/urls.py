@@ -4,10 +4,11 @@ File that contains the urls of the reports app.
 
 from django.urls import path
 
-from reports.views import VisitorsView
+from reports.views import VisitorsDailyView, VisitorsView
 
 APP_NAME = 'reports'
 
 urlpatterns = [
     path('visitor/', VisitorsView.as_view(), name='visitor'),
+    path('visitor/daily/', VisitorsDailyView.as_view(), name='visitor_daily'),
 ]
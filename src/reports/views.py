@@ -2,17 +2,28 @@
 File for the reports app.
 """
 
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Sum
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
+from core.views import AsyncAPIView
+from reports.buffer import visits_buffer
 from reports.models import Visitors
-from reports.serializers import VisitorsSerializer
+from reports.rollups import apruned_rollups, summarize_rollups
 from user.models import User
 
+VISITORS_REPORT_CACHE_KEY = 'reports:visitors'
+
 
-class VisitorsView(APIView):
+class VisitorsView(AsyncAPIView):
     """
     A Django REST Framework view for the Visitors model.
     """
@@ -21,84 +32,144 @@ class VisitorsView(APIView):
 
     def post(self, request):
         """
-        Handles POST requests and creates a new visitor if the data is valid.
+        Handles POST requests and records a visit if the data is valid.
+
+        The visit is queued in the visits buffer and written in bulk with other visits, or written right away when
+        `REPORTS_VISITS_BUFFER_ENABLED` is False.
 
         Parameters:
             request (HttpRequest): The HTTP request object.
 
         Returns:
-            Response: A response indicating whether the visitor was created successfully or not.
+            Response: A response indicating whether the visit was recorded or not.
         """
-        data = {}
         page = request.data.get('page')
         if not page:
             return Response({'message': 'Page is required'}, status=status.HTTP_400_BAD_REQUEST)
-        if request.user.is_authenticated:
-            data['user'] = request.user.id
-        data['ip_address'] = request.META.get('REMOTE_ADDR')
-        data['page'] = page
-
-        serializer = VisitorsSerializer(data=data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response({'message': 'Visitor created successfully'}, status=status.HTTP_201_CREATED)
-        return Response(
-            {'message': 'Visitor not created', 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+
+        visit = Visitors(
+            page=page,
+            ip_address=request.META.get('REMOTE_ADDR'),
+            user_id=request.user.id if request.user.is_authenticated else None,
+            created_at=timezone.now(),
         )
+        try:
+            visit.clean_fields(exclude=['user'])
+        except ValidationError as error:
+            return Response(
+                {'message': 'Visitor not created', 'errors': error.message_dict}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-    def get(self, request):
+        if not settings.REPORTS_VISITS_BUFFER_ENABLED:
+            visit.save()
+            return Response({'message': 'Visitor created successfully'}, status=status.HTTP_201_CREATED)
+        visits_buffer.add(visit)
+        return Response({'message': 'Visitor recorded successfully'}, status=status.HTTP_202_ACCEPTED)
+
+    async def get(self, request):
         """
         Handles GET requests and returns the visitors.
 
+        The visits and distinct visitors per page and the users per city are counted with grouped queries, whatever
+        the number of pages and cities, and the report is cached for `REPORTS_CACHE_TIMEOUT` seconds. The visits pruned
+        by the `rollup_visitors` command are counted from their daily rollups.
+
         Parameters:
             request (HttpRequest): The HTTP request object.
 
         Returns:
             Response: A response containing all the visitors.
         """
-        visitors = Visitors.objects.all()
-        pages = visitors.values('page').distinct()
-        visitors_distinct = visitors.distinct('ip_address')
-        users = User.objects.all()
-        citys = users.values('city').distinct()
+        data = await cache.aget(VISITORS_REPORT_CACHE_KEY)
+        if data is None:
+            data = await self.build_report()
+            await cache.aset(VISITORS_REPORT_CACHE_KEY, data, timeout=settings.REPORTS_CACHE_TIMEOUT)
+        return Response(data=data, status=status.HTTP_200_OK)
+
+    @staticmethod
+    async def build_report() -> list[dict]:
+        """
+        Counts the visits, visitors and users of the report.
+
+        The days whose visits were pruned add the visits and the daily distinct ip addresses of their rollups, so a
+        visitor of several pruned days is counted once per day.
+
+        Returns:
+            list[dict]: The total and the counts per page or city, from the greatest to the lowest, of the visits, the
+                distinct visitors and the users.
+        """
+        totals = await Visitors.objects.order_by().aaggregate(
+            visits=Count('id'), visitors=Count('ip_address', distinct=True)
+        )
+        pages = (
+            Visitors.objects.order_by()
+            .values('page')
+            .annotate(visits=Count('id'), visitors=Count('ip_address', distinct=True))
+        )
+        cities = User.objects.order_by().values('city').annotate(users=Count('id'))
+        pruned = await apruned_rollups()
+        pruned_totals = await pruned.aaggregate(visits=Sum('visits'), visitors=Sum('unique_ips'))
+        pruned_pages = pruned.values('page').annotate(visits=Sum('visits'), visitors=Sum('unique_ips'))
+
         data = [
-            {
-                "category": "Visitas",
-                "count": visitors.count(),
-                "data": [],
-            },
-            {
-                "category": "Visitantes",
-                "count": visitors_distinct.count(),
-                "data": [],
-            },
-            {
-                "category": "Usuarios",
-                "count": users.count(),
-                "data": [],
-            },
+            {"category": "Visitas", "count": totals['visits'] + (pruned_totals['visits'] or 0), "data": []},
+            {"category": "Visitantes", "count": totals['visitors'] + (pruned_totals['visitors'] or 0), "data": []},
+            {"category": "Usuarios", "count": 0, "data": []},
         ]
-
-        for page in pages:
-            data[0]['data'].append(
-                {
-                    "name": page['page'],
-                    "value": visitors.filter(page=page['page']).count(),
-                }
-            )
-            data[1]['data'].append(
-                {
-                    "name": page['page'],
-                    "value": visitors_distinct.filter(page=page['page']).count(),
-                }
-            )
-        for city in citys:
-            data[2]['data'].append(
-                {
-                    "name": city['city'],
-                    "value": users.filter(city=city['city']).count(),
-                }
-            )
+        page_counts: dict[Optional[str], tuple[int, int]] = {}
+        async for page in pruned_pages:
+            # The rollups store the visits without page under an empty page
+            page_counts[page['page'] or None] = (page['visits'], page['visitors'])
+        async for page in pages:
+            visits, visitors = page_counts.get(page['page'], (0, 0))
+            page_counts[page['page']] = (visits + page['visits'], visitors + page['visitors'])
+        for name, (visits, visitors) in page_counts.items():
+            data[0]['data'].append({"name": name, "value": visits})
+            data[1]['data'].append({"name": name, "value": visitors})
+        async for city in cities:
+            data[2]['count'] += city['users']
+            data[2]['data'].append({"name": city['city'], "value": city['users']})
         for item in data:
             item['data'] = sorted(item['data'], key=lambda x: x['value'], reverse=True)
-        return Response(data=data, status=status.HTTP_200_OK)
+        return data
+
+
+class VisitorsDailyView(AsyncAPIView):
+    """
+    A Django REST Framework view for the daily rollups of the visits.
+    """
+
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        """
+        Handles GET requests and returns the visits of a date range from the daily rollups.
+
+        The raw visits are not read, so the report does not grow with the traffic and keeps working after the old
+        visits are pruned. The rollups are refreshed by the `rollup_visitors` command.
+
+        Query parameters:
+            start_date (str, optional): The first day of the range in the format '%d-%m-%Y'.
+            end_date (str, optional): The last day of the range in the format '%d-%m-%Y'.
+
+        Parameters:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            Response: A response containing the total visits and the visits per page and per day.
+        """
+        try:
+            start = self.parse_date(request.query_params.get('start_date'))
+            end = self.parse_date(request.query_params.get('end_date'))
+            if start and end and start > end:
+                raise ValueError("Start date cannot be greater than end date!")
+        except ValueError as error:
+            return Response({'message': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data=summarize_rollups(start, end), status=status.HTTP_200_OK)
+
+    @staticmethod
+    def parse_date(value: str):
+        """
+        Parses a day in the format '%d-%m-%Y', or returns None if it was not sent.
+        """
+        return datetime.strptime(value, '%d-%m-%Y').date() if value else None
@@ -0,0 +1,14 @@
+"""
+File with configuration for the translate app.
+"""
+
+from django.apps import AppConfig
+
+
+class TranslateConfig(AppConfig):
+    """
+    A Django AppConfig class for the translate app.
+    """
+
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'translate'
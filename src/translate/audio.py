@@ -0,0 +1,79 @@
+"""
+This module contains the decoding of the uploaded audio clips.
+
+The clips are decoded from the bytes of the upload into a mono float32 waveform resampled once to the rate of the
+models, so the translations do not write the clip to disk and every model reads the same waveform. WAV, FLAC, OGG
+and MP3 are decoded by libsndfile in the process, the other formats, e.g. the WebM recorded by the browsers, are
+decoded by piping the bytes through ffmpeg.
+"""
+
+import io
+import subprocess
+
+import numpy as np
+
+# Whisper and wav2vec work with 16 kHz audio
+SAMPLE_RATE = 16000
+
+
+class AudioDecodeError(ValueError):
+    """
+    The uploaded clip is not an audio that can be decoded.
+    """
+
+
+def resample(waveform: np.ndarray, rate: int, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Resamples a mono waveform with a band limited interpolation.
+    """
+    if rate == target_rate:
+        return np.ascontiguousarray(waveform, dtype=np.float32)
+    # pylint: disable=import-outside-toplevel
+    import torch
+    import torchaudio.functional
+
+    return torchaudio.functional.resample(torch.from_numpy(waveform), rate, target_rate).numpy()
+
+
+def decode_with_ffmpeg(data: bytes, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes a clip through ffmpeg pipes, without temporary files.
+    """
+    command = [
+        'ffmpeg', '-nostdin', '-threads', '0', '-i', 'pipe:0',
+        '-f', 's16le', '-ac', '1', '-acodec', 'pcm_s16le', '-ar', str(target_rate), 'pipe:1',
+    ]
+    try:
+        output = subprocess.run(command, input=data, capture_output=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError) as error:
+        raise AudioDecodeError('No se pudo decodificar el audio.') from error
+    return np.frombuffer(output, np.int16).astype(np.float32) / 32768.0
+
+
+def decode_audio(data: bytes, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes the bytes of a clip into a waveform for the models.
+
+    Args:
+        data (bytes): The content of the uploaded file.
+        target_rate (int): The sample rate of the waveform.
+
+    Returns:
+        np.ndarray: The mono float32 waveform, with values between -1 and 1.
+
+    Raises:
+        AudioDecodeError: If the clip is empty or cannot be decoded.
+    """
+    import soundfile as sf  # pylint: disable=import-outside-toplevel
+
+    if not data:
+        raise AudioDecodeError('El audio está vacío.')
+    try:
+        waveform, rate = sf.read(io.BytesIO(data), dtype='float32', always_2d=True)
+    except sf.SoundFileError:
+        waveform = decode_with_ffmpeg(data, target_rate)
+    else:
+        waveform = resample(waveform.mean(axis=1), rate, target_rate)
+    if not waveform.size:
+        raise AudioDecodeError('El audio está vacío.')
+    return waveform
@@ -0,0 +1,96 @@
+"""
+This module contains the micro-batching of the concurrent translations.
+
+The translations of the same language that arrive within `max_wait` seconds are grouped, up to `max_size`, and sent
+as one job, so the models process a batch of clips with one tensor operation instead of one operation per clip.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Groups the translations requested from an event loop into batches.
+
+    Attributes:
+        submit (Callable[[str, list[bytes]], Future]): Queues the translation of a batch of clips of a language and
+            returns the future of the list of results, in the same order, where an exception is the error of a clip.
+        max_size (int): The number of translations that sends a batch right away.
+        max_wait (float): The maximum seconds the first translation of a batch waits for others.
+    """
+
+    def __init__(self, submit: Callable[[str, list[bytes]], Future], max_size: int, max_wait: float):
+        self.submit = submit
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: dict[str, list[tuple[bytes, asyncio.Future]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+
+    def translate(self, language: str, clip: bytes) -> asyncio.Future:
+        """
+        Adds a translation to the batch of its language.
+
+        Args:
+            language (str): The language of the clip.
+            clip (bytes): The content of the uploaded file.
+
+        Returns:
+            asyncio.Future: The future of the result of the translation, it can be cancelled until its batch is sent.
+        """
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        pending = self._pending.setdefault(language, [])
+        pending.append((clip, result))
+        if len(pending) >= self.max_size:
+            self.flush(language)
+        elif len(pending) == 1:
+            self._timers[language] = loop.call_later(self.max_wait, self.flush, language)
+        return result
+
+    def flush(self, language: str) -> None:
+        """
+        Sends the pending translations of a language as one batch.
+        """
+        timer = self._timers.pop(language, None)
+        if timer:
+            timer.cancel()
+        batch = [(clip, result) for clip, result in self._pending.pop(language, []) if not result.cancelled()]
+        if not batch:
+            return
+
+        try:
+            future = asyncio.wrap_future(self.submit(language, [clip for clip, _ in batch]))
+        except Exception as error:  # pylint: disable=broad-except
+            self._resolve(batch, None, error)
+            return
+
+        def done(future: asyncio.Future) -> None:
+            if future.cancelled():
+                self._resolve(batch, None, asyncio.CancelledError())
+            else:
+                self._resolve(batch, None if future.exception() else future.result(), future.exception())
+
+        future.add_done_callback(done)
+        logger.debug('Sent a batch of %s %s translations', len(batch), language)
+
+    @staticmethod
+    def _resolve(
+        batch: list[tuple[bytes, asyncio.Future]], results: Optional[list], error: Optional[BaseException]
+    ) -> None:
+        """
+        Sets the result or the error of every translation of a batch that is still awaited.
+        """
+        for index, (_, result) in enumerate(batch):
+            if result.done():
+                continue
+            if error is not None:
+                result.set_exception(error)
+            elif isinstance(results[index], BaseException):
+                result.set_exception(results[index])
+            else:
+                result.set_result(results[index])
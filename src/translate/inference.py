@@ -1,29 +1,50 @@
 # inference.py
-import torch
-from extract_embeddings import get_embedding
+from pathlib import Path
 
 from translate.oraciones import oraciones, traducciones
-from translate.train_model import SimpleClassifier
+from translate.registry import registry
+from translate.wav2vec import embed_waveforms
 
 # Parámetros
 input_dim = 768
 num_classes = len(oraciones)
+MODEL_PATH = Path(__file__).with_name("clasificador_audio.pt")
 
-# Cargar modelo una sola vez
-model = SimpleClassifier(input_dim, num_classes)
-model.load_state_dict(torch.load("clasificador_audio.pt"))
-model.eval()
 
-def traducir_audio_arhuaco(audio_path):
-    # Obtener embedding
-    emb = get_embedding(audio_path)
+# Cargar el modelo en el primer uso y compartirlo entre los hilos del proceso
+@registry.register("clasificador")
+def load_classifier():
+    import torch
+
+    from translate.train_model import SimpleClassifier
+
+    model = SimpleClassifier(input_dim, num_classes)
+    model.load_state_dict(torch.load(MODEL_PATH))
+    model.eval()
+    return model
+
+
+def traducir_audios_arhuaco(waveforms):
+    import torch
+
+    model = registry.get("clasificador")
+
+    # Obtener los embeddings de wav2vec de las formas de onda a 16 kHz y clasificarlos en un solo lote
+    embs = embed_waveforms(waveforms).float()
 
     # Predecir
     with torch.inference_mode():
-        logits = model(emb)
-        predicted = torch.argmax(logits, dim=1).item()
+        logits = model(embs)
+        predicted = torch.argmax(logits, dim=1).tolist()
+
+    return [
+        {
+            "transcribe": oraciones[idx],
+            "translate": traducciones[idx]
+        }
+        for idx in predicted
+    ]
+
 
-    return {
-        "transcribe": oraciones[predicted],
-        "translate": traducciones[predicted]
-    }
+def traducir_audio_arhuaco(waveform):
+    return traducir_audios_arhuaco([waveform])[0]
@@ -0,0 +1,60 @@
+"""
+Django command to run the translate service, the process that owns the models and runs the audio translations.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from translate.service import TranslateServer
+
+
+class Command(BaseCommand):
+    """
+    Django command to serve the audio translations of every API worker.
+
+    The API workers connect to it at `TRANSLATE_SERVICE_ADDRESS`, and it translates their clips in a pool of
+    `TRANSLATE_SERVICE_WORKERS` processes, each of them with one copy of the models.
+    """
+
+    help = 'Runs the translate service that loads the models once and translates the audio of every API worker.'
+
+    def add_arguments(self, parser):
+        """Arguments of the command."""
+        parser.add_argument(
+            '--address',
+            default=None,
+            help="Address to listen on, 'host:port' or a Unix socket path, defaults to TRANSLATE_SERVICE_ADDRESS.",
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Processes that own the models, defaults to TRANSLATE_SERVICE_WORKERS.',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=None,
+            help='Threads of torch of every process, defaults to TRANSLATE_WORKER_THREADS.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        address = options['address'] or settings.TRANSLATE_SERVICE_ADDRESS
+        if not address:
+            raise CommandError('Set TRANSLATE_SERVICE_ADDRESS or --address.')
+        if not settings.TRANSLATE_SERVICE_AUTHKEY:
+            raise CommandError('Set TRANSLATE_SERVICE_AUTHKEY, the service does not accept unauthenticated workers.')
+
+        workers = options['workers'] or settings.TRANSLATE_SERVICE_WORKERS
+        server = TranslateServer(
+            address,
+            settings.TRANSLATE_BATCH_SIZE,
+            workers=workers,
+            threads=options['threads'] or settings.TRANSLATE_WORKER_THREADS,
+        )
+        self.stdout.write(f'Translate service listening on {address} with {workers} workers...')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Translate service stopped.')
@@ -0,0 +1,102 @@
+"""
+This module contains the index of the embeddings of the phrases matched with the Spanish transcriptions.
+
+The phrases are embedded once, when the index is loaded, and kept as a matrix of unit vectors, so matching a
+transcription is a single matrix-vector product. The matrix is saved in `TRANSLATE_EMBEDDINGS_DIR` with a name derived
+from the phrases and the embedder, so the other processes load it from disk and a change of the phrases or the
+embedder builds a new one.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def phrases_hash(phrases: dict[int, str], model_name: str) -> str:
+    """
+    Returns a hash that identifies the embeddings of some phrases with an embedder.
+    """
+    content = json.dumps({'model': model_name, 'phrases': sorted(phrases.items())}, ensure_ascii=False)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+class PhraseIndex:
+    """
+    The normalized embeddings of a table of phrases.
+
+    Attributes:
+        keys (list[int]): The key of the phrase of every row.
+        matrix (np.ndarray): The unit embeddings of the phrases, one per row.
+    """
+
+    def __init__(self, keys: list[int], matrix: np.ndarray):
+        self.keys = keys
+        self.matrix = matrix
+
+    @classmethod
+    def load(cls, embedder: Any, phrases: dict[int, str], model_name: str, directory: Optional[Path]) -> 'PhraseIndex':
+        """
+        Loads the index of the phrases from the directory, or embeds them and saves the index.
+
+        Args:
+            embedder (SentenceTransformer): The model that embeds the phrases.
+            phrases (dict[int, str]): The phrases by key.
+            model_name (str): The name of the embedder, part of the name of the saved index.
+            directory (Path, optional): The directory of the saved indexes, or None to not save it.
+
+        Returns:
+            PhraseIndex: The index of the phrases.
+        """
+        keys = sorted(phrases)
+        path = Path(directory) / f'phrases-{phrases_hash(phrases, model_name)}.npy' if directory else None
+        if path and path.exists():
+            return cls(keys, np.load(path))
+
+        matrix = embedder.encode([phrases[key] for key in keys], normalize_embeddings=True, convert_to_numpy=True)
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        if path:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write to a temporary file first, so the other processes never read a partial index
+                temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+                with open(temporary, 'wb') as file:
+                    np.save(file, matrix)
+                temporary.replace(path)
+            except OSError:
+                logger.warning('Could not save the phrase index in %s', path, exc_info=True)
+        return cls(keys, matrix)
+
+    def match(self, embedding: np.ndarray) -> tuple[int, float]:
+        """
+        Returns the phrase most similar to a normalized embedding.
+
+        Args:
+            embedding (np.ndarray): The unit embedding of the text.
+
+        Returns:
+            tuple[int, float]: The key of the phrase and its cosine similarity.
+        """
+        scores = self.matrix @ np.asarray(embedding, dtype=np.float32)
+        row = int(scores.argmax())
+        return self.keys[row], float(scores[row])
+
+    def match_batch(self, embeddings: np.ndarray) -> list[tuple[int, float]]:
+        """
+        Returns the phrase most similar to every normalized embedding with one matrix product.
+
+        Args:
+            embeddings (np.ndarray): The unit embeddings of the texts, one per row.
+
+        Returns:
+            list[tuple[int, float]]: The key of the phrase and its cosine similarity of every text.
+        """
+        scores = np.asarray(embeddings, dtype=np.float32) @ self.matrix.T
+        rows = scores.argmax(axis=1)
+        return [(self.keys[row], float(scores[index, row])) for index, row in enumerate(rows)]
@@ -0,0 +1,101 @@
+"""
+This module contains the registry of the models used by the translate app.
+
+Every model is registered with the function that loads it and is loaded on its first use, so a process that never
+translates audio does not import torch nor keep the models in memory. Once loaded, a model is shared by every thread
+of the process. The models in `TRANSLATE_PRELOAD_MODELS` can be loaded when a worker starts with `preload`.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    A thread-safe registry of lazily loaded models.
+    """
+
+    def __init__(self):
+        self._loaders: dict[str, Callable[[], Any]] = {}
+        self._models: dict[str, Any] = {}
+        self._locks: dict[str, threading.Lock] = {}
+
+    def register(self, name: str) -> Callable[[Callable[[], Any]], Callable[[], Any]]:
+        """
+        Decorator that registers the function that loads a model.
+
+        Args:
+            name (str): The name of the model.
+        """
+
+        def decorator(loader: Callable[[], Any]) -> Callable[[], Any]:
+            self._loaders[name] = loader
+            self._locks[name] = threading.Lock()
+            return loader
+
+        return decorator
+
+    def get(self, name: str) -> Any:
+        """
+        Returns a model, loading it if it is the first use in the process.
+
+        The threads that need a model while it is loading wait for it, so every model is loaded only once.
+
+        Args:
+            name (str): The name of the model.
+
+        Raises:
+            KeyError: If the model is not registered.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._locks[name]:
+            if name not in self._models:
+                start = time.perf_counter()
+                self._models[name] = self._loaders[name]()
+                logger.info('Loaded model %s in %.2f seconds', name, time.perf_counter() - start)
+            return self._models[name]
+
+    def is_loaded(self, name: str) -> bool:
+        """
+        Returns whether a model is already loaded.
+        """
+        return name in self._models
+
+    def preload(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Loads some models in advance, e.g. when a worker starts.
+
+        Args:
+            names (Iterable[str], optional): The models to load, by default the ones in `TRANSLATE_PRELOAD_MODELS`.
+        """
+        for name in settings.TRANSLATE_PRELOAD_MODELS if names is None else names:
+            self.get(name)
+
+    @property
+    def names(self) -> list[str]:
+        """
+        The names of the registered models.
+        """
+        return list(self._loaders)
+
+
+registry = ModelRegistry()
+
+
+def preload_models() -> None:
+    """
+    Registers the models of the app and loads the ones in `TRANSLATE_PRELOAD_MODELS`.
+    """
+    # The modules register their models when they are imported
+    import translate.inference  # noqa: F401  pylint: disable=import-outside-toplevel,unused-import
+    import translate.translate_spanish  # noqa: F401  pylint: disable=import-outside-toplevel,unused-import
+
+    registry.preload()
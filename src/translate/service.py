@@ -0,0 +1,522 @@
+"""
+This module contains the translate service, the process that runs the audio translations of every API worker.
+
+The uploaded clips are decoded in memory and translated by one service, started with
+`python manage.py run_translate_worker`, so the seconds of CPU of every translation do not block the threads nor the
+event loop of the API workers, and the translation capacity is scaled with the `TRANSLATE_SERVICE_WORKERS` processes
+of its pool, each of them owning one copy of the models and limited to `TRANSLATE_WORKER_THREADS` threads of torch,
+independently of the number of API workers. The API workers connect to the service at `TRANSLATE_SERVICE_ADDRESS`,
+authenticated with `TRANSLATE_SERVICE_AUTHKEY`, and send it the batches of their `MicroBatcher` as JSON headers
+followed by the raw bytes of the clips, nothing is pickled. The service merges the batches of every worker that wait
+for a free process into batches of up to `TRANSLATE_BATCH_SIZE` clips of a language. Without
+`TRANSLATE_SERVICE_ADDRESS` the translations run in a thread of the API process instead, e.g. in development.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import partial
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from threading import Lock
+from typing import Iterable, Optional, Union
+from weakref import WeakKeyDictionary
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from translate.audio import AudioDecodeError, decode_audio
+from translate.batching import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = ('es', 'arh')
+# The largest header and clip accepted in a message, larger messages close the connection
+MAX_HEADER_SIZE = 64 * 1024
+MAX_CLIP_SIZE = 64 * 1024 * 1024
+
+_executor: Optional[Executor] = None
+_client: Optional['TranslateClient'] = None
+_lock = Lock()
+_batchers: 'WeakKeyDictionary[asyncio.AbstractEventLoop, MicroBatcher]' = WeakKeyDictionary()
+
+
+def init_worker(threads: int) -> None:
+    """
+    Prepares a process of the pool of the service: limits its threads, sets up Django and loads the configured models.
+    """
+    for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[variable] = str(threads)
+    import django  # pylint: disable=import-outside-toplevel
+
+    django.setup()
+    import torch  # pylint: disable=import-outside-toplevel
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+    from translate.registry import preload_models  # pylint: disable=import-outside-toplevel
+
+    preload_models()
+
+
+def run_translation(language: str, clips: list[bytes]) -> list[Union[dict, AudioDecodeError]]:
+    """
+    Decodes and translates a batch of uploaded clips of a language in memory.
+
+    Args:
+        language (str): The language of the clips, 'es' or 'arh'.
+        clips (list[bytes]): The content of the uploaded files.
+
+    Returns:
+        list[dict or AudioDecodeError]: The transcription and the translation of every clip, in the same order, or
+            the error of the clips that could not be decoded.
+    """
+    # pylint: disable=import-outside-toplevel
+    if language == 'es':
+        from translate.translate_spanish import traducir_audios_espanol as translate
+    else:
+        from translate.inference import traducir_audios_arhuaco as translate
+
+    results: list[Union[dict, AudioDecodeError]] = []
+    waveforms = []
+    for clip in clips:
+        try:
+            waveforms.append(decode_audio(clip))
+            results.append(None)
+        except AudioDecodeError as error:
+            results.append(error)
+    translations = iter(translate(waveforms) if waveforms else [])
+    return [next(translations) if result is None else result for result in results]
+
+
+def parse_address(address: str) -> Union[str, tuple[str, int]]:
+    """
+    Parses the address of the service, 'host:port' for a TCP socket or the path of a Unix socket.
+    """
+    host, separator, port = address.rpartition(':')
+    if separator and port.isdigit() and not address.startswith('/'):
+        return host, int(port)
+    return address
+
+
+def get_authkey() -> bytes:
+    """
+    Returns the key that authenticates the API workers to the service.
+
+    Raises:
+        ImproperlyConfigured: If `TRANSLATE_SERVICE_AUTHKEY` is not set.
+    """
+    if not settings.TRANSLATE_SERVICE_AUTHKEY:
+        raise ImproperlyConfigured('TRANSLATE_SERVICE_AUTHKEY must be set to use the translate service.')
+    return settings.TRANSLATE_SERVICE_AUTHKEY.encode()
+
+
+def send_message(connection: Connection, header: dict, clips: Iterable[bytes] = ()) -> None:
+    """
+    Sends a message of the protocol of the service: a JSON header followed by the raw bytes of every clip.
+
+    The messages are never pickled, so a peer cannot make the other one run code whatever it sends.
+    """
+    connection.send_bytes(json.dumps(header).encode())
+    for clip in clips:
+        connection.send_bytes(clip)
+
+
+def receive_header(connection: Connection) -> dict:
+    """
+    Receives the JSON header of a message.
+
+    Raises:
+        EOFError: If the connection was closed.
+        ValueError: If the header is not a JSON object.
+    """
+    header = json.loads(connection.recv_bytes(MAX_HEADER_SIZE))
+    if not isinstance(header, dict):
+        raise ValueError('The header of a message must be an object')
+    return header
+
+
+@dataclass(eq=False)
+class Peer:
+    """
+    The connection of an API worker, the results of its jobs are sent one at a time.
+    """
+
+    connection: Connection
+    lock: Lock = field(default_factory=Lock)
+
+    def send(self, header: dict) -> None:
+        """
+        Sends a message to the API worker.
+        """
+        with self.lock:
+            send_message(self.connection, header)
+
+
+@dataclass(eq=False)
+class Job:
+    """
+    A batch of clips sent by an API worker.
+
+    Attributes:
+        peer (Peer): The connection of the API worker.
+        job_id (int): The identifier of the job in the API worker.
+        language (str): The language of the clips.
+        clips (list[bytes]): The content of the uploaded files.
+    """
+
+    peer: Peer
+    job_id: int
+    language: str
+    clips: list[bytes]
+
+
+def encode_results(results: list[Union[dict, AudioDecodeError]]) -> list[dict]:
+    """
+    Encodes the results of `run_translation` for the header of a message.
+    """
+    return [
+        {'error': str(result)} if isinstance(result, AudioDecodeError) else {'result': result} for result in results
+    ]
+
+
+def decode_results(results: list[dict]) -> list[Union[dict, AudioDecodeError]]:
+    """
+    Decodes the results of `run_translation` from the header of a message.
+    """
+    return [AudioDecodeError(result['error']) if 'error' in result else result['result'] for result in results]
+
+
+class TranslateServer:
+    """
+    Receives the jobs of the API workers and translates them in a pool of processes that own the models.
+
+    Every connection is read by a thread of its own, the thread that calls `serve_forever` sends a batch to every free
+    process of the pool, and every process translates one batch at a time.
+
+    Attributes:
+        batch_size (int): The maximum number of clips of a batch.
+        workers (int): The number of processes of the pool.
+        threads (int): The threads of torch of every process.
+        executor (Executor, optional): The pool, by default a pool of spawned processes created on the first batch.
+    """
+
+    def __init__(
+        self, address: str, batch_size: int, workers: int = 1, threads: int = 1, executor: Optional[Executor] = None
+    ):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.threads = threads
+        self.executor = executor
+        self._executor_lock = Lock()
+        self._slots = threading.Semaphore(workers)
+        address = parse_address(address)
+        if isinstance(address, str) and os.path.exists(address):
+            # The socket of a previous run of the service that was not closed
+            os.unlink(address)
+        self.listener = Listener(address, authkey=get_authkey())
+        self._jobs: queue.Queue[Job] = queue.Queue()
+        self._backlog: deque[Job] = deque()
+
+    def start(self) -> None:
+        """
+        Starts accepting the API workers in a thread.
+        """
+        threading.Thread(target=self._accept, name='translate-accept', daemon=True).start()
+
+    def serve_forever(self) -> None:
+        """
+        Accepts the API workers and translates their jobs until the process is stopped.
+        """
+        self.start()
+        try:
+            while True:
+                self.dispatch_next_batch()
+        finally:
+            self.listener.close()
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _accept(self) -> None:
+        """
+        Accepts the connections of the API workers.
+        """
+        while True:
+            try:
+                connection = self.listener.accept()
+            except (AuthenticationError, EOFError):
+                logger.warning('A connection to the translate service failed to authenticate')
+                continue
+            except OSError:
+                # The listener was closed
+                return
+            threading.Thread(target=self._receive, args=(connection,), name='translate-receive', daemon=True).start()
+
+    def _receive(self, connection: Connection) -> None:
+        """
+        Queues the jobs sent through a connection until it is closed, or until it sends an invalid message.
+        """
+        peer = Peer(connection)
+        try:
+            while True:
+                header = receive_header(connection)
+                job_id, language, count = header['job'], header['language'], header['clips']
+                if language not in LANGUAGES or not isinstance(count, int) or not 0 < count <= self.batch_size:
+                    raise ValueError(f'Invalid job {header}')
+                clips = [connection.recv_bytes(MAX_CLIP_SIZE) for _ in range(count)]
+                self._jobs.put(Job(peer, job_id, language, clips))
+        except (EOFError, OSError):
+            logger.debug('An API worker disconnected from the translate service')
+        except (KeyError, TypeError, ValueError):
+            logger.warning('An API worker sent an invalid message to the translate service', exc_info=True)
+            connection.close()
+
+    def next_batch(self, timeout: Optional[float] = None) -> list[Job]:
+        """
+        Takes the oldest job and the following jobs of its language that fit in a batch.
+
+        Args:
+            timeout (float, optional): The seconds to wait for a job, by default forever.
+
+        Returns:
+            list[Job]: The jobs of the batch, empty if no job arrived in time.
+        """
+        if not self._backlog:
+            try:
+                self._backlog.append(self._jobs.get(timeout=timeout))
+            except queue.Empty:
+                return []
+        while True:
+            try:
+                self._backlog.append(self._jobs.get_nowait())
+            except queue.Empty:
+                break
+
+        first = self._backlog.popleft()
+        batch, size = [first], len(first.clips)
+        for job in list(self._backlog):
+            if job.language == first.language and size + len(job.clips) <= self.batch_size:
+                self._backlog.remove(job)
+                batch.append(job)
+                size += len(job.clips)
+        return batch
+
+    def get_executor(self) -> Executor:
+        """
+        Returns the pool of the processes that run the translations, it is created on the first batch.
+        """
+        with self._executor_lock:
+            if self.executor is None:
+                # The processes are spawned, forking a process with threads and torch is not safe
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker,
+                    initargs=(self.threads,),
+                )
+            return self.executor
+
+    def reset_executor(self, executor: Executor) -> None:
+        """
+        Discards a broken pool, e.g. after one of its processes died, so the next batch creates a new one.
+        """
+        with self._executor_lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def dispatch_next_batch(self, timeout: Optional[float] = None) -> int:
+        """
+        Waits for a free process of the pool and sends it the next batch.
+
+        The jobs that arrive while every process is busy wait in the queue, so they are merged into larger batches.
+
+        Args:
+            timeout (float, optional): The seconds to wait for a free process and for a job, by default forever.
+
+        Returns:
+            int: The number of jobs sent.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            return 0
+        batch = self.next_batch(timeout)
+        if not batch:
+            self._slots.release()
+            return 0
+
+        clips = [clip for job in batch for clip in job.clips]
+        executor = self.get_executor()
+        try:
+            future = executor.submit(run_translation, batch[0].language, clips)
+        except (BrokenProcessPool, RuntimeError):
+            self.reset_executor(executor)
+            executor = self.get_executor()
+            future = executor.submit(run_translation, batch[0].language, clips)
+        future.add_done_callback(partial(self._finish_batch, batch, executor))
+        return len(batch)
+
+    def _finish_batch(self, batch: list[Job], executor: Executor, future: Future) -> None:
+        """
+        Sends every API worker the results of its jobs once the batch is translated, and frees its process.
+        """
+        try:
+            error = future.exception()
+            if error is None:
+                results = encode_results(future.result())
+            else:
+                logger.error('The translation of a batch of %s jobs failed', len(batch), exc_info=error)
+                if isinstance(error, BrokenProcessPool):
+                    self.reset_executor(executor)
+                results = None
+            start = 0
+            for job in batch:
+                end = start + len(job.clips)
+                if results is None:
+                    header = {'job': job.job_id, 'error': 'The translation failed'}
+                else:
+                    header = {'job': job.job_id, 'results': results[start:end]}
+                start = end
+                try:
+                    job.peer.send(header)
+                except (OSError, ValueError):
+                    logger.warning('The API worker of job %s disconnected before its translation finished', job.job_id)
+        finally:
+            self._slots.release()
+
+
+class TranslateClient:
+    """
+    Sends the jobs of an API worker to the translate service through one connection shared by its threads.
+    """
+
+    def __init__(self, address: str):
+        self.address = address
+        self._connection: Optional[Connection] = None
+        self._lock = Lock()
+        self._futures: dict[int, Future] = {}
+        self._ids = itertools.count()
+
+    def submit(self, language: str, clips: list[bytes]) -> Future:
+        """
+        Sends the translation of a batch of clips to the service, connecting to it if needed.
+
+        Args:
+            language (str): The language of the clips, 'es' or 'arh'.
+            clips (list[bytes]): The content of the uploaded files.
+
+        Returns:
+            Future: The future of the result of `run_translation`.
+
+        Raises:
+            OSError: If the service cannot be reached.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._connection is None:
+                self._connection = Client(parse_address(self.address), authkey=get_authkey())
+                threading.Thread(
+                    target=self._receive, args=(self._connection,), name='translate-client', daemon=True
+                ).start()
+            job_id = next(self._ids)
+            self._futures[job_id] = future
+            try:
+                send_message(self._connection, {'job': job_id, 'language': language, 'clips': len(clips)}, clips)
+            except (OSError, ValueError):
+                del self._futures[job_id]
+                self._connection.close()
+                self._connection = None
+                raise
+        return future
+
+    def _receive(self, connection: Connection) -> None:
+        """
+        Resolves the futures of the jobs with the results sent by the service, and fails the pending ones when the
+        connection is lost.
+        """
+        try:
+            while True:
+                header = receive_header(connection)
+                with self._lock:
+                    future = self._futures.pop(header['job'], None)
+                if future is None or not future.set_running_or_notify_cancel():
+                    continue
+                if 'error' in header:
+                    future.set_exception(RuntimeError(header['error']))
+                else:
+                    future.set_result(decode_results(header['results']))
+        except (EOFError, OSError, KeyError, TypeError, ValueError):
+            logger.error('The connection to the translate service was lost, it will be opened again', exc_info=True)
+        with self._lock:
+            if self._connection is connection:
+                self._connection = None
+            futures, self._futures = self._futures, {}
+        connection.close()
+        for future in futures.values():
+            if future.set_running_or_notify_cancel():
+                future.set_exception(ConnectionError('The translate service closed the connection'))
+
+
+def submit_translation(language: str, clips: list[bytes]) -> Future:
+    """
+    Queues the translation of a batch of uploaded clips in the translate service, or in a thread of the process when
+    `TRANSLATE_SERVICE_ADDRESS` is not set.
+
+    Args:
+        language (str): The language of the clips, 'es' or 'arh'.
+        clips (list[bytes]): The content of the uploaded files.
+
+    Returns:
+        Future: The future of the result of `run_translation`.
+    """
+    global _client, _executor  # pylint: disable=global-statement
+    with _lock:
+        if settings.TRANSLATE_SERVICE_ADDRESS:
+            if _client is None:
+                _client = TranslateClient(settings.TRANSLATE_SERVICE_ADDRESS)
+        elif _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='translate')
+    if settings.TRANSLATE_SERVICE_ADDRESS:
+        return _client.submit(language, clips)
+    return _executor.submit(run_translation, language, clips)
+
+
+def get_batcher() -> MicroBatcher:
+    """
+    Returns the batcher of the translations requested from the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _batchers:
+        _batchers[loop] = MicroBatcher(submit_translation, settings.TRANSLATE_BATCH_SIZE, settings.TRANSLATE_BATCH_WAIT)
+    return _batchers[loop]
+
+
+async def translate_audio(language: str, clip: bytes, timeout: Optional[float] = None) -> dict:
+    """
+    Translates an uploaded clip in the translate service, batched with the concurrent translations of its language,
+    and waits for the result without blocking the event loop.
+
+    Args:
+        language (str): The language of the clip, 'es' or 'arh'.
+        clip (bytes): The content of the uploaded file.
+        timeout (float, optional): The seconds to wait, by default `TRANSLATE_TIMEOUT`.
+
+    Returns:
+        dict: The transcription and the translation.
+
+    Raises:
+        AudioDecodeError: If the clip cannot be decoded.
+        OSError: If the translate service cannot be reached.
+        asyncio.TimeoutError: If the translation did not finish in time, it is cancelled if its batch was not sent.
+    """
+    result = get_batcher().translate(language, clip)
+    return await asyncio.wait_for(result, timeout or settings.TRANSLATE_TIMEOUT)
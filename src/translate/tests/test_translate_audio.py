@@ -0,0 +1,78 @@
+"""
+Tests for the decoding of the uploaded audio clips.
+"""
+
+import io
+import subprocess
+from importlib.util import find_spec
+from unittest import mock, skipUnless
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from translate.audio import SAMPLE_RATE, AudioDecodeError, decode_audio
+
+
+def encode_clip(waveform: np.ndarray, rate: int, audio_format: str) -> bytes:
+    """Returns a waveform encoded in an audio format."""
+    import soundfile as sf
+
+    buffer = io.BytesIO()
+    sf.write(buffer, waveform, rate, format=audio_format)
+    return buffer.getvalue()
+
+
+def tone(seconds: float, rate: int, channels: int = 1) -> np.ndarray:
+    """Returns a sine tone with a column per channel."""
+    times = np.arange(int(seconds * rate)) / rate
+    return np.repeat((0.5 * np.sin(2 * np.pi * 440 * times))[:, None], channels, axis=1)
+
+
+@skipUnless(find_spec("soundfile"), "soundfile is required")
+class TestsDecodeAudio(SimpleTestCase):
+    """
+    Test the clips are decoded in memory into mono 16 kHz waveforms.
+    """
+
+    def test_decode_wav(self):
+        """Test a WAV clip at the rate of the models is decoded as it is."""
+        waveform = decode_audio(encode_clip(tone(0.5, SAMPLE_RATE), SAMPLE_RATE, "WAV"))
+
+        self.assertEqual(waveform.dtype, np.float32)
+        self.assertEqual(waveform.shape, (SAMPLE_RATE // 2,))
+        np.testing.assert_allclose(waveform, tone(0.5, SAMPLE_RATE)[:, 0], atol=1e-4)
+
+    def test_decode_flac(self):
+        """Test a stereo FLAC clip is mixed down to mono."""
+        waveform = decode_audio(encode_clip(tone(0.25, SAMPLE_RATE, channels=2), SAMPLE_RATE, "FLAC"))
+
+        self.assertEqual(waveform.shape, (SAMPLE_RATE // 4,))
+        np.testing.assert_allclose(waveform, tone(0.25, SAMPLE_RATE)[:, 0], atol=1e-3)
+
+    @skipUnless(find_spec("torchaudio"), "torchaudio is required")
+    def test_decode_resamples(self):
+        """Test a clip with another sample rate is resampled to the rate of the models."""
+        waveform = decode_audio(encode_clip(tone(0.5, 44100), 44100, "OGG"))
+
+        self.assertEqual(waveform.dtype, np.float32)
+        self.assertEqual(waveform.shape, (SAMPLE_RATE // 2,))
+
+    def test_decode_with_ffmpeg(self):
+        """Test the formats that libsndfile does not read are decoded through ffmpeg pipes."""
+        pcm = (np.array([0, 16384, -16384], dtype=np.int16)).tobytes()
+        completed = subprocess.CompletedProcess([], 0, stdout=pcm)
+
+        with mock.patch("translate.audio.subprocess.run", return_value=completed) as run:
+            waveform = decode_audio(b"webm clip")
+
+        self.assertEqual(run.call_args.kwargs["input"], b"webm clip")
+        np.testing.assert_array_equal(waveform, np.array([0, 0.5, -0.5], dtype=np.float32))
+
+    def test_invalid_clip(self):
+        """Test an empty clip or one that cannot be decoded raises a decode error."""
+        with self.assertRaises(AudioDecodeError):
+            decode_audio(b"")
+
+        error = subprocess.CalledProcessError(1, "ffmpeg")
+        with mock.patch("translate.audio.subprocess.run", side_effect=error), self.assertRaises(AudioDecodeError):
+            decode_audio(b"not audio")
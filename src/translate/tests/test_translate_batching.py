@@ -0,0 +1,99 @@
+"""
+Tests for the micro-batching of the concurrent translations.
+"""
+
+import asyncio
+from concurrent.futures import Future
+
+from django.test import SimpleTestCase
+
+from translate.audio import AudioDecodeError
+from translate.batching import MicroBatcher
+
+
+class TestsMicroBatcher(SimpleTestCase):
+    """
+    Test the translations are grouped per language and every result is routed to its request.
+    """
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.batches = []
+        self.futures = []
+
+    def submit(self, language: str, clips: list[bytes]) -> Future:
+        """Records the batch and returns a future resolved by the test."""
+        future = Future()
+        self.batches.append((language, clips))
+        self.futures.append(future)
+        return future
+
+    async def test_flush_on_size(self):
+        """Test a batch is sent as soon as it is full, without waiting."""
+        batcher = MicroBatcher(self.submit, max_size=2, max_wait=10)
+
+        first = batcher.translate("es", b"one")
+        second = batcher.translate("es", b"two")
+        third = batcher.translate("es", b"three")
+
+        self.assertEqual(self.batches, [("es", [b"one", b"two"])])
+        self.futures[0].set_result([{"clip": 1}, {"clip": 2}])
+        self.assertEqual(await asyncio.gather(first, second), [{"clip": 1}, {"clip": 2}])
+        self.assertFalse(third.done())
+        batcher.flush("es")
+
+    async def test_flush_on_timeout(self):
+        """Test a batch that is not full is sent after the wait of its first translation, per language."""
+        batcher = MicroBatcher(self.submit, max_size=8, max_wait=0.01)
+
+        spanish = batcher.translate("es", b"one")
+        arhuaco = batcher.translate("arh", b"two")
+        self.assertEqual(self.batches, [])
+        await asyncio.sleep(0.05)
+
+        self.assertCountEqual(self.batches, [("es", [b"one"]), ("arh", [b"two"])])
+        for future in self.futures:
+            future.set_result([{"done": True}])
+        self.assertEqual(await asyncio.gather(spanish, arhuaco), [{"done": True}, {"done": True}])
+
+    async def test_item_errors(self):
+        """Test the error of a clip fails only its translation, and the error of the batch fails all of them."""
+        batcher = MicroBatcher(self.submit, max_size=2, max_wait=10)
+        valid = batcher.translate("es", b"valid")
+        invalid = batcher.translate("es", b"invalid")
+        self.futures[0].set_result([{"clip": "valid"}, AudioDecodeError("No se pudo decodificar el audio.")])
+
+        self.assertEqual(await valid, {"clip": "valid"})
+        with self.assertRaises(AudioDecodeError):
+            await invalid
+
+        first = batcher.translate("es", b"one")
+        second = batcher.translate("es", b"two")
+        self.futures[1].set_exception(RuntimeError("The translation failed"))
+        for result in (first, second):
+            with self.assertRaises(RuntimeError):
+                await result
+
+    async def test_cancelled_translation_is_not_sent(self):
+        """Test a translation cancelled before its batch is sent is left out of the batch."""
+        batcher = MicroBatcher(self.submit, max_size=8, max_wait=10)
+        cancelled = batcher.translate("es", b"cancelled")
+        kept = batcher.translate("es", b"kept")
+        cancelled.cancel()
+
+        batcher.flush("es")
+
+        self.assertEqual(self.batches, [("es", [b"kept"])])
+        self.futures[0].set_result([{"clip": "kept"}])
+        self.assertEqual(await kept, {"clip": "kept"})
+
+    async def test_submit_error(self):
+        """Test an error queuing the batch fails its translations."""
+
+        def submit(language, clips):
+            raise ConnectionRefusedError
+
+        batcher = MicroBatcher(submit, max_size=1, max_wait=10)
+
+        with self.assertRaises(ConnectionRefusedError):
+            await batcher.translate("es", b"one")
@@ -0,0 +1,87 @@
+"""
+Tests for the translation of the Arhuaco clips.
+"""
+
+import io
+from importlib.util import find_spec
+from unittest import mock, skipUnless
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from translate.audio import SAMPLE_RATE, decode_audio
+from translate.oraciones import oraciones, traducciones
+from translate.registry import registry
+
+HAS_MODELS = all(find_spec(name) for name in ("soundfile", "torch", "transformers"))
+
+
+def wav_clip(seconds: float, rate: int = SAMPLE_RATE, frequency: float = 440.0) -> bytes:
+    """Returns a sine tone encoded as a WAV file."""
+    import soundfile as sf
+
+    times = np.arange(int(seconds * rate)) / rate
+    buffer = io.BytesIO()
+    sf.write(buffer, 0.5 * np.sin(2 * np.pi * frequency * times), rate, format="WAV")
+    return buffer.getvalue()
+
+
+@skipUnless(HAS_MODELS, "soundfile, torch and transformers are required")
+class TestsArhuacoInference(SimpleTestCase):
+    """
+    Test the uploaded clips are decoded, embedded with wav2vec and classified in memory.
+    """
+
+    def setUp(self) -> None:
+        """Set up test case with small random models instead of the downloaded ones."""
+        import torch
+        from transformers import Wav2Vec2Config, Wav2Vec2FeatureExtractor, Wav2Vec2Model
+
+        from translate.train_model import SimpleClassifier
+
+        torch.manual_seed(0)
+        config = Wav2Vec2Config(
+            hidden_size=16,
+            num_hidden_layers=1,
+            num_attention_heads=2,
+            intermediate_size=32,
+            conv_dim=(8, 8),
+            conv_stride=(5, 2),
+            conv_kernel=(10, 3),
+            num_conv_pos_embeddings=16,
+            num_conv_pos_embedding_groups=2,
+        )
+        self.models = {
+            "wav2vec": (Wav2Vec2FeatureExtractor(), Wav2Vec2Model(config).eval()),
+            "clasificador": SimpleClassifier(16, len(oraciones)).eval(),
+        }
+        patcher = mock.patch.dict(registry._models, self.models)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_embed_decoded_waveforms(self):
+        """Test every decoded waveform is embedded on its own, whatever the other clips of the batch."""
+        import torch
+
+        from translate.wav2vec import embed_waveforms
+
+        waveforms = [decode_audio(wav_clip(1.0)), decode_audio(wav_clip(0.5, rate=8000))]
+        embeddings = embed_waveforms(waveforms)
+
+        self.assertEqual(tuple(embeddings.shape), (2, 16))
+        torch.testing.assert_close(embeddings[1:], embed_waveforms(waveforms[1:]))
+
+    def test_translate_decoded_clips(self):
+        """Test the decoded clips are classified with their wav2vec embeddings."""
+        import torch
+
+        from translate.inference import traducir_audios_arhuaco
+        from translate.wav2vec import embed_waveforms
+
+        waveforms = [decode_audio(wav_clip(1.0)), decode_audio(wav_clip(0.8, frequency=220.0))]
+
+        results = traducir_audios_arhuaco(waveforms)
+
+        with torch.inference_mode():
+            expected = self.models["clasificador"](embed_waveforms(waveforms)).argmax(dim=1).tolist()
+        self.assertEqual(results, [{"transcribe": oraciones[idx], "translate": traducciones[idx]} for idx in expected])
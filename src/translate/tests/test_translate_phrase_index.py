@@ -0,0 +1,102 @@
+"""
+Tests for the index of the embeddings of the translate phrases.
+"""
+
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from translate.phrase_index import PhraseIndex
+
+PHRASES = {1: "buenos días", 2: "gracias", 3: "¿cómo estás?", 5: "hasta mañana", 8: "bienvenidos"}
+
+
+class FakeEmbedder:
+    """
+    An embedder that returns a fixed random vector for every text.
+    """
+
+    def __init__(self, dimension: int = 12):
+        self.dimension = dimension
+        self.encode_calls = 0
+
+    def vector(self, text: str) -> np.ndarray:
+        return np.random.default_rng(sum(text.encode())).normal(size=self.dimension)
+
+    def encode(self, texts, normalize_embeddings=False, convert_to_numpy=True):
+        self.encode_calls += 1
+        vectors = np.stack([self.vector(text) for text in texts])
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+def linear_scan(embedder: FakeEmbedder, text: str) -> tuple[int, float]:
+    """The previous matching, the cosine similarity with every phrase one at a time."""
+    vector = embedder.vector(text)
+    best_key, best_score = None, -np.inf
+    for key, phrase in PHRASES.items():
+        other = embedder.vector(phrase)
+        score = float(vector @ other / (np.linalg.norm(vector) * np.linalg.norm(other)))
+        if score > best_score:
+            best_key, best_score = key, score
+    return best_key, best_score
+
+
+class TestsPhraseIndex(SimpleTestCase):
+    """
+    Test the phrases are matched with one matrix product and their embeddings are saved once.
+    """
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.embedder = FakeEmbedder()
+        self.index = PhraseIndex.load(self.embedder, PHRASES, "fake", None)
+        self.texts = ["buenos dias", "muchas gracias", "hasta luego", "bienvenido", "otra frase"]
+
+    def test_match_agrees_with_linear_scan(self):
+        """Test the best phrase and its score are the ones of the linear scan."""
+        embeddings = self.embedder.encode(self.texts, normalize_embeddings=True)
+
+        for text, embedding in zip(self.texts, embeddings):
+            key, score = self.index.match(embedding)
+            expected_key, expected_score = linear_scan(self.embedder, text)
+            self.assertEqual(key, expected_key)
+            self.assertAlmostEqual(score, expected_score, places=5)
+
+    def test_match_batch(self):
+        """Test the batch matching returns the match of every text."""
+        embeddings = self.embedder.encode(self.texts, normalize_embeddings=True)
+
+        matches = self.index.match_batch(embeddings)
+
+        self.assertEqual(len(matches), len(self.texts))
+        for (key, score), embedding in zip(matches, embeddings):
+            expected_key, expected_score = self.index.match(embedding)
+            self.assertEqual(key, expected_key)
+            self.assertAlmostEqual(score, expected_score, places=5)
+
+    def test_saved_index(self):
+        """Test the saved index is loaded without embedding the phrases again, and a change of phrases rebuilds it."""
+        with tempfile.TemporaryDirectory() as directory:
+            embedder = FakeEmbedder()
+            first = PhraseIndex.load(embedder, PHRASES, "fake", directory)
+            second = PhraseIndex.load(embedder, PHRASES, "fake", directory)
+            self.assertEqual(embedder.encode_calls, 1)
+            np.testing.assert_array_equal(first.matrix, second.matrix)
+            self.assertEqual(second.keys, sorted(PHRASES))
+
+            PhraseIndex.load(embedder, {**PHRASES, 13: "adiós"}, "fake", directory)
+            self.assertEqual(embedder.encode_calls, 2)
+
+    def test_unwritable_directory(self):
+        """Test the index is still built when it cannot be saved."""
+        with (
+            mock.patch("pathlib.Path.mkdir", side_effect=PermissionError),
+            self.assertLogs("translate.phrase_index", "WARNING"),
+        ):
+            index = PhraseIndex.load(self.embedder, PHRASES, "fake", "/unwritable")
+
+        self.assertEqual(index.matrix.shape, (len(PHRASES), self.embedder.dimension))
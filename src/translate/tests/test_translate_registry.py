@@ -0,0 +1,60 @@
+"""
+Tests for the registry of the translate models.
+"""
+
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from translate.registry import ModelRegistry
+
+
+class TestsModelRegistry(SimpleTestCase):
+    """
+    Test the models are loaded on their first use and shared afterwards.
+    """
+
+    def setUp(self) -> None:
+        """Set up test case."""
+        self.registry = ModelRegistry()
+        self.loader = mock.Mock(side_effect=lambda: object())
+        self.registry.register("model")(self.loader)
+
+    def test_lazy_load_and_cache(self):
+        """Test a model is loaded on its first use only."""
+        self.assertEqual(self.registry.names, ["model"])
+        self.assertFalse(self.registry.is_loaded("model"))
+        self.loader.assert_not_called()
+
+        model = self.registry.get("model")
+
+        self.assertTrue(self.registry.is_loaded("model"))
+        self.assertIs(self.registry.get("model"), model)
+        self.loader.assert_called_once()
+
+    def test_concurrent_load(self):
+        """Test the threads that need a model while it is loading wait for it instead of loading it again."""
+        self.loader.side_effect = lambda: time.sleep(0.05) or object()
+        models = []
+        threads = [threading.Thread(target=lambda: models.append(self.registry.get("model"))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.loader.assert_called_once()
+        self.assertEqual(len({id(model) for model in models}), 1)
+
+    def test_unknown_model(self):
+        """Test a model that is not registered raises a key error."""
+        with self.assertRaises(KeyError):
+            self.registry.get("missing")
+
+    @override_settings(TRANSLATE_PRELOAD_MODELS=["model"])
+    def test_preload(self):
+        """Test the configured models are loaded in advance."""
+        self.registry.preload()
+
+        self.assertTrue(self.registry.is_loaded("model"))
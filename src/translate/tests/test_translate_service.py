@@ -0,0 +1,204 @@
+"""
+Tests for the translate service that runs the translations of every API worker.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from translate import service
+from translate.audio import AudioDecodeError
+from translate.service import TranslateClient, TranslateServer, parse_address, submit_translation, translate_audio
+
+
+def fake_translation(language: str, clips: list[bytes]) -> list:
+    """Translates every clip to its language and content, the clips named 'bad' cannot be decoded."""
+    return [
+        AudioDecodeError("bad") if clip == b"bad" else {"language": language, "clip": clip.decode()} for clip in clips
+    ]
+
+
+EXPLOITED = []
+
+
+def exploit() -> None:
+    """Records that a pickle was loaded."""
+    EXPLOITED.append(True)
+
+
+class Exploit:
+    """An object that runs code when it is unpickled."""
+
+    def __reduce__(self):
+        return (exploit, ())
+
+
+@override_settings(TRANSLATE_SERVICE_AUTHKEY="test-authkey")
+class TestsTranslateService(SimpleTestCase):
+    """
+    Test the API workers submit their batches to the service and receive their results.
+    """
+
+    def setUp(self) -> None:
+        """Set up test case with a service on a Unix socket."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.address = os.path.join(directory.name, "translate.sock")
+        self.server = self.create_server(workers=1)
+        self.server.start()
+        patcher = mock.patch.object(service, "run_translation", side_effect=fake_translation)
+        self.run_translation = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_server(self, workers: int) -> TranslateServer:
+        """Creates a service whose pool runs the translations in threads, so they can be mocked."""
+        executor = ThreadPoolExecutor(workers)
+        self.addCleanup(executor.shutdown)
+        server = TranslateServer(self.address, batch_size=4, workers=workers, executor=executor)
+        self.addCleanup(server.listener.close)
+        return server
+
+    def serve(self, batches: int) -> threading.Thread:
+        """Sends some batches to the pool in a thread, and waits for every process to be free."""
+
+        def run():
+            for _ in range(batches):
+                self.server.dispatch_next_batch(timeout=5)
+            for _ in range(self.server.workers):
+                self.server._slots.acquire(timeout=5)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.addCleanup(thread.join)
+        return thread
+
+    def test_submit_and_result(self):
+        """Test the results of every clip are returned to the job that sent it."""
+        client = TranslateClient(self.address)
+
+        future = client.submit("es", [b"hola", b"bad"])
+        self.serve(1)
+
+        result = future.result(timeout=5)
+        self.assertEqual(result[0], {"language": "es", "clip": "hola"})
+        self.assertIsInstance(result[1], AudioDecodeError)
+
+    def test_batches_of_every_worker_are_merged(self):
+        """Test the waiting jobs of a language are translated together, up to the batch size."""
+        first, second = TranslateClient(self.address), TranslateClient(self.address)
+        futures = []
+        for client, language, clips in [
+            (first, "es", [b"a", b"b"]),
+            (second, "arh", [b"c"]),
+            (second, "es", [b"d"]),
+            (first, "es", [b"e", b"f"]),
+        ]:
+            futures.append(client.submit(language, clips))
+            # Every job is received before the next one is sent, so the order of the jobs is known
+            while self.server._jobs.qsize() < len(futures):
+                threading.Event().wait(0.01)
+
+        self.assertEqual(self.server.dispatch_next_batch(timeout=5), 2)
+        self.assertEqual(self.server.dispatch_next_batch(timeout=5), 1)
+        self.assertEqual(self.server.dispatch_next_batch(timeout=5), 1)
+        self.assertEqual([item["clip"] for item in futures[3].result(timeout=5)], ["e", "f"])
+
+        self.assertEqual(
+            [call.args for call in self.run_translation.call_args_list],
+            [("es", [b"a", b"b", b"d"]), ("arh", [b"c"]), ("es", [b"e", b"f"])],
+        )
+        self.assertEqual(futures[1].result(timeout=5), [{"language": "arh", "clip": "c"}])
+
+    def test_workers_translate_concurrently(self):
+        """Test every process of the pool translates a batch at the same time."""
+        self.server.listener.close()
+        self.server = self.create_server(workers=2)
+        self.server.start()
+        barrier = threading.Barrier(2, timeout=5)
+
+        def translate(language: str, clips: list[bytes]) -> list:
+            barrier.wait()
+            return fake_translation(language, clips)
+
+        self.run_translation.side_effect = translate
+        client = TranslateClient(self.address)
+        futures = [client.submit("es", [b"a"]), client.submit("arh", [b"b"])]
+        self.serve(2)
+
+        self.assertEqual(futures[0].result(timeout=5), [{"language": "es", "clip": "a"}])
+        self.assertEqual(futures[1].result(timeout=5), [{"language": "arh", "clip": "b"}])
+
+    def test_batch_error(self):
+        """Test an error of the models fails every job of the batch."""
+        self.run_translation.side_effect = MemoryError
+        future = TranslateClient(self.address).submit("es", [b"a"])
+
+        with self.assertLogs("translate.service", "ERROR"):
+            self.serve(1).join()
+
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+
+    def test_translate_audio(self):
+        """Test a clip is batched, sent to the service and its translation awaited."""
+        self.serve(1)
+
+        with override_settings(TRANSLATE_SERVICE_ADDRESS=self.address), mock.patch.object(service, "_client", None):
+            result = asyncio.run(translate_audio("arh", b"clip", timeout=5))
+
+        self.assertEqual(result, {"language": "arh", "clip": "clip"})
+
+    def test_service_unavailable(self):
+        """Test a translation fails right away when the service is not running."""
+        missing = self.address + ".missing"
+
+        with override_settings(TRANSLATE_SERVICE_ADDRESS=missing), mock.patch.object(service, "_client", None):
+            with self.assertRaises(OSError):
+                asyncio.run(translate_audio("es", b"clip", timeout=5))
+
+    @override_settings(TRANSLATE_SERVICE_ADDRESS="")
+    def test_local_translation(self):
+        """Test the translations run in a thread of the process without a service."""
+        with mock.patch.object(service, "_executor", None):
+            future = submit_translation("es", [b"hola"])
+
+        self.assertEqual(future.result(timeout=5), [{"language": "es", "clip": "hola"}])
+
+    def test_pickles_are_not_loaded(self):
+        """Test a message that is not a JSON header closes the connection without being unpickled."""
+        connection = Client(self.address, authkey=b"test-authkey")
+        self.addCleanup(connection.close)
+
+        with self.assertLogs("translate.service", "WARNING"):
+            connection.send(Exploit())
+            with self.assertRaises(EOFError):
+                connection.recv_bytes()
+
+        self.assertEqual(EXPLOITED, [])
+
+    def test_invalid_job(self):
+        """Test a job of another language or with more clips than a batch closes the connection."""
+        for header in ({"job": 1, "language": "en", "clips": 1}, {"job": 1, "language": "es", "clips": 5}):
+            connection = Client(self.address, authkey=b"test-authkey")
+            self.addCleanup(connection.close)
+            with self.subTest(header=header), self.assertLogs("translate.service", "WARNING"):
+                service.send_message(connection, header)
+                with self.assertRaises(EOFError):
+                    connection.recv_bytes()
+
+    def test_authkey_is_required(self):
+        """Test the service cannot be used without its own key."""
+        with override_settings(TRANSLATE_SERVICE_AUTHKEY=""), self.assertRaises(ImproperlyConfigured):
+            TranslateClient(self.address).submit("es", [b"hola"])
+
+    def test_parse_address(self):
+        """Test a host and port is a TCP address and anything else the path of a Unix socket."""
+        self.assertEqual(parse_address("translate_worker:6100"), ("translate_worker", 6100))
+        self.assertEqual(parse_address("/run/translate.sock"), "/run/translate.sock")
@@ -3,7 +3,8 @@ import os
 import torch
 import torch.nn as nn
 from torch.utils.data import Dataset, DataLoader
-from extract_embeddings import get_embedding
+
+from translate.wav2vec import embed_file
 
 DATA_PATH = "data"
 
@@ -22,7 +23,7 @@ class AudioDataset(Dataset):
 
     def __getitem__(self, idx):
         path, label = self.samples[idx]
-        emb = get_embedding(path)
+        emb = embed_file(path)
         # Asegurar tipo correcto
         return emb[0].float(), torch.tensor(label, dtype=torch.long)
 
@@ -1,30 +1,54 @@
 # traducir_espanol.py
-import whisper
-from sentence_transformers import SentenceTransformer, util
+from django.conf import settings
 
 from translate.oraciones import oraciones, traducciones
+from translate.phrase_index import PhraseIndex
+from translate.registry import registry
 
-# 1. Cargar modelos solo una vez
-whisper_model = whisper.load_model("base")
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+EMBEDDER_NAME = "all-MiniLM-L6-v2"
 
 
-def traducir_audio_espanol(audio_path):
-    # Transcribir
-    result = whisper_model.transcribe(audio_path, language="es")
-    transcripcion = result["text"]
+# Cargar los modelos en el primer uso y compartirlos entre los hilos del proceso
+@registry.register("whisper")
+def load_whisper():
+    import whisper
 
-    # Embeddings
-    frases_lista = list(traducciones.values())
-    embeddings_frases = embedder.encode(frases_lista, convert_to_tensor=True)
-    embedding_transcripcion = embedder.encode(transcripcion, convert_to_tensor=True)
+    return whisper.load_model("base")
 
-    # Similitud
-    scores = util.cos_sim(embedding_transcripcion, embeddings_frases)[0]
-    idx = int(scores.argmax())
-    score = float(scores[idx])
 
-    return {
-        "transcribe": transcripcion,
-        "translate": oraciones[idx]
-    }
+@registry.register("embedder")
+def load_embedder():
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(EMBEDDER_NAME)
+
+
+# Embeddings de las frases calculados una sola vez
+@registry.register("frases")
+def load_phrase_index():
+    return PhraseIndex.load(registry.get("embedder"), traducciones, EMBEDDER_NAME, settings.TRANSLATE_EMBEDDINGS_DIR)
+
+
+def traducir_audios_espanol(waveforms):
+    whisper_model = registry.get("whisper")
+    embedder = registry.get("embedder")
+    index = registry.get("frases")
+
+    # Transcribir las formas de onda a 16 kHz
+    transcripciones = [whisper_model.transcribe(waveform, language="es")["text"] for waveform in waveforms]
+
+    # Similitud con las frases, todas las transcripciones en un solo lote
+    embeddings = embedder.encode(transcripciones, normalize_embeddings=True, convert_to_numpy=True)
+    matches = index.match_batch(embeddings)
+
+    return [
+        {
+            "transcribe": transcripcion,
+            "translate": oraciones[idx]
+        }
+        for transcripcion, (idx, score) in zip(transcripciones, matches)
+    ]
+
+
+def traducir_audio_espanol(waveform):
+    return traducir_audios_espanol([waveform])[0]
@@ -1,17 +1,16 @@
 # views.py
-import os
-import tempfile
+import asyncio
 
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
-from translate.inference import traducir_audio_arhuaco
-from translate.translate_spanish import traducir_audio_espanol
+from core.views import AsyncAPIView
+from translate.audio import AudioDecodeError
+from translate.service import translate_audio
 
 
-class TraducirAudioView(APIView):
-    def post(self, request, format=None):
+class TraducirAudioView(AsyncAPIView):
+    async def post(self, request, format=None):
         audio_file = request.FILES.get("audio")
         language = request.data.get("language")
 
@@ -23,18 +22,19 @@ class TraducirAudioView(APIView):
             return Response({"error": "El campo 'language' debe ser 'es' o 'arh'."},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        # Guardar audio temporalmente
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-            for chunk in audio_file.chunks():
-                tmp.write(chunk)
-            tmp_path = tmp.name
+        # El audio se decodifica en memoria en el servicio de traducción, sin archivos temporales
+        clip = b"".join(audio_file.chunks())
 
+        # Traducir en el servicio de traducción sin bloquear el worker de la API
         try:
-            if language == "es":
-                resultado = traducir_audio_espanol(tmp_path)
-            else:
-                resultado = traducir_audio_arhuaco(tmp_path)
-        finally:
-            os.unlink(tmp_path)
+            resultado = await translate_audio(language, clip)
+        except AudioDecodeError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        except asyncio.TimeoutError:
+            return Response({"error": "La traducción tardó demasiado, intente de nuevo."},
+                            status=status.HTTP_504_GATEWAY_TIMEOUT)
+        except OSError:
+            return Response({"error": "El servicio de traducción no está disponible, intente de nuevo."},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         return Response(resultado, status=status.HTTP_200_OK)
@@ -0,0 +1,62 @@
+"""
+This module contains the wav2vec embeddings of the Arhuaco clips.
+
+A clip is embedded as the mean over time of the last hidden states of Wav2Vec2 base, the 768 values the Arhuaco
+classifier is trained with. The embeddings are computed from the waveforms decoded in memory by `decode_audio`, and
+`embed_file` embeds the clips of the training data the same way.
+"""
+
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from translate.audio import SAMPLE_RATE, decode_audio
+from translate.registry import registry
+
+WAV2VEC_NAME = 'facebook/wav2vec2-base'
+
+
+@registry.register('wav2vec')
+def load_wav2vec():
+    """
+    Loads the feature extractor and the model of Wav2Vec2 base.
+    """
+    # pylint: disable=import-outside-toplevel
+    from transformers import Wav2Vec2FeatureExtractor, Wav2Vec2Model
+
+    return Wav2Vec2FeatureExtractor.from_pretrained(WAV2VEC_NAME), Wav2Vec2Model.from_pretrained(WAV2VEC_NAME).eval()
+
+
+def embed_waveforms(waveforms: list[np.ndarray]):
+    """
+    Embeds mono 16 kHz waveforms.
+
+    Every waveform goes through the model on its own, Wav2Vec2 base does not take an attention mask, so the padding of
+    a batch would change the embeddings of the shorter clips.
+
+    Args:
+        waveforms (list[np.ndarray]): The float32 waveforms, with values between -1 and 1.
+
+    Returns:
+        torch.Tensor: The embeddings, one row per waveform.
+    """
+    import torch  # pylint: disable=import-outside-toplevel
+
+    extractor, model = registry.get('wav2vec')
+    embeddings = []
+    with torch.inference_mode():
+        for waveform in waveforms:
+            inputs = extractor(waveform, sampling_rate=SAMPLE_RATE, return_tensors='pt')
+            embeddings.append(model(inputs.input_values).last_hidden_state.mean(dim=1))
+    return torch.cat(embeddings)
+
+
+def embed_file(path: Union[str, Path]):
+    """
+    Embeds an audio file, e.g. a clip of the training data.
+
+    Returns:
+        torch.Tensor: The embedding, with shape (1, 768).
+    """
+    return embed_waveforms([decode_audio(Path(path).read_bytes())])